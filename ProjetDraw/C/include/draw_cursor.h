@@ -27,5 +27,9 @@ void drawCircle(SDL_Renderer *renderer, Cursor *cursor, int radius);  // Draws a
 void drawLine(SDL_Renderer *renderer, Cursor *cursor, int length);    // Draws a straight line
 void drawPoint(SDL_Renderer *renderer, Cursor *cursor);               // Draws a single point
 void drawArc(SDL_Renderer *renderer, Cursor *cursor, int radius, double angle); // Draws an arc
+int arcSegments(int radius, double angle);                            // Samples of an arc
+
+// Output functions
+int saveSurface(SDL_Surface *surface, const char *path);              // Writes a PPM or BMP image
 
 #endif // DRAW_CURSOR_H
\ No newline at end of file
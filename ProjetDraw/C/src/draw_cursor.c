@@ -1,8 +1,38 @@
 #include <SDL2/SDL.h>
 #include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
 #include "../include/M_PI.h"
 #include "../include/draw_cursor.h"
 
+// Points are sent to SDL in batches of POINT_BATCH_SIZE (one SDL_RenderDrawPoints call each)
+#define POINT_BATCH_SIZE 1024
+
+typedef struct {
+    SDL_Renderer *renderer;
+    SDL_Point points[POINT_BATCH_SIZE];
+    int count;
+} PointBatch;
+
+// Draw the buffered points
+static void flushPoints(PointBatch *batch) {
+    if (batch->count > 0) {
+        SDL_RenderDrawPoints(batch->renderer, batch->points, batch->count);
+        batch->count = 0;
+    }
+}
+
+// Buffer a point, flushing the batch when it is full
+static void addPoint(PointBatch *batch, int x, int y) {
+    if (batch->count == POINT_BATCH_SIZE) {
+        flushPoints(batch);
+    }
+    batch->points[batch->count].x = x;
+    batch->points[batch->count].y = y;
+    batch->count++;
+}
+
 // Create a cursor with default properties
 Cursor createCursor() {
     Cursor cursor;
@@ -69,12 +99,34 @@ void drawTriangle(SDL_Renderer *renderer, Cursor *cursor, int base, int height)
 void drawCircle(SDL_Renderer *renderer, Cursor *cursor, int radius) {
     SDL_SetRenderDrawColor(renderer, cursor->color.r, cursor->color.g, cursor->color.b, cursor->color.a);
 
-    // Draw circle outline using points
-    for (double angle = 0; angle < 360; angle += 0.1) {
-        int x = cursor->x + (int)(cos(angle * M_PI / 180.0) * radius);
-        int y = cursor->y + (int)(sin(angle * M_PI / 180.0) * radius);
-        SDL_RenderDrawPoint(renderer, x, y);
+    // Midpoint circle algorithm: one octant is computed with integers only,
+    // the 7 others by symmetry (about 5.7 * radius points instead of 3600 cos/sin)
+    PointBatch batch;
+    batch.renderer = renderer;
+    batch.count = 0;
+
+    int x = 0;
+    int y = radius;
+    int decision = 1 - radius;
+    while (x <= y) {
+        addPoint(&batch, cursor->x + x, cursor->y + y);
+        addPoint(&batch, cursor->x + y, cursor->y + x);
+        addPoint(&batch, cursor->x - x, cursor->y + y);
+        addPoint(&batch, cursor->x - y, cursor->y + x);
+        addPoint(&batch, cursor->x + x, cursor->y - y);
+        addPoint(&batch, cursor->x + y, cursor->y - x);
+        addPoint(&batch, cursor->x - x, cursor->y - y);
+        addPoint(&batch, cursor->x - y, cursor->y - x);
+
+        x++;
+        if (decision < 0) {
+            decision += 2 * x + 1;
+        } else {
+            y--;
+            decision += 2 * (x - y) + 1;
+        }
     }
+    flushPoints(&batch);
 }
 
 // Draw a straight line from the cursor
@@ -91,15 +143,67 @@ void drawPoint(SDL_Renderer *renderer, Cursor *cursor) {
     SDL_RenderDrawPoint(renderer, cursor->x, cursor->y);
 }
 
+// Number of segments sampled along an arc (see drawArc)
+int arcSegments(int radius, double angle) {
+    double length = angle * M_PI / 180.0 * radius; // Arc length in pixels
+    int segments = (int)ceil(length > angle ? length : angle);
+    return segments > 0 ? segments : 1;
+}
+
 // Draw an arc from the cursor's position
 void drawArc(SDL_Renderer *renderer, Cursor *cursor, int radius, double angle) {
     SDL_SetRenderDrawColor(renderer, cursor->color.r, cursor->color.g, cursor->color.b, cursor->color.a);
+    if (angle < 0) {
+        return;
+    }
+
+    // About one sample per pixel of arc length (at least one per degree), so that
+    // small arcs need few points and large arcs have no gaps
     double startAngle = cursor->angle;
-    double endAngle = cursor->angle + angle;
+    int segments = arcSegments(radius, angle);
+
+    PointBatch batch;
+    batch.renderer = renderer;
+    batch.count = 0;
+    for (int i = 0; i <= segments; i++) {
+        double a = (startAngle + angle * i / segments) * M_PI / 180.0;
+        addPoint(&batch, cursor->x + (int)(cos(a) * radius), cursor->y + (int)(sin(a) * radius));
+    }
+    flushPoints(&batch);
+}
+
+// Save a 32-bit surface as a binary PPM image if the path ends with ".ppm", as a BMP image otherwise
+int saveSurface(SDL_Surface *surface, const char *path) {
+    size_t length = strlen(path);
+    if (length < 4 || SDL_strcasecmp(path + length - 4, ".ppm") != 0) {
+        return SDL_SaveBMP(surface, path);
+    }
 
-    for (double a = startAngle; a <= endAngle; a += 1.0) {
-        int x = cursor->x + (int)(cos(a * M_PI / 180.0) * radius);
-        int y = cursor->y + (int)(sin(a * M_PI / 180.0) * radius);
-        SDL_RenderDrawPoint(renderer, x, y);
+    FILE *file = fopen(path, "wb");
+    Uint8 *line = malloc((size_t)surface->w * 3);
+    if (file == NULL || line == NULL) {
+        if (file != NULL) {
+            fclose(file);
+        }
+        free(line);
+        return SDL_SetError("Cannot write %s", path);
     }
+
+    if (SDL_MUSTLOCK(surface)) {
+        SDL_LockSurface(surface);
+    }
+    fprintf(file, "P6\n%d %d\n255\n", surface->w, surface->h);
+    for (int y = 0; y < surface->h; y++) {
+        Uint32 *row = (Uint32 *)((Uint8 *)surface->pixels + y * surface->pitch);
+        for (int x = 0; x < surface->w; x++) {
+            SDL_GetRGB(row[x], surface->format, &line[3 * x], &line[3 * x + 1], &line[3 * x + 2]);
+        }
+        fwrite(line, 3, surface->w, file);
+    }
+    if (SDL_MUSTLOCK(surface)) {
+        SDL_UnlockSurface(surface);
+    }
+
+    free(line);
+    return fclose(file) == 0 ? 0 : SDL_SetError("Cannot write %s", path);
 }
@@ -5,8 +5,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  #
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
+from ast_cache import ASTCache
 from interpreter import Interpreter
-from lexer import Lexer
+from lexer import IncrementalLexer
+from optimizer import optimize
 from parser import Parser
 import compiler
 
@@ -32,6 +34,9 @@ class DrawPlusIDE:
 
         self.setup_menu()  # Initialize the menu
         self.file_path = None  # Current file path (if a file is open)
+        self.lexer = IncrementalLexer()  # Token cache of the text area, updated per edit
+        self.ast_cache = ASTCache()  # Parsed programs, reused while their source is unchanged
+        self.preview_window = None  # Window of the in-process preview (see preview_code)
 
     def clear_error_area(self):
         """
@@ -69,6 +74,7 @@ class DrawPlusIDE:
         # Run menu for executing the code
         run_menu = tk.Menu(menu, tearoff=0)
         run_menu.add_command(label="Run", command=self.run_code)
+        run_menu.add_command(label="Preview (in-process)", command=self.preview_code)
         menu.add_cascade(label="Run", menu=run_menu)
 
     def new_file(self):
@@ -82,12 +88,18 @@ class DrawPlusIDE:
         """
         Opens a file dialog to select and load a file.
         - Reads the content of the selected file into the text area.
+        - Parses it through the AST cache, so running it unchanged skips the front end.
         """
         self.file_path = filedialog.askopenfilename(filetypes=[("Draw++ Files", "*.draw++"), ("All Files", "*.*")])
         if self.file_path:
             with open(self.file_path, 'r') as file:
+                code = file.read()
                 self.text_area.delete(1.0, tk.END)  # Clear current text
-                self.text_area.insert(1.0, file.read())  # Load file content
+                self.text_area.insert(1.0, code)  # Load file content
+            try:
+                self.ast_cache.parse(code)
+            except Exception:
+                pass  # Lexer errors are reported when the code is run
 
     def save_file(self):
         """
@@ -103,76 +115,126 @@ class DrawPlusIDE:
                 file.write(self.text_area.get(1.0, tk.END))  # Save the text area content
        
 
-    def run_code(self):
+    def interpret_code(self):
         """
-        Executes the code written in the text area.
-        - Performs lexical analysis to generate tokens.
-        - Parses tokens into an Abstract Syntax Tree (AST).
-        - Interprets the AST and executes the logic.
-        - Compiles the code into a C program and optionally runs it.
+        Lexes, parses, optimizes and interprets the code of the text area.
+        Returns (ast, interpreter), or None after displaying the errors.
         """
-        code = self.text_area.get(1.0, tk.END).strip()
+        code = self.text_area.get(1.0, "end-1c")
         self.clear_error_area()
 
-        if not code:
+        if not code.strip():
             self.display_error("Warning: No code to run!")
-            return
+            return None
 
-        try:
-            # Lexical analysis to generate tokens
-            lexer = Lexer(source_code=code)
-            tokens = lexer.tokenize()
+        cached = self.ast_cache.load(code)
+        if cached is not None:
+            # Unchanged since it was opened or last run: no lexing nor parsing
+            ast, parser_errors = cached
+        else:
+            # Lexical analysis, re-tokenizing only the lines edited since the last run
+            self.lexer.set_text(code)
+            tokens = self.lexer.tokenize()
 
             # Syntax analysis to generate the AST
             parser = Parser(tokens=tokens)
             ast = parser.parse()
+            parser_errors = parser.errors
+            self.ast_cache.save(code, ast, parser_errors)
 
-            # Check for parsing errors
-            if parser.errors:
-                for error in parser.errors:
-                    if "Unexpected token" not in error:  # Filter specific error messages
-                        self.display_error(f"{error}")
-                return
+        # Check for parsing errors
+        if parser_errors:
+            for error in parser_errors:
+                if "Unexpected token" not in error:  # Filter specific error messages
+                    self.display_error(f"{error}")
+            return None
 
-            # Interpretation: execute the AST
-            interpreter = Interpreter(syntax_tree=ast)
-            interpreter.execute()
+        # Constant folding and dead-branch removal, shared by the interpreter and the C backend
+        ast = optimize(ast)
 
-            # Check for interpretation errors
-            if interpreter.errors:
-                for error in interpreter.errors:
-                    self.display_error(f"{error}")
-            else:
+        # Interpretation: execute the AST
+        interpreter = Interpreter(syntax_tree=ast)
+        interpreter.execute()
+
+        # Check for interpretation errors
+        if interpreter.errors:
+            for error in interpreter.errors:
+                self.display_error(f"{error}")
+            return None
+        return ast, interpreter
+
+    def run_code(self):
+        """
+        Executes the code written in the text area.
+        - Performs lexical analysis to generate tokens.
+        - Parses tokens into an Abstract Syntax Tree (AST).
+        - Interprets the AST and executes the logic.
+        - Compiles the code into a C program and optionally runs it.
+        """
+        try:
+            result = self.interpret_code()
+            if result is not None:
+                ast, _ = result
                 messagebox.showinfo("Success", "Code executed successfully!")
 
                 # Compile the C code
                 c_code = compiler.generate_c_code(ast)  # Generate C code
                 compiler.save_to_file("output.c", c_code)  # Save to a file
-                compiler.compile_c_to_exe("output.c", "output.exe")  # Compile to an executable
-
-                # Optionally run the compiled executable
-                import subprocess
-                subprocess.Popen(["./output.exe"])  # For Windows, just "output.exe" works
+                # Compile to an executable (reused from the build cache if the program did not change)
+                if compiler.compile_c_to_exe("output.c", "output.exe"):
+                    # Optionally run the compiled executable
+                    import subprocess
+                    subprocess.Popen(["./output.exe"])  # For Windows, just "output.exe" works
 
         except Exception as e:
             # Handle unexpected errors
             self.display_error(f"An unexpected error occurred: {e}")
 
+    def preview_code(self):
+        """
+        Executes the code and shows its drawing without compiling a program:
+        the draw_cursor runtime is loaded once in the IDE process (see native_renderer)
+        and draws into a persistent renderer, displayed in a preview window.
+        """
+        try:
+            result = self.interpret_code()
+            if result is None:
+                return
+            _, interpreter = result
+
+            from native_renderer import persistent_renderer
+            from renderer import ppm_bytes
+            renderer = persistent_renderer()
+            renderer.clear()
+            image = tk.PhotoImage(data=ppm_bytes(renderer.render(interpreter.draw_commands)))
+
+            if self.preview_window is None or not self.preview_window.winfo_exists():
+                self.preview_window = tk.Toplevel(self.root)
+                self.preview_window.title("Draw++ Preview")
+                self.preview_label = tk.Label(self.preview_window)
+                self.preview_label.pack()
+            self.preview_label.config(image=image)
+            self.preview_label.image = image  # Keep a reference, Tk does not
+
+        except Exception as e:
+            # Handle unexpected errors (e.g. the runtime cannot be built without SDL2)
+            self.display_error(f"An unexpected error occurred: {e}")
+
 
     def validate_code(self):
         """
         Validates the code in the text area for syntax errors.
         - Performs lexical and syntax analysis without execution.
         """
-        code = self.text_area.get(1.0, tk.END).strip()
-        if not code:
+        code = self.text_area.get(1.0, "end-1c")
+        if not code.strip():
             messagebox.showwarning("Warning", "No code to validate!")
             return
 
         try:
-            # Lexical analysis to generate tokens
-            lexer = Lexer(source_code=code)
-            tokens = lexer.tokenize()
+            # Lexical analysis, re-tokenizing only the lines edited since the last run
+            self.lexer.set_text(code)
+            tokens = self.lexer.tokenize()
 
             # Syntax analysis to validate the code
             parser = Parser(tokens=tokens)
@@ -0,0 +1,84 @@
+# ast_cache.py
+# Persistent cache of parsed Draw++ programs, keyed by source hash and parser version.
+import hashlib
+import marshal
+
+from lexer import Lexer
+from parser import Parser, PARSER_VERSION
+from utils.ast_nodes import from_tuple, to_tuple
+from utils.disk_cache import DEFAULT_MAX_BYTES, DiskCache, default_cache_dir
+
+
+class ASTCache:
+    """
+    Skips lexing and parsing of unchanged sources.
+    - Entries hold the marshalled tuple encoding of the AST (see utils.ast_nodes)
+      together with the parser errors.
+    - The key is the SHA-256 of the parser version and the source, so editing a
+      file or upgrading the parser never returns a stale tree.
+    - Lexer errors are not cached: they are raised again on every call.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initializes the cache.
+        Args:
+            directory: Cache folder (defaults to ~/.cache/drawpp/ast, see utils.disk_cache).
+            max_bytes: Size limit before least recently used entries are evicted.
+        """
+        self.store = DiskCache(directory or default_cache_dir("ast"), max_bytes)
+        self.hits = 0    # Number of parses served from the cache
+        self.misses = 0  # Number of parses that ran the lexer and the parser
+
+    @staticmethod
+    def key(source_code):
+        """
+        Returns the cache key of a source.
+        """
+        digest = hashlib.sha256(f"drawpp-ast-{PARSER_VERSION}\0".encode())
+        digest.update(source_code.encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, source_code):
+        """
+        Returns the cached (ast, errors) of a source, or None if it is not cached.
+        """
+        data = self.store.get(self.key(source_code))
+        if data is None:
+            return None
+        try:
+            encoded_ast, errors = marshal.loads(data)
+            return from_tuple(encoded_ast), errors
+        except (EOFError, ValueError, TypeError, KeyError, IndexError):
+            return None  # Corrupted or foreign entry: parse again
+
+    def save(self, source_code, ast, errors):
+        """
+        Stores the AST and the parser errors of a source.
+        """
+        data = marshal.dumps((to_tuple(ast), list(errors)))
+        try:
+            self.store.put(self.key(source_code), data)
+        except OSError:
+            pass  # The cache is an optimization only
+
+    def parse(self, source_code):
+        """
+        Returns the (ast, errors) of a source, parsing it only on a cache miss.
+        """
+        cached = self.load(source_code)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        parser = Parser(Lexer(source_code).tokenize())
+        ast = parser.parse()
+        self.save(source_code, ast, parser.errors)
+        return ast, parser.errors
+
+    def parse_file(self, path):
+        """
+        Reads and parses a .draw++ file through the cache.
+        """
+        with open(path, encoding="utf-8") as file:
+            return self.parse(file.read())
@@ -0,0 +1,215 @@
+# batch_render.py
+# Non-interactive rendering and building of many Draw++ files
+# (see `python main.py render --help` and `python main.py build --help`).
+import glob
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import compiler
+from ast_cache import ASTCache
+from closure_interpreter import ClosureInterpreter
+from interpreter import DEFAULT_TIMEOUT, Interpreter
+from optimizer import optimize
+from vm import VirtualMachine
+
+SOURCE_EXTENSION = ".draw++"
+IMAGE_FORMATS = ("png", "ppm", "svg")
+
+# Execution backend name -> interpreter class
+BACKENDS = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "bytecode": VirtualMachine,
+}
+
+
+def collect_sources(paths):
+    """
+    Expands the command-line paths into a list of Draw++ files, in order and without duplicates.
+    - A directory stands for the .draw++ files it contains (not recursively).
+    - Other paths are used as they are, or as glob patterns if they do not exist.
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(glob.escape(path), "*" + SOURCE_EXTENSION)))
+        elif os.path.exists(path):
+            matches = [path]
+        else:
+            matches = sorted(glob.glob(path, recursive=True))
+        for match in matches:
+            if match not in sources:
+                sources.append(match)
+    return sources
+
+
+def output_path(source, out_dir, image_format):
+    """
+    Returns the image written for `source`: same base name, in `out_dir`.
+    """
+    name = os.path.basename(source)
+    if name.endswith(SOURCE_EXTENSION):
+        name = name[:-len(SOURCE_EXTENSION)]
+    return os.path.join(out_dir, f"{name}.{image_format}")
+
+
+def render_file(source, out_dir, image_format="png", backend="tree", width=800, height=600,
+                timeout=DEFAULT_TIMEOUT, renderer="raster", profile=compiler.DEFAULT_PROFILE, ast_cache=None):
+    """
+    Runs lex -> parse -> optimize -> interpret -> render on one file and writes the image.
+    Unchanged files skip lexing and parsing through `ast_cache` (an ASTCache, the default
+    one if None).
+    PNG and PPM images are drawn by:
+    - "raster": renderer.RasterRenderer;
+    - "native": the C runtime loaded in the process (see native_renderer), once per worker;
+    - "compiled": the headless C program of the file, built with `profile` (see render_compiled).
+    Returns a dict describing the outcome:
+    - "source", "output" (None if nothing was written), "errors" (list of messages),
+      "primitives" (number of drawn primitives) and "seconds" (wall-clock time).
+    The image is written even when the interpreter reported errors, like the IDE
+    drawing what the program managed to draw.
+    """
+    start = time.perf_counter()
+    result = {"source": source, "output": None, "errors": [], "primitives": 0, "seconds": 0.0}
+    if ast_cache is None:
+        ast_cache = ASTCache()
+    try:
+        syntax_tree, parser_errors = ast_cache.parse_file(source)
+        if parser_errors:
+            result["errors"] = list(parser_errors)
+            return result
+
+        program = optimize(syntax_tree)
+        interpreter = BACKENDS[backend](program, timeout=timeout)
+        interpreter.execute()
+        result["errors"] = list(interpreter.errors)
+        display_list = interpreter.draw_commands
+        result["primitives"] = len(display_list)
+
+        output = output_path(source, out_dir, image_format)
+        if image_format == "svg":
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(display_list.to_svg(width, height))
+        elif renderer == "compiled":
+            render_compiled(program, output, profile, width, height, timeout)
+        else:
+            from renderer import RasterRenderer, write_png, write_ppm  # NumPy is only needed for raster images
+            if renderer == "native":
+                from native_renderer import persistent_renderer
+                raster = persistent_renderer(width, height)
+                raster.clear()
+            else:
+                raster = RasterRenderer(width, height)
+            pixels = raster.render(display_list)
+            (write_ppm if image_format == "ppm" else write_png)(pixels, output)
+        result["output"] = output
+    except subprocess.CalledProcessError as e:  # A C build (or the compiled program) failed
+        result["errors"].append((e.stderr or str(e)).strip())
+    except Exception as e:
+        result["errors"].append(f"{type(e).__name__}: {e}")
+    finally:
+        result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def render_compiled(syntax_tree, output, profile=compiler.DEFAULT_PROFILE, width=800, height=600,
+                    timeout=DEFAULT_TIMEOUT):
+    """
+    Renders a program with the C backend: generates its headless C code (see
+    compiler.generate_c_code), builds it with `profile` through the build cache, and runs
+    it for at most `timeout` seconds. The program writes PPM images itself; PNG images
+    are converted from its output.
+    Raises subprocess.CalledProcessError or subprocess.TimeoutExpired if the build or the run fails.
+    """
+    with tempfile.TemporaryDirectory() as build_dir:
+        c_file = os.path.join(build_dir, "program.c")
+        exe_file = os.path.join(build_dir, "program.exe")
+        compiler.save_to_file(c_file, compiler.generate_c_code(syntax_tree, headless=True, width=width, height=height))
+        compiler.build_executable(c_file, exe_file, profile)
+
+        image = output if output.lower().endswith(".ppm") else os.path.join(build_dir, "image.ppm")
+        subprocess.run([exe_file, image], check=True, capture_output=True, text=True, timeout=timeout)
+        if image != output:
+            from renderer import ppm_pixels, write_png  # NumPy is only needed for the conversion
+            with open(image, "rb") as f:
+                write_png(ppm_pixels(f.read()), output)
+
+
+def build_file(source, out_dir, profile=compiler.DEFAULT_PROFILE, headless=False, ast_cache=None):
+    """
+    Runs lex -> parse -> optimize -> C generation on one file and compiles the C code
+    with a build profile (see compiler.BUILD_PROFILES), through the AST and build caches.
+    With `headless`, the executable writes an image instead of opening a window
+    (see compiler.generate_c_code).
+    Returns a dict like render_file, where "output" is the executable
+    and "cached" tells whether it was reused from the build cache.
+    """
+    start = time.perf_counter()
+    result = {"source": source, "output": None, "errors": [], "cached": False, "seconds": 0.0}
+    if ast_cache is None:
+        ast_cache = ASTCache()
+    try:
+        syntax_tree, parser_errors = ast_cache.parse_file(source)
+        if parser_errors:
+            result["errors"] = list(parser_errors)
+            return result
+
+        c_file = output_path(source, out_dir, "c")
+        compiler.save_to_file(c_file, compiler.generate_c_code(optimize(syntax_tree), headless))
+        exe_file = output_path(source, out_dir, "exe")
+        result["cached"] = compiler.build_executable(c_file, exe_file, profile)
+        result["output"] = exe_file
+    except subprocess.CalledProcessError as e:
+        result["errors"].append((e.stderr or str(e)).strip())
+    except Exception as e:
+        result["errors"].append(f"{type(e).__name__}: {e}")
+    finally:
+        result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def render_files(sources, out_dir, jobs=None, worker=render_file, **options):
+    """
+    Runs `worker` (render_file or build_file) on `sources` with up to `jobs` processes
+    (all cores by default) and returns an iterator over the result of each file,
+    in the order of `sources`.
+    Raises ValueError, before any file is processed, if two sources have the same
+    base name: their outputs would overwrite each other in `out_dir`.
+    """
+    names = {}
+    for source in sources:
+        name = os.path.normcase(output_path(source, out_dir, ""))
+        if name in names:
+            raise ValueError(f"'{names[name]}' and '{source}' have the same name, "
+                             f"their outputs would overwrite each other in '{out_dir}'.")
+        names[name] = source
+    os.makedirs(out_dir, exist_ok=True)
+    return run_workers(sources, out_dir, jobs, worker, options)
+
+
+def run_workers(sources, out_dir, jobs, worker, options):
+    """
+    Yields the results of render_files, computed in this process or in a process pool.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(sources) <= 1:
+        for source in sources:
+            yield worker(source, out_dir, **options)
+        return
+
+    # Files are sent in chunks to amortize the inter-process overhead on large batches
+    chunksize = max(1, len(sources) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        arguments = [(worker, out_dir, options)] * len(sources)
+        yield from executor.map(run_worker, sources, arguments, chunksize=chunksize)
+
+
+def run_worker(source, arguments):
+    """
+    Pool entry point: calls the worker with the shared (worker, out_dir, options) arguments.
+    """
+    worker, out_dir, options = arguments
+    return worker(source, out_dir, **options)
@@ -0,0 +1,168 @@
+# build_cache.py
+# Persistent cache of compiled Draw++ executables, keyed by the generated C source,
+# the compiler command and the version of the C runtime, and of the prebuilt runtime
+# library (C/src/draw_cursor.c) the executables are linked against.
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from utils.disk_cache import DEFAULT_MAX_BYTES, DiskCache, default_cache_dir
+
+BUILD_CACHE_VERSION = 1
+
+# Runtime linked into every program (see compiler.compile_c_to_exe)
+C_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "C")
+RUNTIME_INCLUDE_DIR = os.path.join(C_DIR, "include")
+RUNTIME_SOURCE = os.path.join(C_DIR, "src", "draw_cursor.c")
+RUNTIME_FILES = (
+    os.path.join(RUNTIME_INCLUDE_DIR, "draw_cursor.h"),
+    os.path.join(RUNTIME_INCLUDE_DIR, "M_PI.h"),
+    RUNTIME_SOURCE,
+)
+
+
+def runtime_version(paths=RUNTIME_FILES):
+    """
+    Returns the SHA-256 of the runtime sources (a missing file counts as empty).
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            data = b""
+        digest.update(f"{os.path.basename(path)}\0{len(data)}\0".encode())
+        digest.update(data)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_version(compiler):
+    """
+    Returns the first line of `compiler --version` ("" if it cannot be run), once per process.
+    """
+    try:
+        result = subprocess.run([compiler, "--version"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    lines = result.stdout.splitlines()
+    return lines[0] if lines else ""
+
+
+class BuildCache:
+    """
+    Skips the C compilation of programs that were already built.
+    - Entries hold the bytes of an executable.
+    - The key is the SHA-256 of the C source, the compiler command (flags
+      included, file names excluded), the compiler version and the runtime
+      sources, so changing any of them never returns a stale executable.
+    - The runtime library is cached the same way, keyed by the runtime sources,
+      the compiler and its flags (see runtime_library).
+    - The directory is bounded like the AST cache: least recently used
+      entries are evicted first (see utils.disk_cache).
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initializes the cache.
+        Args:
+            directory: Cache folder (defaults to ~/.cache/drawpp/build, see utils.disk_cache).
+            max_bytes: Size limit before least recently used entries are evicted.
+        """
+        self.store = DiskCache(directory or default_cache_dir("build"), max_bytes)
+        self.hits = 0    # Number of builds served from the cache
+        self.misses = 0  # Number of builds that ran the compiler
+
+    @staticmethod
+    def key(c_source, command, runtime=None):
+        """
+        Returns the cache key of a build.
+        Args:
+            c_source: Generated C code.
+            command: Compiler followed by its flags, e.g. ["gcc", "-lSDL2", "-lm"].
+            runtime: Runtime version (defaults to runtime_version()).
+        """
+        digest = hashlib.sha256(f"drawpp-build-{BUILD_CACHE_VERSION}\0".encode())
+        for part in (*command, compiler_version(command[0]), runtime or runtime_version()):
+            digest.update(part.encode("utf-8") + b"\0")
+        digest.update(c_source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def restore(self, key, exe_file):
+        """
+        Writes the cached executable of `key` to `exe_file`; returns False on a miss.
+        """
+        data = self.store.get(key)
+        if data is None:
+            self.misses += 1
+            return False
+        # Replace the file instead of rewriting it: the previous executable may still be running
+        directory = os.path.dirname(os.path.abspath(exe_file))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.chmod(temp_path, 0o755)
+            os.replace(temp_path, exe_file)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def save(self, key, exe_file):
+        """
+        Stores a freshly built executable under `key`.
+        """
+        try:
+            with open(exe_file, "rb") as file:
+                data = file.read()
+            self.store.put(key, data)
+        except OSError:
+            pass  # The cache is an optimization only
+
+    def runtime_library(self, directory, compiler, flags=(), shared=False):
+        """
+        Copies the runtime compiled with `compiler` and `flags` into `directory` and
+        returns the path of the copy, building it only if the runtime sources changed
+        since the last build.
+        - A static archive (libdraw_cursor.a) by default: programs linked against it do
+          not depend on the cache directory once built.
+        - A shared library (libdraw_cursor.so) if `shared` is set, e.g. to load it with ctypes.
+        - The caller uses its own copy: another process filling the cache may evict
+          the cached library while it is being linked or loaded.
+        Raises subprocess.CalledProcessError (with the compiler messages in `stderr`)
+        if the runtime does not compile.
+        """
+        # Every key includes the runtime version: naming the kind of library is enough here
+        kind = "shared" if shared else "static"
+        key = self.key(f"draw_cursor runtime ({kind})", [compiler, *flags])
+        copy = os.path.join(directory, "libdraw_cursor.so" if shared else "libdraw_cursor.a")
+        if self.store.copy(key, copy):  # Also marks the library as recently used
+            self.hits += 1
+            return copy
+
+        self.misses += 1
+        with tempfile.TemporaryDirectory() as build_dir:
+            include = ["-I", RUNTIME_INCLUDE_DIR]
+            if shared:
+                library = os.path.join(build_dir, "libdraw_cursor.so")
+                commands = [[compiler, "-shared", "-fPIC", *flags, *include, RUNTIME_SOURCE,
+                             "-o", library, "-lSDL2", "-lm"]]
+            else:
+                objects = os.path.join(build_dir, "draw_cursor.o")
+                library = os.path.join(build_dir, "libdraw_cursor.a")
+                archiver = "gcc-ar" if "-flto" in flags else "ar"  # LTO objects need the GCC plugin
+                commands = [[compiler, "-c", *flags, *include, RUNTIME_SOURCE, "-o", objects],
+                            [archiver, "rcs", library, objects]]
+            for command in commands:
+                subprocess.run(command, check=True, capture_output=True, text=True)
+            with open(library, "rb") as file:
+                self.store.put(key, file.read())
+            shutil.copyfile(library, copy)
+        return copy
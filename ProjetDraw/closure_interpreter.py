@@ -0,0 +1,603 @@
+# closure_interpreter.py
+# Execution mode compiling the AST once into a tree of Python closures.
+import operator
+
+from interpreter import COMPARISON_OPERATORS, Interpreter, apply_arithmetic, apply_comparison, parse_number
+from resolver import Resolver
+from utils.ast_nodes import Node, NodeKind
+from utils.colors import DEFAULT_COLOR
+from utils.tokens import TokenType
+
+# Arithmetic operators that need no C-specific handling
+FAST_ARITHMETIC_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+}
+
+# Division and modulo of non-negative integers, where Python and C agree
+INTEGER_ARITHMETIC_OPERATORS = {
+    TokenType.DIVIDE: operator.floordiv,
+    TokenType.MODULO: operator.mod,
+}
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Interpreter that compiles every node once into a closure, then runs the closures.
+    - Literals are converted to numbers and operators and handlers are resolved at
+      compile time, so running a loop body only calls closures.
+    - Variables and cursors are resolved to slots (see resolver.py) and stored in
+      flat lists indexed by slot, None marking an undeclared slot; `variables` and
+      `cursors` are filled with the top-level names at the end of the run.
+    - Produces the same state, draw commands and errors as Interpreter and shares
+      its execution budget; statements are counted once per block instead of one
+      by one, so a run over budget may stop a few statements earlier.
+    """
+    # Statement node kind -> name of the method compiling it
+    STATEMENT_COMPILERS = {
+        NodeKind.CURSOR_DECLARATION: "compile_cursor_declaration",
+        NodeKind.VARIABLE_DECLARATION: "compile_variable_declaration",
+        NodeKind.VARIABLE_UPDATE: "compile_variable_update",
+        NodeKind.SET_POSITION: "compile_set_position",
+        NodeKind.SET_COLOR: "compile_set_color",
+        NodeKind.SET_THICKNESS: "compile_set_thickness",
+        NodeKind.MOVE: "compile_move",
+        NodeKind.ROTATE: "compile_rotate",
+        NodeKind.DRAW_LINE: "compile_draw_line",
+        NodeKind.DRAW_SQUARE: "compile_draw_square",
+        NodeKind.DRAW_CIRCLE: "compile_draw_circle",
+        NodeKind.DRAW_POINT: "compile_draw_point",
+        NodeKind.DRAW_ARC: "compile_draw_arc",
+        NodeKind.IF_STATEMENT: "compile_if_statement",
+        NodeKind.WHILE_LOOP: "compile_while_loop",
+        NodeKind.FOR_LOOP: "compile_for_loop",
+        NodeKind.BLOCK: "compile_block",
+        NodeKind.CONDITION: "compile_condition",
+    }
+
+    def __init__(self, syntax_tree, **options):
+        """
+        Initializes the interpreter (same options as Interpreter).
+        The program is compiled on the first call to execute().
+        """
+        super().__init__(syntax_tree, **options)
+        self.compiled = None  # One closure per top-level statement
+        self.variable_resolver = Resolver()
+        self.cursor_resolver = Resolver()
+        self.variable_slots = []  # Slot -> value of the variable (None if not declared)
+        self.cursor_slots = []    # Slot -> cursor state (None if not declared)
+
+    def execute(self):
+        """
+        Compiles the AST if needed, then runs the top-level closures.
+        """
+        if self.compiled is None:
+            self.compiled = [self.compile_statement(node) for node in self.syntax_tree]
+
+        # The closures hold these lists: clear them in place
+        self.variable_slots[:] = [None] * self.variable_resolver.slot_count
+        self.cursor_slots[:] = [None] * self.cursor_resolver.slot_count
+        count_step = self.count_step
+
+        def run(statement):
+            count_step()
+            statement()
+
+        self.start_budget()
+        self.run_statements(self.compiled, run)
+        self.variables = self.declared(self.variable_resolver, self.variable_slots)
+        self.cursors = self.declared(self.cursor_resolver, self.cursor_slots)
+
+    @staticmethod
+    def declared(resolver, slots):
+        """
+        Returns the top-level names of `resolver` that hold a value in `slots`.
+        """
+        return {name: slots[slot] for name, slot in resolver.global_slots().items() if slots[slot] is not None}
+
+    # --- Helpers ---
+    def fail(self, exception):
+        """
+        Returns a closure raising `exception`, for nodes that are only invalid at run time.
+        """
+        def raise_error():
+            raise exception
+        return raise_error
+
+    def report(self, message, result=None):
+        """
+        Returns a closure recording the error `message` and returning `result`.
+        """
+        errors = self.errors
+
+        def record_error():
+            errors.append(message)
+            return result
+        return record_error
+
+    # --- Expressions ---
+    def compile_expression(self, node):
+        """
+        Compiles an expression node into a closure returning its value (None on error).
+        """
+        if not isinstance(node, Node):
+            return self.report(f"Invalid value node: {node}")
+
+        kind = node.kind
+        if kind == NodeKind.VALUE:
+            try:
+                constant = parse_number(node.value)  # Converted once, at compile time
+            except ValueError:
+                return self.report(f"Invalid value for VALUE type: {node.value}")
+            return lambda: constant
+
+        elif kind == NodeKind.VARIABLE:
+            return self.compile_variable(node.name)
+
+        elif kind == NodeKind.UNARY:
+            operand = self.compile_expression(node.operand)
+
+            def negate():
+                value = operand()
+                return None if value is None else -value
+            return negate
+
+        elif kind == NodeKind.EXPRESSION:
+            return self.compile_binary_operation(node)
+
+        return self.report(f"Unknown value type: {node}")
+
+    def compile_variable(self, name):
+        """
+        Compiles a variable reference to a read of its slot.
+        """
+        slot = self.variable_resolver.lookup(name)
+        if slot is None:
+            return self.report(f"Variable '{name}' is not declared.")
+        variables = self.variable_slots
+        errors = self.errors
+
+        def variable():
+            value = variables[slot]
+            if value is None:
+                errors.append(f"Variable '{name}' is not declared.")
+            return value
+        return variable
+
+    def compile_binary_operation(self, node):
+        """
+        Compiles an arithmetic operation.
+        - + - * map directly to Python operators; / and % on non-negative integers
+          map to // and %, other operands keep the C semantics of apply_arithmetic.
+        - A literal right operand is inlined instead of being called.
+        """
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        constant = self.literal(node.right)
+        arithmetic_operator = node.operator
+        fast_operator = FAST_ARITHMETIC_OPERATORS.get(arithmetic_operator)
+
+        if fast_operator is not None:
+            if constant is not None:
+                def constant_operation():
+                    left_value = left()
+                    if left_value is None:
+                        return None
+                    return fast_operator(left_value, constant)
+                return constant_operation
+
+            def binary_operation():
+                left_value = left()
+                right_value = right()
+                if left_value is None or right_value is None:
+                    return None
+                return fast_operator(left_value, right_value)
+            return binary_operation
+
+        errors = self.errors
+        integer_operator = INTEGER_ARITHMETIC_OPERATORS.get(arithmetic_operator)
+
+        def c_operation():
+            left_value = left()
+            right_value = right()
+            if left_value is None or right_value is None:
+                return None
+            if (integer_operator is not None and type(left_value) is int and type(right_value) is int
+                    and left_value >= 0 and right_value > 0):
+                return integer_operator(left_value, right_value)  # Same result as C truncation
+            try:
+                return apply_arithmetic(arithmetic_operator, left_value, right_value)
+            except (ValueError, ZeroDivisionError) as e:
+                errors.append(str(e))
+                return None
+        return c_operation
+
+    @staticmethod
+    def literal(node):
+        """
+        Returns the number of a literal node, or None if `node` is not a valid literal.
+        """
+        if isinstance(node, Node) and node.kind == NodeKind.VALUE:
+            try:
+                return parse_number(node.value)
+            except ValueError:
+                return None
+        return None
+
+    def compile_numeric(self, node):
+        """
+        Compiles an expression that must produce a number (see extract_numeric_value).
+        """
+        value = self.compile_expression(node)
+
+        def numeric():
+            result = value()
+            if not isinstance(result, (int, float)):
+                raise ValueError(f"Expected a numeric value, got: {node}")
+            return result
+        return numeric
+
+    def compile_condition(self, node):
+        """
+        Compiles a condition node into a closure returning a boolean.
+        """
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+        condition_operator = node.operator
+        comparison = COMPARISON_OPERATORS.get(condition_operator)
+        if comparison is None:
+            comparison = lambda left_value, right_value: apply_comparison(condition_operator, left_value, right_value)
+
+        constant = self.literal(node.right)
+        if constant is not None:
+            def constant_condition():
+                left_value = left()
+                if left_value is None:
+                    raise ValueError(f"Invalid operand in condition: {node}")
+                return comparison(left_value, constant)
+            return constant_condition
+
+        def condition():
+            left_value = left()
+            right_value = right()
+            if left_value is None or right_value is None:
+                raise ValueError(f"Invalid operand in condition: {node}")
+            return comparison(left_value, right_value)
+        return condition
+
+    # --- Statements ---
+    def compile_statement(self, node):
+        """
+        Compiles a statement node with the method registered for its kind.
+        """
+        if not isinstance(node, Node):
+            return self.fail(ValueError(f"Invalid node: {node}"))
+        name = self.STATEMENT_COMPILERS.get(node.kind)
+        if name is None:
+            return self.fail(ValueError(f"Unknown node kind: {node.kind.name}"))
+        return getattr(self, name)(node)
+
+    def compile_cursor_command(self, node, apply, *operands):
+        """
+        Compiles a cursor method: looks the cursor up, evaluates the operands and
+        calls the matching apply_* method of Interpreter.
+        """
+        cursor_name = node.cursor
+        slot = self.cursor_resolver.lookup(cursor_name)
+        if slot is None:
+            return self.report(f"Cursor '{cursor_name}' is not declared.")
+        cursors = self.cursor_slots
+        errors = self.errors
+
+        if len(operands) == 1:
+            (operand,) = operands
+
+            def cursor_command():
+                cursor = cursors[slot]
+                if cursor is None:
+                    errors.append(f"Cursor '{cursor_name}' is not declared.")
+                    return
+                try:
+                    apply(cursor, cursor_name, operand())
+                except ValueError as e:
+                    errors.append(str(e))
+            return cursor_command
+
+        def cursor_command():
+            cursor = cursors[slot]
+            if cursor is None:
+                errors.append(f"Cursor '{cursor_name}' is not declared.")
+                return
+            try:
+                apply(cursor, cursor_name, *[operand() for operand in operands])
+            except ValueError as e:
+                errors.append(str(e))
+        return cursor_command
+
+    def compile_set_position(self, node):
+        return self.compile_cursor_command(
+            node, self.apply_set_position, self.compile_expression(node.x), self.compile_expression(node.y)
+        )
+
+    def compile_set_thickness(self, node):
+        return self.compile_cursor_command(node, self.apply_set_thickness, self.compile_numeric(node.thickness))
+
+    def compile_move(self, node):
+        return self.compile_cursor_command(node, self.apply_move, self.compile_expression(node.distance))
+
+    def compile_rotate(self, node):
+        return self.compile_cursor_command(node, self.apply_rotate, self.compile_expression(node.angle))
+
+    def compile_draw_line(self, node):
+        return self.compile_cursor_command(node, self.apply_draw_line, self.compile_expression(node.length))
+
+    def compile_draw_square(self, node):
+        return self.compile_cursor_command(node, self.apply_draw_square, self.compile_expression(node.side_length))
+
+    def compile_draw_circle(self, node):
+        return self.compile_cursor_command(node, self.apply_draw_circle, self.compile_expression(node.radius))
+
+    def compile_draw_arc(self, node):
+        return self.compile_cursor_command(
+            node, self.apply_draw_arc, self.compile_expression(node.radius), self.compile_expression(node.angle)
+        )
+
+    def compile_set_color(self, node):
+        color = node.color
+        return self.compile_cursor_command(node, self.apply_set_color, lambda: color)
+
+    def compile_draw_point(self, node):
+        cursor_name = node.cursor
+        slot = self.cursor_resolver.lookup(cursor_name)
+        if slot is None:
+            return self.report(f"Cursor '{cursor_name}' is not declared.")
+        cursors = self.cursor_slots
+        errors = self.errors
+        apply_draw_point = self.apply_draw_point
+
+        def draw_point():
+            cursor = cursors[slot]
+            if cursor is None:
+                errors.append(f"Cursor '{cursor_name}' is not declared.")
+                return
+            apply_draw_point(cursor)
+        return draw_point
+
+    def compile_cursor_declaration(self, node):
+        """
+        Compiles a cursor declaration; each run creates a new cursor state.
+        """
+        cursor_name = node.name
+        if not cursor_name:
+            return self.report("Missing cursor name in CURSOR_DECLARATION.")
+        slot = self.cursor_resolver.declare(cursor_name)
+        cursors = self.cursor_slots
+        errors = self.errors
+
+        def declare_cursor():
+            if cursors[slot] is not None:
+                errors.append(f"Cursor '{cursor_name}' is already declared.")
+            else:
+                cursors[slot] = {"position": (0, 0), "color": DEFAULT_COLOR, "thickness": 1, "angle": 0.0}
+        return declare_cursor
+
+    def compile_variable_declaration(self, node, shadow=False):
+        """
+        Compiles a variable declaration (`shadow`: see Resolver.declare).
+        """
+        var_name = node.name
+        if not var_name:
+            return self.report("Variable declaration missing variable name.")
+        variables = self.variable_slots
+        errors = self.errors
+
+        if isinstance(node.value, Node):
+            value = self.compile_expression(node.value)
+        else:
+            value = None
+        slot = self.variable_resolver.declare(var_name, shadow)  # After the value, as in C
+
+        def declare_variable():
+            if variables[slot] is not None:
+                errors.append(f"Variable '{var_name}' is already declared.")
+                return
+            if value is None:
+                errors.append(f"Invalid value in declaration of variable '{var_name}'.")
+                return
+            var_value = value()
+            if var_value is None:
+                errors.append(f"Unable to extract value for variable '{var_name}'.")
+                return
+            variables[slot] = var_value
+        return declare_variable
+
+    def compile_variable_update(self, node):
+        """
+        Compiles ++, --, += and -=.
+        """
+        var_name = node.name
+        if not var_name:
+            return self.report("Update step missing variable name.")
+        slot = self.variable_resolver.lookup(var_name)
+        if slot is None:
+            return self.report(f"Variable '{var_name}' is not declared.")
+        variables = self.variable_slots
+        errors = self.errors
+        update_operator = node.operator
+
+        if update_operator in (TokenType.PLUS_PLUS, TokenType.MINUS_MINUS):
+            step = 1 if update_operator == TokenType.PLUS_PLUS else -1
+
+            def increment():
+                if variables[slot] is None:
+                    errors.append(f"Variable '{var_name}' is not declared.")
+                    return
+                variables[slot] += step
+            return increment
+
+        sign = {TokenType.PLUS_EQUAL: 1, TokenType.MINUS_EQUAL: -1}.get(update_operator)
+        constant = self.literal(node.value) if node.value is not None else 1
+        if sign is not None and constant is not None:
+            step = constant if sign == 1 else -constant
+
+            def constant_update():
+                if variables[slot] is None:
+                    errors.append(f"Variable '{var_name}' is not declared.")
+                    return
+                variables[slot] += step
+            return constant_update
+
+        value = self.compile_expression(node.value) if node.value is not None else (lambda: 1)
+
+        def update_variable():
+            if variables[slot] is None:
+                errors.append(f"Variable '{var_name}' is not declared.")
+                return
+            update_value = value()
+            if update_value is None:
+                errors.append(f"Invalid update value for variable '{var_name}'.")
+            elif sign == 1:
+                variables[slot] += update_value
+            elif sign == -1:
+                variables[slot] -= update_value
+            else:
+                errors.append(f"Unknown update operator '{update_operator}' for variable '{var_name}'.")
+        return update_variable
+
+    def compile_block(self, node):
+        """
+        Compiles a block; declarations made in the block are dropped at its end.
+        """
+        if not isinstance(node, Node) or node.kind != NodeKind.BLOCK:
+            return self.fail(ValueError(f"Invalid block: {node}"))
+        if not isinstance(node.statements, list):
+            return self.report("Each 'BLOCK' must have its statements as a list.")
+
+        statements = []
+        count = 0  # Statements counted against the budget on each run
+        self.variable_resolver.push_scope()
+        self.cursor_resolver.push_scope()
+        for statement in node.statements:
+            if isinstance(statement, Node):
+                statements.append(self.compile_statement(statement))
+                count += 1
+            else:
+                statements.append(self.report(f"Invalid statement in BLOCK: {statement}"))
+        variable_slots = self.variable_resolver.pop_scope()
+        cursor_slots = self.cursor_resolver.pop_scope()
+
+        count_step = self.count_step
+        if not variable_slots and not cursor_slots:
+            def block():
+                count_step(count)
+                for statement in statements:
+                    statement()
+            return block
+
+        variables = self.variable_slots
+        cursors = self.cursor_slots
+
+        def scoped_block():
+            # Slots empty on entry are declared by the block (a slot already holding
+            # a value belongs to an enclosing declaration and is left untouched)
+            variables_declared = [slot for slot in variable_slots if variables[slot] is None]
+            cursors_declared = [slot for slot in cursor_slots if cursors[slot] is None]
+            try:
+                count_step(count)
+                for statement in statements:
+                    statement()
+            finally:
+                for slot in variables_declared:
+                    variables[slot] = None
+                for slot in cursors_declared:
+                    cursors[slot] = None
+        return scoped_block
+
+    def compile_loop_condition(self, condition, loop_type):
+        """
+        Compiles the condition of a loop, which must be a CONDITION node.
+        """
+        if not isinstance(condition, Node) or condition.kind != NodeKind.CONDITION:
+            return self.fail(ValueError(f"Missing or invalid condition in {loop_type}."))
+        return self.compile_condition(condition)
+
+    def compile_while_loop(self, node):
+        """
+        Compiles a while loop; each iteration counts against the budget.
+        """
+        body = node.body
+        if not isinstance(body, Node) or body.kind != NodeKind.BLOCK:
+            return self.report("WHILE_LOOP body must be a BLOCK.")
+        condition = self.compile_loop_condition(node.condition, "WHILE_LOOP")
+        body = self.compile_block(body)
+        count_step = self.count_step
+
+        def while_loop():
+            while True:
+                count_step()
+                if not condition():
+                    break
+                body()
+        return while_loop
+
+    def compile_for_loop(self, node):
+        """
+        Compiles a for loop; its variable is scoped to the loop (see check_for_loop).
+        """
+        init = node.init
+        if not isinstance(init, Node) or init.kind != NodeKind.VARIABLE_DECLARATION:
+            return self.report("Invalid or missing initialization in FOR_LOOP.")
+        update = node.update
+        if not isinstance(update, Node) or update.kind != NodeKind.VARIABLE_UPDATE:
+            return self.report("Invalid or missing update in FOR_LOOP.")
+        body = node.body
+        if not isinstance(body, Node) or body.kind != NodeKind.BLOCK:
+            return self.report("FOR_LOOP body must be a BLOCK.")
+
+        # The loop variable gets its own slot, which shadows a variable of the same name
+        self.variable_resolver.push_scope()
+        declare = self.compile_variable_declaration(init, shadow=True)
+        slot = self.variable_resolver.lookup(init.name)
+        if slot is None:
+            self.variable_resolver.pop_scope()
+            return declare  # Reports the missing name
+        condition = self.compile_loop_condition(node.condition, "FOR_LOOP")
+        body = self.compile_block(body)
+        update = self.compile_variable_update(update)
+        self.variable_resolver.pop_scope()
+        variables = self.variable_slots
+        count_step = self.count_step
+
+        def for_loop():
+            try:
+                declare()
+                if variables[slot] is None:
+                    return  # Invalid initial value, already reported
+                while True:
+                    count_step()
+                    if not condition():
+                        break
+                    body()
+                    update()
+            finally:
+                variables[slot] = None
+        return for_loop
+
+    def compile_if_statement(self, node):
+        """
+        Compiles an if statement with its optional else block.
+        """
+        if not isinstance(node.condition, Node) or node.condition.kind != NodeKind.CONDITION:
+            return self.report(f"Missing or invalid condition in IF_STATEMENT: {node}")
+        condition = self.compile_condition(node.condition)
+        true_block = self.compile_block(node.true_block) if node.true_block else None
+        false_block = self.compile_block(node.false_block) if node.false_block else None
+
+        def if_statement():
+            if condition():
+                if true_block is not None:
+                    true_block()
+            elif false_block is not None:
+                false_block()
+        return if_statement
@@ -0,0 +1,232 @@
+# display_list.py
+# Flat, array-backed display list: the drawing produced by a program, evaluated
+# once by the interpreter and rendered any number of times (raster, SVG) at any scale.
+import math
+import struct
+import sys
+from array import array
+
+PRIMITIVES = ("point", "line", "square", "circle", "arc")  # Primitive kind -> command name
+PRIMITIVE_KINDS = {name: kind for kind, name in enumerate(PRIMITIVES)}
+
+# Geometry of each primitive kind (see Interpreter.emit), stored in GEOMETRY_WIDTH
+# slots padded with zeros: all values are integers except the arc angles
+GEOMETRY_WIDTH = 5
+GEOMETRY_SIZES = (2, 4, 3, 3, 5)
+INTEGER_SIZES = (2, 4, 3, 3, 3)  # Leading values that are pixel coordinates or lengths
+PADDING = tuple((0.0,) * (GEOMETRY_WIDTH - size) for size in GEOMETRY_SIZES)
+
+SERIAL_MAGIC = b"DRAWDL1\0"
+SERIAL_HEADER = struct.Struct("<8sII")  # Magic, primitive count, palette size
+
+
+class DisplayList:
+    """
+    Sequence of drawing primitives kept in parallel arrays:
+    - `kinds`: primitive kind (index in PRIMITIVES)
+    - `colors`: index of the RGBA color in `palette`
+    - `thicknesses`: line thickness
+    - `geometry`: GEOMETRY_WIDTH coordinates per primitive
+    Iterating yields the commands as (name, color, thickness, *geometry) tuples,
+    the format produced by Interpreter.emit and read by the renderers.
+    """
+    def __init__(self):
+        self.kinds = array("B")
+        self.colors = array("H")
+        self.thicknesses = array("I")
+        self.geometry = array("d")
+        self.palette = []         # Color index -> RGBA tuple
+        self.color_indexes = {}   # RGBA tuple -> color index
+
+    def append(self, command, color, thickness, *geometry):
+        """
+        Adds a primitive.
+        """
+        kind = PRIMITIVE_KINDS.get(command)
+        if kind is None:
+            raise ValueError(f"Unknown draw command: {command}")
+        if len(geometry) != GEOMETRY_SIZES[kind]:
+            raise ValueError(f"Draw command '{command}' expects {GEOMETRY_SIZES[kind]} values, got {len(geometry)}.")
+        color_index = self.color_indexes.get(color)
+        if color_index is None:
+            color_index = self.color_index(color)
+        self.kinds.append(kind)
+        self.colors.append(color_index)
+        self.thicknesses.append(thickness)
+        self.geometry.extend(geometry + PADDING[kind])
+
+    def color_index(self, color):
+        """
+        Returns the palette index of an RGBA color, adding it if needed.
+        """
+        color = tuple(color)
+        index = self.color_indexes.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.color_indexes[color] = index
+        return index
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        kind = self.kinds[index]
+        start = index * GEOMETRY_WIDTH
+        values = self.geometry[start:start + GEOMETRY_SIZES[kind]]
+        integers = INTEGER_SIZES[kind]
+        geometry = tuple(int(value) for value in values[:integers]) + tuple(values[integers:])
+        return (PRIMITIVES[kind], self.palette[self.colors[index]], self.thicknesses[index]) + geometry
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, DisplayList):
+            return NotImplemented
+        return len(self) == len(other) and not self.diff(other)
+
+    def __repr__(self):
+        return f"DisplayList({list(self)!r})"
+
+    # --- Serialization ---
+    def to_bytes(self):
+        """
+        Serializes the display list (little-endian arrays after a fixed header).
+        """
+        arrays = [self.kinds, self.colors, self.thicknesses, self.geometry]
+        if sys.byteorder == "big":
+            arrays = [array(values.typecode, values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        palette = bytes(channel for color in self.palette for channel in color)
+        return SERIAL_HEADER.pack(SERIAL_MAGIC, len(self), len(self.palette)) + palette + b"".join(
+            values.tobytes() for values in arrays
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Rebuilds a display list serialized by to_bytes().
+        """
+        magic, count, palette_size = SERIAL_HEADER.unpack_from(data)
+        if magic != SERIAL_MAGIC:
+            raise ValueError("Not a serialized display list.")
+        display_list = cls()
+        offset = SERIAL_HEADER.size
+        for index in range(palette_size):
+            display_list.color_index(tuple(data[offset + 4 * index:offset + 4 * index + 4]))
+        offset += 4 * palette_size
+
+        for values, length in ((display_list.kinds, count), (display_list.colors, count),
+                               (display_list.thicknesses, count), (display_list.geometry, count * GEOMETRY_WIDTH)):
+            size = length * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            offset += size
+        if offset != len(data):
+            raise ValueError("Truncated or corrupted display list.")
+        return display_list
+
+    # --- Comparison and transformation ---
+    def diff(self, other):
+        """
+        Returns the indexes of the primitives that differ between two display lists
+        (including the primitives only one of them has).
+        """
+        common = min(len(self), len(other))
+        changed = [index for index in range(common) if self[index] != other[index]]
+        changed.extend(range(common, max(len(self), len(other))))
+        return changed
+
+    def scaled(self, factor):
+        """
+        Returns a copy with coordinates, lengths and thicknesses multiplied by `factor`
+        (rounded to whole pixels); arc angles are unchanged.
+        """
+        display_list = DisplayList()
+        display_list.kinds = array("B", self.kinds)
+        display_list.colors = array("H", self.colors)
+        display_list.palette = list(self.palette)
+        display_list.color_indexes = dict(self.color_indexes)
+        display_list.thicknesses = array("I", (max(1, round(thickness * factor)) for thickness in self.thicknesses))
+
+        geometry = array("d", self.geometry)
+        for index, kind in enumerate(self.kinds):
+            start = index * GEOMETRY_WIDTH
+            for position in range(start, start + INTEGER_SIZES[kind]):
+                geometry[position] = round(geometry[position] * factor)
+        display_list.geometry = geometry
+        return display_list
+
+    def replay(self, renderer):
+        """
+        Draws the primitives with a renderer having a render(draw_commands) method
+        (e.g. renderer.RasterRenderer) and returns its result.
+        """
+        return renderer.render(self)
+
+    # --- SVG export ---
+    def to_svg(self, width=800, height=600, background=(255, 255, 255, 255)):
+        """
+        Returns the drawing as an SVG document of the given size.
+        """
+        lines = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">',
+            f'<rect width="100%" height="100%" {svg_paint("fill", background)}/>',
+        ]
+        for command, color, thickness, *geometry in self:
+            stroke = f'fill="none" {svg_paint("stroke", color)} stroke-width="{thickness}"'
+            if command == "point":
+                x, y = geometry
+                lines.append(f'<rect x="{x}" y="{y}" width="{thickness}" height="{thickness}" '
+                             f'{svg_paint("fill", color)}/>')
+            elif command == "line":
+                x1, y1, x2, y2 = geometry
+                lines.append(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" {stroke}/>')
+            elif command == "square":
+                x, y, size = geometry
+                lines.append(f'<rect x="{x}" y="{y}" width="{size}" height="{size}" {stroke}/>')
+            elif command == "circle":
+                cx, cy, radius = geometry
+                lines.append(f'<circle cx="{cx}" cy="{cy}" r="{radius}" {stroke}/>')
+            elif command == "arc":
+                lines.append(f'<path d="{svg_arc_path(*geometry)}" {stroke}/>')
+        lines.append("</svg>")
+        return "\n".join(lines) + "\n"
+
+
+def svg_paint(attribute, color):
+    """
+    Returns the SVG attributes painting `attribute` ("fill" or "stroke") with an RGBA color.
+    """
+    r, g, b, a = color
+    paint = f'{attribute}="#{r:02x}{g:02x}{b:02x}"'
+    if a != 255:
+        paint += f' {attribute}-opacity="{a / 255:.3f}"'
+    return paint
+
+
+def svg_arc_path(cx, cy, radius, start_angle, end_angle):
+    """
+    Returns the SVG path of an arc going from start_angle to end_angle (degrees, y axis down).
+    """
+    sweep = end_angle - start_angle
+    if sweep <= 0:
+        return f"M {cx} {cy}"
+    if sweep >= 360:
+        # A single arc command cannot draw a full circle: use two half circles
+        return (f"M {cx + radius} {cy} A {radius} {radius} 0 1 1 {cx - radius} {cy} "
+                f"A {radius} {radius} 0 1 1 {cx + radius} {cy}")
+
+    def point(angle):
+        radians = math.radians(angle)
+        return f"{cx + radius * math.cos(radians):.2f} {cy + radius * math.sin(radians):.2f}"
+
+    large_arc = 1 if sweep > 180 else 0
+    return f"M {point(start_angle)} A {radius} {radius} 0 {large_arc} 1 {point(end_angle)}"
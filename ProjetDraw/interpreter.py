@@ -1,209 +1,371 @@
-from lexer import Lexer
-from utils.tokens import Token
+import math
+import operator
+import time
 from utils.tokens import TokenType
-from parser import Parser
+from utils.tracing import Tracer
+from display_list import DisplayList
+from utils.colors import COLORS, DEFAULT_COLOR
+from utils.ast_nodes import (
+    Block, Condition, CursorDeclaration, DrawLine, IfStatement, Node, NodeKind, SetPosition, Value,
+    Variable, VariableDeclaration, VariableUpdate, WhileLoop,
+)
+
+DEFAULT_MAX_STEPS = 1_000_000  # Statements and loop iterations allowed per run
+DEFAULT_TIMEOUT = 5.0          # Seconds allowed per run
+TIMEOUT_CHECK_INTERVAL = 1024  # Steps between two reads of the clock
+
+# Comparison operators of conditions
+COMPARISON_OPERATORS = {
+    TokenType.EQUAL: operator.eq,
+    TokenType.NOT_EQUAL: operator.ne,
+    TokenType.LESS_THAN: operator.lt,
+    TokenType.GREATER_THAN: operator.gt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+def parse_number(text):
+    """
+    Converts a numeric literal to an int, or to a float if it has a decimal part.
+    """
+    if isinstance(text, (int, float)):
+        return text
+    if "." in text:
+        return float(text)
+    return int(text)
+
+
+def apply_arithmetic(operator, left, right):
+    """
+    Applies a binary arithmetic operator with C semantics.
+    - Integer division and modulo truncate toward zero, as in the generated C code.
+    """
+    if operator == TokenType.PLUS:
+        return left + right
+    elif operator == TokenType.MINUS:
+        return left - right
+    elif operator == TokenType.MULTIPLY:
+        return left * right
+    elif operator in (TokenType.DIVIDE, TokenType.MODULO):
+        if right == 0:
+            raise ZeroDivisionError("Division by zero in expression.")
+        if isinstance(left, float) or isinstance(right, float):
+            return left / right if operator == TokenType.DIVIDE else math.fmod(left, right)
+        quotient = abs(left) // abs(right)
+        if (left < 0) != (right < 0):
+            quotient = -quotient
+        return quotient if operator == TokenType.DIVIDE else left - right * quotient
+    raise ValueError(f"Invalid arithmetic operator: {operator}")
+
+
+def apply_comparison(operator, left, right):
+    """
+    Applies a comparison operator of a condition.
+    """
+    comparison = COMPARISON_OPERATORS.get(operator)
+    if comparison is None:
+        raise ValueError(f"Invalid operator in condition: {operator}")
+    return comparison(left, right)
+
+
+class ExecutionLimitError(RuntimeError):
+    """
+    Raised when a run exceeds its step budget or its wall-clock timeout.
+    It aborts the whole execution instead of only the current statement.
+    """
+
 
 class Interpreter:
-    def __init__(self, syntax_tree):
+    # Statement node kind -> name of the method executing it
+    NODE_HANDLERS = {
+        NodeKind.CURSOR_DECLARATION: "declare_cursor",
+        NodeKind.VARIABLE_DECLARATION: "declare_variable",
+        NodeKind.VARIABLE_UPDATE: "update_variable",
+        NodeKind.SET_POSITION: "check_set_position",
+        NodeKind.SET_COLOR: "check_set_color",
+        NodeKind.SET_THICKNESS: "check_set_thickness",
+        NodeKind.MOVE: "check_move",
+        NodeKind.ROTATE: "check_rotate",
+        NodeKind.DRAW_LINE: "check_draw_line",
+        NodeKind.DRAW_SQUARE: "check_draw_square",
+        NodeKind.DRAW_CIRCLE: "check_draw_circle",
+        NodeKind.DRAW_POINT: "check_draw_point",
+        NodeKind.DRAW_ARC: "check_draw_arc",
+        NodeKind.IF_STATEMENT: "check_if_statement",
+        NodeKind.WHILE_LOOP: "check_while_loop",
+        NodeKind.FOR_LOOP: "check_for_loop",
+        NodeKind.BLOCK: "check_block",
+        NodeKind.CONDITION: "check_condition",
+    }
+
+    def __init__(self, syntax_tree, tracer=None, max_steps=DEFAULT_MAX_STEPS, timeout=DEFAULT_TIMEOUT):
         """
         Initializes the Interpreter with the syntax tree (AST).
         Tracks declared variables, cursors, and detected errors.
+        Debug events go to `tracer` (see utils.tracing), off unless DRAWPP_TRACE is set.
+        - `max_steps` bounds the number of executed statements and loop iterations,
+          `timeout` the duration of `execute()` in seconds (None disables either limit).
         """
         self.syntax_tree = syntax_tree
         self.variables = {}  # Stores variables and their values
         self.cursors = {}    # Stores declared cursors
         self.errors = []     # List of detected errors
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.draw_commands = DisplayList()  # Drawing produced by the program, in order (see emit)
+
+        # Execution budget
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.steps = 0         # Statements and loop iterations executed so far
+        self.deadline = None   # perf_counter() value after which execution stops
+        self.next_check = 0    # Step count at which the limits are checked next
+
+        # Bound handlers indexed by node kind (None for kinds that are not statements)
+        self.node_handlers = [None] * len(NodeKind)
+        for kind, name in self.NODE_HANDLERS.items():
+            self.node_handlers[kind] = getattr(self, name)
 
     def execute(self):
         """
         Iterates through the AST and processes each node.
-        Accumulates errors encountered during execution.
+        Accumulates errors encountered during execution; exceeding the step budget
+        or the timeout stops the run.
+        """
+        self.start_budget()
+        self.run_statements(self.syntax_tree, self.execute_node)
+
+    def run_statements(self, statements, run):
         """
-        for node in self.syntax_tree:
+        Runs the top-level statements with `run`, recording errors.
+        An error aborts only its statement, except ExecutionLimitError which ends the run.
+        """
+        for statement in statements:
             try:
-                self.execute_node(node)
+                run(statement)
+            except ExecutionLimitError as e:
+                self.errors.append(str(e))
+                break
             except Exception as e:
                 self.errors.append(str(e))
         
-        # Print errors if any were found
-        if self.errors:
-            print("Errors detected:")
-            for error in self.errors:
-                print(f" - {error}")
-        else:
-            print("No errors detected!")
+        # Trace the outcome; callers report self.errors themselves
+        if self.tracer.enabled:
+            self.tracer.record("execute_done", steps=self.steps, errors=list(self.errors))
 
     def execute_node(self, node):
         """
-        Executes a node based on its type.
-        Each type is handled by its corresponding method.
+        Executes a node with the handler registered for its kind.
+        The handler is found by indexing a list with the node kind (constant cost).
         """
-        if "type" not in node:
-            raise ValueError(f"Missing 'type' in node: {node}")
-    
-        node_type = node["type"]
-        
-        if node_type == "CURSOR_DECLARATION":
-            self.declare_cursor(node)
-        elif node_type == "VARIABLE_DECLARATION":
-            self.declare_variable(node)
-        elif node_type == "SET_POSITION":
-            self.check_set_position(node)
-        elif node_type == "SET_COLOR":
-            self.check_set_color(node)
-        elif node_type == "SET_THICKNESS":
-            self.check_set_thickness(node)
-        elif node_type == "MOVE":
-            self.check_move(node)
-        elif node_type == "ROTATE":
-            self.check_rotate(node)
-        elif node_type == "DRAW_LINE":
-            self.check_draw_line(node)
-        elif node_type == "DRAW_CIRCLE":
-            self.check_draw_circle(node)
-        elif node_type == "DRAW_SQUARE":
-            self.check_draw_square(node)
-        elif node_type == "DRAW_TRIANGLE":
-            self.check_draw_triangle(node)
-        elif node_type == "DRAW_RECTANGLE":
-            self.check_draw_rectangle(node)
-        elif node_type == "CONDITION":
-            self.check_condition(node)
-        elif node_type == "DRAW_POINT":
-            self.check_draw_point(node)
-        elif node_type == "DRAW_ARC":
-            self.check_draw_arc(node)
-        elif node_type == "VARIABLE_UPDATE":
-            self.update_variable(node)
-        elif node_type == "FOR_LOOP":
-            self.check_for_loop(node)
-        elif node_type == "WHILE_LOOP":
-            self.check_while_loop(node)
-        elif node_type == "IF_STATEMENT":
-            self.check_if_statement(node)
-        elif node_type == "FUNCTION_CALL":
-            self.check_function_call(node)
-        elif node_type == "BLOCK":
-            self.check_block(node)
-        else:
-            raise ValueError(f"Unknown node type: {node_type}")
-        
+        self.count_step()
+        try:
+            handler = self.node_handlers[node.kind]
+        except (AttributeError, TypeError):
+            raise ValueError(f"Invalid node: {node}")
+        if handler is None:
+            raise ValueError(f"Unknown node kind: {node.kind.name}")
+        handler(node)
+
+    # --- Execution budget ---
+    def start_budget(self):
+        """
+        Resets the step counter and starts the timeout clock of a run.
+        """
+        self.steps = 0
+        self.deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        self.next_check = 0  # Step count at which the limits are checked next
+
+    def count_step(self, count=1):
+        """
+        Counts statements or loop iterations against the execution budget.
+        The limits (and the clock) are only checked every TIMEOUT_CHECK_INTERVAL steps
+        or when the step limit is reached.
+        """
+        self.steps += count
+        if self.steps >= self.next_check:
+            self.check_budget()
+
+    def check_budget(self):
+        """
+        Raises ExecutionLimitError if the run is over budget, then schedules the next check.
+        """
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise ExecutionLimitError(f"Execution stopped: step limit of {self.max_steps} exceeded.")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise ExecutionLimitError(f"Execution stopped: timeout of {self.timeout} seconds exceeded.")
+        self.next_check = self.steps + TIMEOUT_CHECK_INTERVAL
+        if self.max_steps is not None:
+            self.next_check = min(self.next_check, self.max_steps + 1)
+
+    def get_cursor(self, cursor_name):
+        """
+        Returns the state of a declared cursor, or None (with an error) if it is not declared.
+        """
+        cursor = self.cursors.get(cursor_name)
+        if cursor is None:
+            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        return cursor
+
+    def emit(self, cursor, command, *geometry):
+        """
+        Appends a drawing command with the cursor's current color and thickness
+        to the display list. Iterating over it yields (name, color, thickness, *geometry):
+        - ("point", color, thickness, x, y)
+        - ("line", color, thickness, x1, y1, x2, y2)
+        - ("square", color, thickness, x, y, size)
+        - ("circle", color, thickness, cx, cy, radius)
+        - ("arc", color, thickness, cx, cy, radius, start_angle, end_angle)
+        """
+        self.draw_commands.append(command, cursor["color"], cursor["thickness"], *geometry)
+
     # --- Utility Functions ---
     def extract_numeric_value(self, value):
         """
-        Extracts a numeric value from a 'VALUE' node in the AST.
-        Converts the value to an integer if it is a string.
+        Evaluates an expression node that must produce a number.
+        Raises a ValueError if the value cannot be computed.
         """
-        if isinstance(value, dict) and value.get("type") == "VALUE":
-            raw_value = value.get("value")
-            try:
-                return int(raw_value)  # Convert to integer
-            except ValueError:
-                raise ValueError(f"Invalid numeric value: {raw_value}")
-        else:
+        result = self.extract_value(value)
+        if not isinstance(result, (int, float)):
             raise ValueError(f"Expected a numeric value, got: {value}")
-            
+        return result
+
     def extract_value(self, value_node):
         """
         Extracts the value from a node.
-        Handles both constants and variables.
+        Handles constants, variables, unary minus and arithmetic expressions.
         """
-        if not isinstance(value_node, dict) or "type" not in value_node:
+        if not isinstance(value_node, Node):
             self.errors.append(f"Invalid value node: {value_node}")
-            print(f"Debug: Invalid value node encountered: {value_node}")
+            if self.tracer.enabled:
+                self.tracer.record("invalid_value_node", node=value_node)
             return None
 
-        if value_node["type"] == "VALUE":
+        kind = value_node.kind
+        if kind == NodeKind.VALUE:
             try:
-                # Check if the value is a variable name
-                if isinstance(value_node["value"], str) and value_node["value"].isalpha():
-                    if value_node["value"] in self.variables:
-                        return self.variables[value_node["value"]]
-                    else:
-                        self.errors.append(f"Variable '{value_node['value']}' is not declared.")
-                        return None
-                return int(value_node["value"])  # Convert to integer
+                return parse_number(value_node.value)  # Convert to int (or float)
             except ValueError:
-                self.errors.append(f"Invalid value for VALUE type: {value_node['value']}")
-                print(f"Debug: ValueError on converting value {value_node['value']} to int.")
+                self.errors.append(f"Invalid value for VALUE type: {value_node.value}")
+                if self.tracer.enabled:
+                    self.tracer.record("value_error", value=value_node.value)
+                return None
+
+        elif kind == NodeKind.VARIABLE:
+            if value_node.name in self.variables:
+                return self.variables[value_node.name]
+            self.errors.append(f"Variable '{value_node.name}' is not declared.")
+            return None
+
+        elif kind == NodeKind.UNARY:
+            operand = self.extract_value(value_node.operand)
+            if operand is None:
+                return None
+            return -operand
+
+        elif kind == NodeKind.EXPRESSION:
+            left = self.extract_value(value_node.left)
+            right = self.extract_value(value_node.right)
+            if left is None or right is None:
+                return None
+            try:
+                return apply_arithmetic(value_node.operator, left, right)
+            except (ValueError, ZeroDivisionError) as e:
+                self.errors.append(str(e))
                 return None
 
-        elif value_node["type"] == "VARIABLE" and value_node["name"] in self.variables:
-            return self.variables[value_node["name"]]
         else:
             self.errors.append(f"Unknown value type: {value_node}")
-            print(f"Debug: Unknown value type encountered: {value_node}")
+            if self.tracer.enabled:
+                self.tracer.record("unknown_value_type", node=value_node)
             return None
             
     # --- Specific Validations ---
+    # Each cursor command has a check_* method evaluating the operands of its node
+    # and an apply_* method validating the values and updating the cursor.
     def check_set_position(self, node):
         """
         Validates the 'setPosition' command for a cursor.
-        Ensures the cursor exists and the coordinates are integers.
+        Ensures the cursor exists and the coordinates are integers, then moves it.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            x = self.extract_value(node["x"])
-            y = self.extract_value(node["y"])
-            if not isinstance(x, int) or not isinstance(y, int):
-                self.errors.append(f"Position values for cursor '{cursor_name}' must be integers.")
+            self.apply_set_position(cursor, node.cursor, self.extract_value(node.x), self.extract_value(node.y))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_set_position(self, cursor, cursor_name, x, y):
+        """Moves the cursor to (x, y) if both are integers."""
+        if not isinstance(x, int) or not isinstance(y, int):
+            self.errors.append(f"Position values for cursor '{cursor_name}' must be integers.")
+        else:
+            cursor["position"] = (x, y)
+
     def check_draw_point(self, node):
         """
         Validates the 'drawPoint' command.
-        Ensures the cursor exists.
+        Ensures the cursor exists and draws a point at its position.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
+        self.apply_draw_point(cursor)
+
+    def apply_draw_point(self, cursor):
+        """Draws a point at the cursor position."""
+        self.emit(cursor, "point", *cursor["position"])
 
     def check_rotate(self, node):
         """
         Validates the 'rotate' command for a cursor.
         Ensures the cursor exists and the angle is an integer.
+        The angle is kept within ]-360, 360[ like fmod() in draw_cursor.c.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            angle = self.extract_value(node["angle"])
-            if not isinstance(angle, int):
-                self.errors.append(f"Rotation angle for cursor '{cursor_name}' must be an integer.")
+            self.apply_rotate(cursor, node.cursor, self.extract_value(node.angle))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_rotate(self, cursor, cursor_name, angle):
+        """Turns the cursor by an integer angle."""
+        if not isinstance(angle, int):
+            self.errors.append(f"Rotation angle for cursor '{cursor_name}' must be an integer.")
+        else:
+            cursor["angle"] = math.fmod(cursor["angle"] + angle, 360.0)
+
     def check_set_thickness(self, node):
         """
         Validates the 'setThickness' command for a cursor.
         Ensures the cursor exists and the thickness is a positive integer.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            thickness = self.extract_numeric_value(node["thickness"])
-            if thickness <= 0:
-                self.errors.append(f"Thickness for cursor '{cursor_name}' must be a positive integer.")
+            self.apply_set_thickness(cursor, node.cursor, self.extract_numeric_value(node.thickness))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_set_thickness(self, cursor, cursor_name, thickness):
+        """Sets a positive line thickness."""
+        if thickness <= 0:
+            self.errors.append(f"Thickness for cursor '{cursor_name}' must be a positive integer.")
+        else:
+            cursor["thickness"] = int(thickness)
+
     def declare_cursor(self, node):
         """
         Handles the declaration of a cursor.
         Ensures the cursor name is unique and initializes its properties.
         """
-        cursor_name = node.get("name")
+        cursor_name = node.name
         if not cursor_name:
             self.errors.append("Missing cursor name in CURSOR_DECLARATION.")
             return
@@ -211,165 +373,199 @@ class Interpreter:
         if cursor_name in self.cursors:
             self.errors.append(f"Cursor '{cursor_name}' is already declared.")
         else:
-            # Initialize default properties for the cursor
+            # Initialize default properties for the cursor (same as createCursor() in C)
             self.cursors[cursor_name] = {
                 "position": (0, 0),
-                "color": (0, 0, 0, 255),  # Default color: black (RGBA)
-                "thickness": 1           # Default thickness
+                "color": DEFAULT_COLOR,  # Default color: black (RGBA)
+                "thickness": 1,          # Default thickness
+                "angle": 0.0             # Direction in degrees
             }
 
     def check_move(self, node):
         """
         Validates the 'move' command for a cursor.
-        Ensures the cursor exists and the distance is a positive integer.
+        Ensures the cursor exists and the distance is a positive integer,
+        then moves the cursor along its direction.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            distance = self.extract_value(node["distance"])
-            if distance <= 0:
-                self.errors.append(f"Distance for cursor '{cursor_name}' must be a positive integer.")
+            self.apply_move(cursor, node.cursor, self.extract_value(node.distance))
         except ValueError as e:
             self.errors.append(str(e))
+
+    def apply_move(self, cursor, cursor_name, distance):
+        """Moves the cursor forward by a positive distance."""
+        if distance <= 0:
+            self.errors.append(f"Distance for cursor '{cursor_name}' must be a positive integer.")
+        else:
+            cursor["position"] = self.end_point(cursor, distance)
+
+    @staticmethod
+    def end_point(cursor, length):
+        """
+        Returns the point `length` pixels away from the cursor along its direction,
+        truncated to integers as in drawLine() of draw_cursor.c.
+        """
+        x, y = cursor["position"]
+        radians = cursor["angle"] * math.pi / 180.0
+        return x + int(math.cos(radians) * length), y + int(math.sin(radians) * length)
             
     def check_condition(self, condition):
         """
-        Validates a condition node.
+        Evaluates a condition node.
         Compares left and right values using the specified operator.
         """
-        left = self.extract_value(condition["left"])
-        right = self.extract_value(condition["right"])
-        operator = condition["operator"]
-
-        # Map TokenType operators to Python operations
-        if operator == TokenType.EQUAL:
-            return left == right
-        elif operator == TokenType.NOT_EQUAL:
-            return left != right
-        elif operator == TokenType.LESS_THAN:
-            return left < right
-        elif operator == TokenType.GREATER_THAN:
-            return left > right
-        elif operator == TokenType.LESS_EQUAL:
-            return left <= right
-        elif operator == TokenType.GREATER_EQUAL:
-            return left >= right
-        else:
-            raise ValueError(f"Invalid operator in condition: {operator}")
+        left = self.extract_value(condition.left)
+        right = self.extract_value(condition.right)
+        if left is None or right is None:
+            raise ValueError(f"Invalid operand in condition: {condition}")
+        return apply_comparison(condition.operator, left, right)
 
     def validate_expression(self, expr, context=""):
         """
         Validates an expression node.
         Ensures the structure and values are correct.
         """
-        if not isinstance(expr, dict):
+        if not isinstance(expr, Node):
             self.errors.append(f"{context} is not a valid expression: {expr}")
             return
 
-        if expr["type"] == "VALUE":
-            # Check if 'value' is a string or integer
-            if not isinstance(expr["value"], (str, int)):
+        if expr.kind == NodeKind.VALUE:
+            # Check if 'value' is a string or a number
+            if not isinstance(expr.value, (str, int, float)):
                 self.errors.append(f"{context} contains an invalid VALUE: {expr}")
-        elif expr["type"] == "EXPRESSION":
+        elif expr.kind == NodeKind.VARIABLE:
+            if not isinstance(expr.name, str):
+                self.errors.append(f"{context} contains an invalid VARIABLE: {expr}")
+        elif expr.kind == NodeKind.UNARY:
+            self.validate_expression(expr.operand, context="Operand")
+        elif expr.kind == NodeKind.EXPRESSION:
             # Handle nested expressions
-            self.validate_expression(expr["left"], context="Left operand")
-            self.validate_expression(expr["right"], context="Right operand")
+            self.validate_expression(expr.left, context="Left operand")
+            self.validate_expression(expr.right, context="Right operand")
         else:
-            self.errors.append(f"{context} contains an unsupported expression type: {expr['type']}")
+            self.errors.append(f"{context} contains an unsupported expression type: {expr.kind.name}")
 
     def check_draw_line(self, node):
         """
         Validates the 'drawLine' command.
         Ensures the cursor exists and the length is a positive integer.
+        The line starts at the cursor, follows its direction and does not move it.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            length = self.extract_value(node["length"])
-            if length <= 0:
-                self.errors.append(f"Line length for cursor '{cursor_name}' must be a positive integer.")
+            self.apply_draw_line(cursor, node.cursor, self.extract_value(node.length))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_draw_line(self, cursor, cursor_name, length):
+        """Draws a line of positive length from the cursor."""
+        if length <= 0:
+            self.errors.append(f"Line length for cursor '{cursor_name}' must be a positive integer.")
+        else:
+            self.emit(cursor, "line", *cursor["position"], *self.end_point(cursor, int(length)))
+
     def check_draw_circle(self, node):
         """
         Validates the 'drawCircle' command.
         Ensures the cursor exists and the radius is positive.
+        The circle is centered on the cursor.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            radius = self.extract_value(node["radius"])
-            if radius <= 0:
-                self.errors.append(f"Circle radius for cursor '{cursor_name}' must be a positive integer.")
+            self.apply_draw_circle(cursor, node.cursor, self.extract_value(node.radius))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_draw_circle(self, cursor, cursor_name, radius):
+        """Draws a circle of positive radius around the cursor."""
+        if radius <= 0:
+            self.errors.append(f"Circle radius for cursor '{cursor_name}' must be a positive integer.")
+        else:
+            self.emit(cursor, "circle", *cursor["position"], int(radius))
+
     def check_draw_square(self, node):
         """
         Validates the 'drawSquare' command.
         Ensures the cursor exists and the size is positive.
+        The cursor is the top-left corner of the square.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            size = self.extract_value(node["side_length"])
-            if size <= 0:
-                self.errors.append(f"Square size for cursor '{cursor_name}' must be a positive integer.")
+            self.apply_draw_square(cursor, node.cursor, self.extract_value(node.side_length))
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_draw_square(self, cursor, cursor_name, size):
+        """Draws a square of positive size from the cursor."""
+        if size <= 0:
+            self.errors.append(f"Square size for cursor '{cursor_name}' must be a positive integer.")
+        else:
+            self.emit(cursor, "square", *cursor["position"], int(size))
+
     def check_set_color(self, node):
         """
         Validates the 'setColor' command.
         Ensures the cursor exists and the color is valid.
+        Unknown color names fall back to black, as in the generated C code.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
+            return
+        self.apply_set_color(cursor, node.cursor, node.color)
+
+    def apply_set_color(self, cursor, cursor_name, color):
+        """Sets the cursor color from its name."""
+        if not isinstance(color, str):
+            self.errors.append(f"Invalid color '{color}' for cursor '{cursor_name}'.")
         else:
-            color = node.get("color")
-            if not isinstance(color, str):
-                self.errors.append(f"Invalid color '{color}' for cursor '{cursor_name}'.")
+            cursor["color"] = COLORS.get(color, DEFAULT_COLOR)
 
     def check_draw_arc(self, node):
         """
         Validates the 'drawArc' command.
         Ensures the cursor exists, the radius is positive, and the angle is valid.
+        The arc is centered on the cursor and starts at its direction.
         """
-        cursor_name = node["cursor"]
-        if cursor_name not in self.cursors:
-            self.errors.append(f"Cursor '{cursor_name}' is not declared.")
+        cursor = self.get_cursor(node.cursor)
+        if cursor is None:
             return
 
         try:
-            radius = self.extract_value(node["radius"])
-            angle = self.extract_value(node["angle"])
-            if radius <= 0:
-                self.errors.append(f"Arc radius for cursor '{cursor_name}' must be a positive integer.")
-            if not isinstance(angle, int):
-                self.errors.append(f"Arc angle for cursor '{cursor_name}' must be an integer.")
+            radius = self.extract_value(node.radius)
+            angle = self.extract_value(node.angle)
+            self.apply_draw_arc(cursor, node.cursor, radius, angle)
         except ValueError as e:
             self.errors.append(str(e))
 
+    def apply_draw_arc(self, cursor, cursor_name, radius, angle):
+        """Draws an arc of positive radius over an integer angle."""
+        if radius <= 0:
+            self.errors.append(f"Arc radius for cursor '{cursor_name}' must be a positive integer.")
+        elif not isinstance(angle, int):
+            self.errors.append(f"Arc angle for cursor '{cursor_name}' must be an integer.")
+        else:
+            x, y = cursor["position"]
+            self.emit(cursor, "arc", x, y, int(radius), cursor["angle"], cursor["angle"] + angle)
+
     def declare_variable(self, node):
         """
         Declares a new variable.
         Ensures the name is unique and the value is valid.
         """
-        var_name = node.get("name")
+        var_name = node.name
         if not var_name:
             self.errors.append("Variable declaration missing variable name.")
             return
@@ -378,8 +574,8 @@ class Interpreter:
             self.errors.append(f"Variable '{var_name}' is already declared.")
             return
 
-        var_value_node = node.get("value")
-        if not var_value_node or var_value_node["type"] != "VALUE":
+        var_value_node = node.value
+        if not isinstance(var_value_node, Node):
             self.errors.append(f"Invalid value in declaration of variable '{var_name}'.")
             return
 
@@ -395,7 +591,7 @@ class Interpreter:
         Updates an existing variable.
         Handles increment, decrement, and assignment operations.
         """
-        var_name = node.get("name")
+        var_name = node.name
         if not var_name:
             self.errors.append("Update step missing variable name.")
             return
@@ -409,8 +605,8 @@ class Interpreter:
             self.errors.append(f"Variable '{var_name}' has no assigned value.")
             return
 
-        operator = node.get("operator")
-        value_node = node.get("value", {"type": "VALUE", "value": 1})  
+        operator = node.operator
+        value_node = node.value if node.value is not None else Value(1)
 
         update_value = self.extract_value(value_node)
         if update_value is None:
@@ -434,210 +630,153 @@ class Interpreter:
 
     def check_block(self, node):
         """
-        Validates a BLOCK node.
-        Ensures it has a 'statements' key and that the statements are well-formed.
+        Executes a BLOCK node.
+        Variables and cursors declared inside the block go out of scope at its end,
+        as in C, so a loop body can declare them on every iteration.
         """
-        if "statements" not in node or not isinstance(node["statements"], list):
-            self.errors.append("Each 'BLOCK' must have a 'statements' key as a list.")
+        if not isinstance(node.statements, list):
+            self.errors.append("Each 'BLOCK' must have its statements as a list.")
             return
 
-        # Check if each element in 'statements' is a list
-        for statement_list in node["statements"]:
-            if not isinstance(statement_list, list):
-                self.errors.append("Each 'statements' entry in BLOCK must be a list.")
-                return
-
-            # Validate each instruction in the list
-            for statement in statement_list:
-                if not isinstance(statement, dict) or "type" not in statement:
+        variables_before = len(self.variables)
+        cursors_before = len(self.cursors)
+        try:
+            for statement in node.statements:
+                if not isinstance(statement, Node):
                     self.errors.append(f"Invalid statement in BLOCK: {statement}")
                 else:
                     # Execute or validate the statement
                     self.execute_node(statement)
+        finally:
+            # Dicts keep insertion order: names declared in the block come last
+            self.drop_declarations(self.variables, variables_before)
+            self.drop_declarations(self.cursors, cursors_before)
 
-    def check_while_loop(self, node):
+    @staticmethod
+    def drop_declarations(names, count):
         """
-        Validates a WHILE_LOOP node.
-        Ensures the condition and body are well-defined.
+        Removes the most recently declared entries of `names` until only `count` remain.
         """
-        # Check the condition structure
-        condition = node.get("condition")
-        if not condition or "type" not in condition or condition["type"] != "CONDITION":
-            self.errors.append("Missing or invalid condition in WHILE_LOOP.")
-            return
-        
-        left = self.extract_value(condition["left"])
-        right = self.extract_value(condition["right"])
-        operator = condition["operator"]
+        while len(names) > count:
+            names.popitem()
 
-        # Ensure the operator is a valid TokenType
-        if not isinstance(operator, TokenType):
-            self.errors.append(f"Invalid operator in condition: {operator}")
-            return
-        
-        # Check the loop body
-        body = node.get("body", {})
-        if body.get("type") != "BLOCK":
+    def check_loop_condition(self, condition, loop_type):
+        """
+        Evaluates the condition of a loop and counts the iteration against the budget.
+        """
+        if not isinstance(condition, Node) or condition.kind != NodeKind.CONDITION:
+            raise ValueError(f"Missing or invalid condition in {loop_type}.")
+        self.count_step()
+        return self.check_condition(condition)
+
+    def check_while_loop(self, node):
+        """
+        Executes a WHILE_LOOP node.
+        The body runs as long as the condition holds, within the execution budget.
+        """
+        body = node.body
+        if not isinstance(body, Node) or body.kind != NodeKind.BLOCK:
             self.errors.append("WHILE_LOOP body must be a BLOCK.")
             return
-        
-        for statement in body.get("statements", []):
-            if not isinstance(statement, list):
-                self.errors.append("Each 'statements' entry in BLOCK must be a list.")
-            else:
-                for stmt in statement:
-                    self.execute_node(stmt)
+
+        while self.check_loop_condition(node.condition, "WHILE_LOOP"):
+            self.check_block(body)
 
     def check_for_loop(self, node):
         """
-        Validates a FOR_LOOP node.
-        Ensures initialization, condition, update, and body are properly defined.
+        Executes a FOR_LOOP node.
+        The loop variable only exists inside the loop; a variable of the same name
+        declared outside is shadowed and restored afterwards.
         """
-        init = node.get("init")
-        if not init or init["type"] != "VARIABLE_DECLARATION":
+        init = node.init
+        if not isinstance(init, Node) or init.kind != NodeKind.VARIABLE_DECLARATION:
             self.errors.append("Invalid or missing initialization in FOR_LOOP.")
             return
-        self.declare_variable(init)
-
-        condition = node.get("condition")
-        if not condition or condition["type"] != "CONDITION":
-            self.errors.append("Missing or invalid condition in FOR_LOOP.")
-            return
 
-        left = self.extract_value(condition["left"])
-        right = self.extract_value(condition["right"])
-        operator = condition["operator"]
-
-        if left is None or right is None:
-            self.errors.append("Invalid condition in FOR_LOOP.")
-            return
-
-        if not isinstance(operator, TokenType):
-            self.errors.append(f"Invalid operator in condition: {operator}")
-            return
-
-        update = node.get("update")
-        if not update or update["type"] != "VARIABLE_UPDATE":
+        update = node.update
+        if not isinstance(update, Node) or update.kind != NodeKind.VARIABLE_UPDATE:
             self.errors.append("Invalid or missing update in FOR_LOOP.")
             return
 
-        self.update_variable(update)
-
-        body = node.get("body", {})
-        if body.get("type") != "BLOCK":
+        body = node.body
+        if not isinstance(body, Node) or body.kind != NodeKind.BLOCK:
             self.errors.append("FOR_LOOP body must be a BLOCK.")
             return
 
-        for statement in body.get("statements", []):
-            if not isinstance(statement, list):
-                self.errors.append("Each 'statements' entry in BLOCK must be a list.")
+        variables_before = len(self.variables)
+        is_shadowing = init.name in self.variables
+        shadowed = self.variables.get(init.name)
+        try:
+            if is_shadowing:
+                # Reuse the existing entry so that the declaration order is preserved
+                value = self.extract_value(init.value)
+                if value is None:
+                    self.errors.append(f"Unable to extract value for variable '{init.name}'.")
+                    return
+                self.variables[init.name] = value
             else:
-                for stmt in statement:
-                    self.execute_node(stmt)
+                self.declare_variable(init)
+                if init.name not in self.variables:
+                    return  # Invalid initial value, already reported
+            while self.check_loop_condition(node.condition, "FOR_LOOP"):
+                self.check_block(body)
+                self.update_variable(update)
+        finally:
+            self.drop_declarations(self.variables, variables_before)
+            if is_shadowing:
+                self.variables[init.name] = shadowed
 
     def check_if_statement(self, node):
         """
-        Validates an IF_STATEMENT node.
-        Ensures the condition, true_block, and false_block (if present) are valid.
+        Executes an IF_STATEMENT node.
+        Runs the true_block when the condition holds, else the false_block (if present).
         """
-        # Ensure the condition field is present and is of type CONDITION
-        if "condition" not in node or node["condition"]["type"] != "CONDITION":
+        # Ensure the condition field is present and is of kind CONDITION
+        if not isinstance(node.condition, Node) or node.condition.kind != NodeKind.CONDITION:
             self.errors.append(f"Missing or invalid condition in IF_STATEMENT: {node}")
             return
         
-        # Validate the condition
-        self.check_condition(node["condition"])
-        
-        # Validate the true_block and false_block if they exist
-        if "true_block" in node and node["true_block"]:
-            self.check_block(node["true_block"])
-        if "false_block" in node and node["false_block"]:
-            self.check_block(node["false_block"])
+        if self.check_condition(node.condition):
+            if node.true_block:
+                self.check_block(node.true_block)
+        elif node.false_block:
+            self.check_block(node.false_block)
 
             
 ast_1 = [
-    {"type": "CURSOR_DECLARATION", "name": "mainCursor"},
-    {
-        "type": "SET_POSITION",
-        "cursor": "mainCursor",
-        "x": {"type": "VALUE", "value": "10"},
-        "y": {"type": "VALUE", "value": "20"}
-    }
+    CursorDeclaration("mainCursor"),
+    SetPosition("mainCursor", Value("10"), Value("20")),
 ]
 
 ast_2 = [
-    {
-        "type": "VARIABLE_DECLARATION",
-        "var_type": "int",
-        "name": "i",
-        "value": {"type": "VALUE", "value": "10"}
-    },
-    {"type": "VARIABLE_UPDATE", "name": "i", "operator": "+=", "value": {"type": "VALUE", "value": "10"}},
-    {"type": "VARIABLE_UPDATE", "name": "i", "operator": "-=", "value": {"type": "VALUE", "value": "3"}}
+    VariableDeclaration(TokenType.INT, "i", Value("10")),
+    VariableUpdate("i", TokenType.PLUS_EQUAL, Value("10")),
+    VariableUpdate("i", TokenType.MINUS_EQUAL, Value("3")),
 ]
 
 ast_3 = [
-    {
-        "type": "VARIABLE_DECLARATION",
-        "var_type": "int",
-        "name": "counter",
-        "value": {"type": "VALUE", "value": "0"}
-    },
-    {
-    "type": "CURSOR_DECLARATION",
-    "name": "myCursor"
-    },
-    {
-        "type": "WHILE_LOOP",
-        "condition": {
-            "type": "CONDITION",
-            "left": {"type": "VALUE", "value": "12"},
-            "operator": TokenType.LESS_THAN,
-            "right": {"type": "VALUE", "value": "10"}
-        },
-        "body": {
-            "type": "BLOCK",
-            "statements": [
-                [
-                    {
-                        "type": "DRAW_LINE",
-                        "cursor": "myCursor",
-                        "length": {"type": "VALUE", "value": "5"}
-                    },
-                    {
-                        "type": "VARIABLE_UPDATE",
-                        "name": "counter",
-                        "operator": TokenType.PLUS_PLUS,
-                        "value": {"type": "VALUE", "value": "1"}
-                    }
-                ]
-            ]
-        }
-    }
+    VariableDeclaration(TokenType.INT, "counter", Value("0")),
+    CursorDeclaration("myCursor"),
+    WhileLoop(
+        Condition(Value("12"), TokenType.LESS_THAN, Value("10")),
+        Block([
+            DrawLine("myCursor", Value("5")),
+            VariableUpdate("counter", TokenType.PLUS_PLUS),
+        ]),
+    ),
 ]
 
 complex_ast = [
-    {
-        "type": "IF_STATEMENT",
-        "condition": {
-            "type": "CONDITION",
-            "left": {"type": "VALUE", "value": "i"},
-            "operator": "EQUAL",  # Remplacement par une chaîne simple
-            "right": {"type": "VALUE", "value": "15"}
-        },
-        "true_block": {
-            "type": "BLOCK",
-            "statements": [
-            [
-                {"type": "CURSOR_DECLARATION", "name": "myCursor"}
-            ]
-            ]
-        },
-        "false_block": None
-    }
+    IfStatement(
+        Condition(Variable("i"), TokenType.EQUAL, Value("15")),
+        Block([CursorDeclaration("myCursor")]),
+        None,
+    )
 ]
 
 
-
-interpreter = Interpreter(ast_3)
-interpreter.execute()
\ No newline at end of file
+if __name__ == "__main__":
+    interpreter = Interpreter(ast_3)
+    interpreter.execute()
+    for error in interpreter.errors:
+        print(f" - {error}")
\ No newline at end of file
@@ -1,15 +1,122 @@
 # lexer.py
+import mmap
 import re
+from bisect import bisect_right
 from utils.tokens import Token, TokenType
 
+# Keywords and specific symbols mapped to token types
+KEYWORDS = {
+    "cursor": TokenType.CURSOR,
+    "setPosition": TokenType.SET_POSITION,
+    "setColor": TokenType.SET_COLOR,
+    "setThickness": TokenType.SET_THICKNESS,
+    "move": TokenType.MOVE,
+    "rotate": TokenType.ROTATE,
+    "drawLine": TokenType.DRAW_LINE,
+    "drawSquare": TokenType.DRAW_SQUARE,
+    "drawCircle": TokenType.DRAW_CIRCLE,
+    "drawPoint": TokenType.DRAW_POINT,
+    "drawArc": TokenType.DRAW_ARC,
+    "animate": TokenType.ANIMATE,
+    "if": TokenType.IF,
+    "else": TokenType.ELSE,
+    "for": TokenType.FOR,
+    "while": TokenType.WHILE,
+    "block": TokenType.BLOCK,
+    "function": TokenType.FUNCTION,
+    "repeat": TokenType.REPEAT,
+    "int": TokenType.INT,
+    "float": TokenType.FLOAT,
+}
+
+# Single-character symbols mapped to token types
+SYMBOL_TYPES = {
+    ";": TokenType.SEMICOLON,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+    ",": TokenType.COMMA,
+    "=": TokenType.ASSIGN,
+    ".": TokenType.DOT,
+    "<": TokenType.LESS_THAN,
+    ">": TokenType.GREATER_THAN,
+}
+
+# Regular expressions to match different token types
+TOKEN_SPECS = [
+    ("PLUS_PLUS", r'\+\+'),               # ++
+    ("MINUS_MINUS", r'--'),              # --
+    ("PLUS_EQUAL", r'\+='),              # +=
+    ("MINUS_EQUAL", r'-='),              # -=
+    ("PLUS", r'\+'),                     # +
+    ("MINUS", r'-'),                     # -
+    ("MULTIPLY", r'\*'),                 # *
+    ("DIVIDE", r'/'),                    # /
+    ("MODULO", r'%'),                    # %
+    ("NUMBER", r'-?\d+(?:\.\d*)?'),      # Numbers (integers, floats, negatives)
+    ("IDENTIFIER", r'[a-zA-Z_]\w*'),     # Identifiers or keywords
+    ("EQUAL", r'\=\='),                  # ==
+    ("NOT_EQUAL", r'\!\='),              # !=
+    ("LESS_EQUAL", r'\<\='),             # <=
+    ("GREATER_EQUAL", r'\>\='),          # >=
+    ("SYMBOL", r'[;(),{}=.<>!]'),        # Single-character symbols
+    ("SKIP", r'[ \t]+'),                 # Whitespace or tabs
+    ("NEWLINE", r'\n'),                  # Newlines
+    ("MISMATCH", r'.'),                  # Any other character is an error
+]
+
+# Single regex compiled once from all patterns
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECS))
+
+# Same regex for byte buffers (memory-mapped files), matching ASCII sources
+BYTES_TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECS).encode("ascii"))
+
+# Regex groups whose token type does not depend on the matched text
+FIXED_KIND_TYPES = {
+    name: TokenType[name]
+    for name in ("PLUS_PLUS", "MINUS_MINUS", "PLUS_EQUAL", "MINUS_EQUAL", "PLUS", "MINUS", "MULTIPLY",
+                 "DIVIDE", "MODULO", "NUMBER", "EQUAL", "NOT_EQUAL", "LESS_EQUAL", "GREATER_EQUAL")
+}
+
 class Lexer:
     def __init__(self, source_code):
         """
         Initializes the lexer with the source code to tokenize.
+        - `source_code` is usually a `str`; a bytes-like buffer (e.g. an `mmap`)
+          is lexed in place with a bytes regex, see `from_path`.
         """
         self.source_code = source_code  # Source code to analyze
         self.tokens = []  # List to store generated tokens
 
+    @classmethod
+    def from_path(cls, path):
+        """
+        Creates a lexer reading the file at `path` through a read-only memory map.
+        - The file is neither decoded nor copied into a `str`; only the values of
+          the produced tokens are materialized, so very large scripts use little RAM.
+        - Call `close()` (or use the lexer as a context manager) to release the map.
+        """
+        with open(path, "rb") as file:
+            try:
+                source_code = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                source_code = b""
+        return cls(source_code)
+
+    def close(self):
+        """
+        Releases the memory map opened by `from_path` (no-op for in-memory sources).
+        """
+        if isinstance(self.source_code, mmap.mmap):
+            self.source_code.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     TOKEN_MAP = {
         # Map of token types to their string representations for translation
         TokenType.CURSOR: "cursor",
@@ -68,106 +175,209 @@ class Lexer:
         """
         Tokenizes the source code into a list of tokens using regex patterns.
         """
-        # Keywords and specific symbols mapped to token types
-        patterns = {
-            "cursor": TokenType.CURSOR,
-            "setPosition": TokenType.SET_POSITION,
-            "setColor": TokenType.SET_COLOR,
-            "setThickness": TokenType.SET_THICKNESS,
-            "move": TokenType.MOVE,
-            "rotate": TokenType.ROTATE,
-            "drawLine": TokenType.DRAW_LINE,
-            "drawSquare": TokenType.DRAW_SQUARE,
-            "drawCircle": TokenType.DRAW_CIRCLE,
-            "drawPoint": TokenType.DRAW_POINT,
-            "drawArc": TokenType.DRAW_ARC,
-            "animate": TokenType.ANIMATE,
-            "if": TokenType.IF,
-            "else": TokenType.ELSE,
-            "for": TokenType.FOR,
-            "while": TokenType.WHILE,
-            "block": TokenType.BLOCK,
-            "function": TokenType.FUNCTION,
-            "repeat": TokenType.REPEAT,
-            "++": TokenType.PLUS_PLUS,
-            "--": TokenType.MINUS_MINUS,
-            "int": TokenType.INT,
-            "float": TokenType.FLOAT,
-        }
-        
-        # Regular expressions to match different token types
-        token_specs = [
-            ("PLUS_PLUS", r'\+\+'),               # ++
-            ("MINUS_MINUS", r'--'),              # --
-            ("PLUS_EQUAL", r'\+='),              # +=
-            ("MINUS_EQUAL", r'-='),              # -=
-            ("PLUS", r'\+'),                     # +
-            ("MINUS", r'-'),                     # -
-            ("MULTIPLY", r'\*'),                 # *
-            ("DIVIDE", r'/'),                    # /
-            ("MODULO", r'%'),                    # %
-            ("NUMBER", r'-?\d+(\.\d*)?'),        # Numbers (integers, floats, negatives)
-            ("IDENTIFIER", r'[a-zA-Z_]\w*'),     # Identifiers or keywords
-            ("EQUAL", r'\=\='),                  # ==
-            ("NOT_EQUAL", r'\!\='),              # !=
-            ("LESS_EQUAL", r'\<\='),             # <=
-            ("GREATER_EQUAL", r'\>\='),          # >=
-            ("SYMBOL", r'[;(),{}=.<>!]'),        # Single-character symbols
-            ("SKIP", r'[ \t]+'),                 # Whitespace or tabs
-            ("NEWLINE", r'\n'),                  # Newlines
-        ]
-        
-        # Compile a single regex from all patterns
-        token_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specs)
-        get_token = re.compile(token_regex).match
-
-        # Initialize position in the source code
-        pos = 0
-        length = len(self.source_code)
-
-        # Main loop to tokenize the source code
-        while pos < length:
-            match = get_token(self.source_code, pos)
-            if match:
-                kind = match.lastgroup  # Token type
-                value = match.group(kind)  # Token value
-
-                # Handle token types
-                if kind == "NUMBER":
-                    token_type = TokenType.NUMBER
-                elif kind in ("PLUS_EQUAL", "MINUS_EQUAL", "EQUAL", "NOT_EQUAL", "LESS_EQUAL", "GREATER_EQUAL", "PLUS_PLUS", "MINUS_MINUS", "PLUS", "MINUS", "MULTIPLY", "DIVIDE", "MODULO"):
-                    token_type = TokenType[kind]
-                elif kind == "IDENTIFIER" and value in patterns:
-                    token_type = patterns[value]  # Keyword or specific symbol
-                elif kind == "IDENTIFIER":
-                    token_type = TokenType.IDENTIFIER  # User-defined identifier
-                elif kind == "SYMBOL":
-                    symbol_types = {
-                        ";": TokenType.SEMICOLON,
-                        "(": TokenType.LPAREN,
-                        ")": TokenType.RPAREN,
-                        "{": TokenType.LBRACE,
-                        "}": TokenType.RBRACE,
-                        ",": TokenType.COMMA,
-                        "=": TokenType.ASSIGN,
-                        ".": TokenType.DOT,
-                        "<": TokenType.LESS_THAN,
-                        ">": TokenType.GREATER_THAN,
-                    }
-                    token_type = symbol_types.get(value)
-                    if token_type is None:
-                        raise SyntaxError(f"Unknown symbol '{value}' at position {pos}")
-                elif kind in ("SKIP", "NEWLINE"):
-                    pos = match.end()
-                    continue  # Ignore spaces, tabs, and newlines
-                else:
-                    raise SyntaxError(f"Unknown token '{value}' at position {pos}")
-
-                # Append the generated token to the list
-                self.tokens.append(Token(token_type, value))
-                pos = match.end()
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def iter_tokens(self):
+        """
+        Lazily tokenizes the source code, yielding tokens one at a time.
+        - Lets the parser consume tokens as they are produced, so large
+          scripts never need a complete token list in memory.
+        """
+        return self._scan(0, len(self.source_code), 1)
+
+    def _scan(self, start, end, line):
+        """
+        Yields the tokens of `source_code[start:end]`.
+        - `start` must be the first character of line number `line`, so that
+          spans stay exact when only part of the source is re-tokenized.
+        """
+        fixed_kind_types = FIXED_KIND_TYPES
+        keywords = KEYWORDS
+        identifier = TokenType.IDENTIFIER
+        line_start = start  # Offset of the first character of the current line
+        binary = not isinstance(self.source_code, str)  # Byte offsets and bytes regex for buffers
+        token_regex = BYTES_TOKEN_REGEX if binary else TOKEN_REGEX
+
+        # Main loop: every character is matched by exactly one group of TOKEN_REGEX
+        for match in token_regex.finditer(self.source_code, start, end):
+            kind = match.lastgroup  # Token type
+            value = match.group()  # Token value
+            if binary:
+                value = value.decode("ascii", "replace")
+
+            # Handle token types
+            if kind == "IDENTIFIER":
+                token_type = keywords.get(value, identifier)  # Keyword or user-defined identifier
+            elif kind == "SKIP":
+                continue  # Ignore spaces and tabs
+            elif kind == "NEWLINE":
+                line += 1  # Track line numbers for token spans
+                line_start = match.end()
+                continue
+            elif kind == "SYMBOL":
+                token_type = SYMBOL_TYPES.get(value)
+                if token_type is None:
+                    raise SyntaxError(f"Unknown symbol '{value}' at line {line}:{match.start() - line_start + 1}")
+            elif kind == "MISMATCH":
+                # No pattern matched, handle unknown characters
+                raise SyntaxError(f"Unknown token '{value}' at line {line}:{match.start() - line_start + 1}")
             else:
-                # No match found, handle unknown characters
-                raise SyntaxError(f"Unknown token '{self.source_code[pos]}' at position {pos}")
+                token_type = fixed_kind_types[kind]
+
+            # Hand the generated token to the consumer
+            start = match.start()
+            yield Token(token_type, value, line, start - line_start + 1, start)
+
+
+
+class IncrementalLexer(Lexer):
+    """
+    Keeps the tokens of an editor buffer up to date across edits.
+    - Tokens are cached per source line; tokens never span a newline, so an edit
+      only needs to re-tokenize the lines it touches.
+    - Following lines keep their cached tokens, only their spans are shifted.
+    """
+    def __init__(self, source_code=""):
+        super().__init__(source_code)
+        self.line_starts = [0]  # Offset of the first character of each line
+        self.line_tokens = [[]]  # Cached tokens of each line
+        self.line_errors = [False]  # Whether each line failed to tokenize
+        self._relex_all()
+
+    def _relex_all(self):
+        # Tokenizes the whole buffer from scratch (initial load).
+        source_code = self.source_code
+        self.line_starts = [0]
+        index = source_code.find("\n")
+        while index != -1:
+            self.line_starts.append(index + 1)
+            index = source_code.find("\n", index + 1)
+        self.line_tokens = []
+        self.line_errors = []
+        for line_index in range(len(self.line_starts)):
+            tokens, failed = self._lex_line(line_index, self.line_starts)
+            self.line_tokens.append(tokens)
+            self.line_errors.append(failed)
+
+    def _line_end(self, line_index, line_starts):
+        # Offset just past the last character of a line, excluding its newline.
+        if line_index + 1 < len(line_starts):
+            return line_starts[line_index + 1] - 1
+        return len(self.source_code)
+
+    def _lex_line(self, line_index, line_starts):
+        # Tokenizes one line; returns its tokens and whether it contains an error.
+        start = line_starts[line_index]
+        end = self._line_end(line_index, line_starts)
+        try:
+            return list(self._scan(start, end, line_index + 1)), False
+        except SyntaxError:
+            return [], True
+
+    def apply_edit(self, offset, deleted_length, inserted_text):
+        """
+        Applies an edit to the buffer and re-tokenizes only the affected lines.
+        Args:
+            offset: Character offset where the edit starts.
+            deleted_length: Number of characters removed at `offset`.
+            inserted_text: Text inserted at `offset` (after the deletion).
+        """
+        old_source = self.source_code
+        end = offset + deleted_length
+        if offset < 0 or deleted_length < 0 or end > len(old_source):
+            raise ValueError(f"Edit ({offset}, {deleted_length}) is outside of the buffer.")
+
+        # Lines touched by the edit, in the old buffer
+        first_line = bisect_right(self.line_starts, offset) - 1
+        last_line = bisect_right(self.line_starts, end) - 1
+
+        self.source_code = old_source[:offset] + inserted_text + old_source[end:]
+        shift = len(inserted_text) - deleted_length
+        line_delta = inserted_text.count("\n") - old_source.count("\n", offset, end)
+
+        # Line starts of the replacement lines, in the new buffer
+        new_starts = [self.line_starts[first_line]]
+        index = self.source_code.find("\n", new_starts[0], offset + len(inserted_text))
+        while index != -1:
+            new_starts.append(index + 1)
+            index = self.source_code.find("\n", index + 1, offset + len(inserted_text))
+        following = self.line_starts[last_line + 1:]
+        for position, line_start in enumerate(following):
+            following[position] = line_start + shift
+
+        line_starts = self.line_starts[:first_line] + new_starts + following
+        new_tokens = []
+        new_errors = []
+        for line_index in range(first_line, first_line + len(new_starts)):
+            tokens, failed = self._lex_line(line_index, line_starts)
+            new_tokens.append(tokens)
+            new_errors.append(failed)
+
+        # Shift the spans of the untouched lines after the edit
+        if shift or line_delta:
+            for tokens in self.line_tokens[last_line + 1:]:
+                for token in tokens:
+                    token.line += line_delta
+                    token.offset += shift
+
+        self.line_starts = line_starts
+        self.line_tokens[first_line:last_line + 1] = new_tokens
+        self.line_errors[first_line:last_line + 1] = new_errors
+
+    def set_text(self, source_code):
+        """
+        Replaces the buffer with `source_code`, re-tokenizing only what changed.
+        - The edit is found from the common prefix and suffix of the old and new text.
+        """
+        old_source = self.source_code
+        if source_code == old_source:
+            return
+        prefix = _common_prefix_length(old_source, source_code)
+        limit = min(len(old_source), len(source_code)) - prefix
+        suffix = _common_suffix_length(old_source, source_code, limit)
+        self.apply_edit(prefix, len(old_source) - prefix - suffix, source_code[prefix:len(source_code) - suffix])
+
+    def iter_tokens(self):
+        """
+        Yields the cached tokens of the whole buffer.
+        - Raises a `SyntaxError` for the first line that failed to tokenize.
+        """
+        if True in self.line_errors:
+            line_index = self.line_errors.index(True)
+            start = self.line_starts[line_index]
+            end = self._line_end(line_index, self.line_starts)
+            list(self._scan(start, end, line_index + 1))  # Re-raises the error with an exact location
+        for tokens in self.line_tokens:
+            yield from tokens
+
+    def tokenize(self):
+        """
+        Returns the cached tokens of the whole buffer as a list.
+        """
+        self.tokens = list(self.iter_tokens())
+        return self.tokens
+
+
+def _common_prefix_length(first, second):
+    # Length of the common prefix of two strings (binary search on C-level comparisons).
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
 
-        return self.tokens
\ No newline at end of file
+def _common_suffix_length(first, second, limit):
+    # Length of the common suffix of two strings, at most `limit` characters.
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[len(first) - middle:] == second[len(second) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
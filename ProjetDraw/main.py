@@ -1,8 +1,69 @@
+import argparse
 import os
 import sys
+import time
 
-def main():
+def positive_int(text):
+    """
+    Argument type of the counts that must be at least 1.
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{text}'")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return value
+
+def positive_float(text):
+    """
+    Argument type of the durations that must be greater than 0.
+    """
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid float value: '{text}'")
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value}")
+    return value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py", description="Draw++: IDE and batch rendering.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("ide", help="launch the IDE (default)")
+
+    render = commands.add_parser("render", help="render .draw++ files to images, without a display")
+    render.add_argument("paths", nargs="+", help="files, directories or glob patterns of .draw++ files")
+    render.add_argument("--out", default="renders", help="output directory (default: renders)")
+    render.add_argument("--jobs", type=positive_int, default=None, help="worker processes (default: all cores)")
+    render.add_argument("--format", dest="image_format", choices=("png", "ppm", "svg"), default="png",
+                        help="image format (default: png)")
+    render.add_argument("--backend", choices=("tree", "closure", "bytecode"), default="tree",
+                        help="execution backend (default: tree)")
+    render.add_argument("--renderer", choices=("raster", "native", "compiled"), default="raster",
+                        help="PNG/PPM drawing: NumPy rasterizer, C runtime loaded in-process, "
+                             "or headless compiled C program (default: raster)")
+    render.add_argument("--profile", choices=("fast", "release", "native", "lto"), default="fast",
+                        help="C build profile of the compiled renderer (default: fast)")
+    render.add_argument("--size", default="800x600", help="image size as WIDTHxHEIGHT (default: 800x600)")
+    render.add_argument("--timeout", type=positive_float, default=5.0, help="execution time limit per file, in seconds")
+
+    build = commands.add_parser("build", help="compile .draw++ files to executables with the C backend")
+    build.add_argument("paths", nargs="+", help="files, directories or glob patterns of .draw++ files")
+    build.add_argument("--out", default="builds", help="output directory (default: builds)")
+    build.add_argument("--jobs", type=positive_int, default=None, help="worker processes (default: all cores)")
+    build.add_argument("--profile", choices=("fast", "release", "native", "lto"), default="fast",
+                       help="C build profile: -O0, -O2, -O3 -march=native, or the latter with LTO (default: fast)")
+    build.add_argument("--headless", action="store_true",
+                       help="build programs that write the image given as argument instead of opening a window")
+
+    args = parser.parse_args(argv)
+    if args.command == "render":
+        return render_command(args)
+    if args.command == "build":
+        return build_command(args)
     launch_ide()
+    return 0
 
 def launch_ide():
     ide_path = os.path.join("IDE", "ide.py")
@@ -12,5 +73,73 @@ def launch_ide():
     else:
         print("\nErreur : Le fichier IDE/ide.py est introuvable.")
 
+def render_command(args):
+    """
+    Renders the files given on the command line; returns the exit status
+    (1 if a file could not be found, parsed, executed or rendered without errors).
+    """
+    from batch_render import collect_sources, render_files
+
+    try:
+        width, height = (int(value) for value in args.size.lower().split("x"))
+    except ValueError:
+        print(f"Invalid --size '{args.size}', expected WIDTHxHEIGHT.", file=sys.stderr)
+        return 2
+    if width <= 0 or height <= 0:
+        print(f"Invalid --size '{args.size}', the width and the height must be positive.", file=sys.stderr)
+        return 2
+
+    sources = collect_sources(args.paths)
+    if not sources:
+        print("No .draw++ file found.", file=sys.stderr)
+        return 1
+
+    try:
+        results = render_files(sources, args.out, jobs=args.jobs, image_format=args.image_format,
+                               backend=args.backend, width=width, height=height, timeout=args.timeout,
+                               renderer=args.renderer, profile=args.profile)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    return report(results, len(sources), lambda result: f"{result['primitives']} primitives")
+
+def build_command(args):
+    """
+    Compiles the files given on the command line; returns the exit status.
+    """
+    from batch_render import build_file, collect_sources, render_files
+
+    sources = collect_sources(args.paths)
+    if not sources:
+        print("No .draw++ file found.", file=sys.stderr)
+        return 1
+    try:
+        results = render_files(sources, args.out, jobs=args.jobs, worker=build_file, profile=args.profile,
+                               headless=args.headless)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    return report(results, len(sources), lambda result: "cached" if result["cached"] else args.profile)
+
+def report(results, count, describe):
+    """
+    Prints one line per result (plus its errors) as they arrive, then a summary;
+    returns 1 if any file had errors.
+    """
+    start = time.perf_counter()
+    failed = 0
+    for result in results:
+        status = "ok  " if not result["errors"] else "FAIL"
+        output = result["output"] or "no output"
+        print(f"{status} {result['source']} -> {output} "
+              f"({describe(result)}, {result['seconds'] * 1000:.0f} ms)")
+        for error in result["errors"]:
+            print(f"     - {error}")
+        failed += bool(result["errors"])
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} files, {failed} with errors, {elapsed:.2f} s")
+    return 1 if failed else 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
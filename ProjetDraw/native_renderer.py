@@ -0,0 +1,227 @@
+# native_renderer.py
+# In-process rendering with the C runtime: draw_cursor is built once as a shared library
+# (see BuildCache.runtime_library), loaded with ctypes, and draws display lists into a
+# persistent SDL software renderer, without generating, compiling or spawning a program.
+import ctypes
+import functools
+import sys
+import tempfile
+
+import numpy as np
+
+from build_cache import BuildCache
+from compiler import BUILD_PROFILES, COMPILER
+from renderer import DEFAULT_HEIGHT, DEFAULT_WIDTH, WHITE, write_png, write_ppm
+
+# SDL pixel format whose bytes are R, G, B, A in memory (SDL_PIXELFORMAT_RGBA32)
+SDL_PIXELFORMAT_RGBA32 = 0x16762004 if sys.byteorder == "little" else 0x16462004
+
+
+class SDLColor(ctypes.Structure):
+    _fields_ = [("r", ctypes.c_uint8), ("g", ctypes.c_uint8), ("b", ctypes.c_uint8), ("a", ctypes.c_uint8)]
+
+
+class CCursor(ctypes.Structure):
+    """Mirror of the Cursor structure of C/include/draw_cursor.h."""
+    _fields_ = [
+        ("x", ctypes.c_int),
+        ("y", ctypes.c_int),
+        ("color", SDLColor),
+        ("thickness", ctypes.c_int),
+        ("angle", ctypes.c_double),
+    ]
+
+
+CURSOR_POINTER = ctypes.POINTER(CCursor)
+POINTER = ctypes.c_void_p
+INT = ctypes.c_int
+UINT8 = ctypes.c_uint8
+UINT32 = ctypes.c_uint32
+
+# Function name -> (result type, argument types), for the runtime functions
+# and the SDL2 functions reached through the runtime's dependencies
+SIGNATURES = {
+    "drawPoint": (None, [POINTER, CURSOR_POINTER]),
+    "drawSquare": (None, [POINTER, CURSOR_POINTER, INT]),
+    "drawCircle": (None, [POINTER, CURSOR_POINTER, INT]),
+    "drawArc": (None, [POINTER, CURSOR_POINTER, INT, ctypes.c_double]),
+    "SDL_CreateRGBSurfaceWithFormat": (POINTER, [UINT32, INT, INT, INT, UINT32]),
+    "SDL_CreateSoftwareRenderer": (POINTER, [POINTER]),
+    "SDL_SetRenderDrawColor": (INT, [POINTER, UINT8, UINT8, UINT8, UINT8]),
+    "SDL_RenderClear": (INT, [POINTER]),
+    "SDL_RenderDrawLine": (INT, [POINTER, INT, INT, INT, INT]),
+    "SDL_RenderReadPixels": (INT, [POINTER, POINTER, UINT32, POINTER, INT]),
+    "SDL_DestroyRenderer": (None, [POINTER]),
+    "SDL_FreeSurface": (None, [POINTER]),
+    "SDL_GetError": (ctypes.c_char_p, []),
+}
+
+
+class NativeRuntime:
+    """
+    The draw_cursor shared library loaded with ctypes; each function of SIGNATURES
+    is an attribute with its argument and result types declared.
+    """
+    def __init__(self, path=None, profile="release", cache=None):
+        """
+        Loads the runtime.
+        Args:
+            path: Shared library to load (defaults to a private copy of the runtime built
+                  with `profile` through the build cache, rebuilt only when its sources change).
+            profile: Build profile of the default library (see compiler.BUILD_PROFILES).
+            cache: BuildCache holding the default library.
+        Raises OSError if the library cannot be loaded, and subprocess.CalledProcessError
+        if it cannot be built (e.g. SDL2 is not installed).
+        """
+        self.library_dir = None
+        if path is None:
+            cache = cache if cache is not None else BuildCache()
+            # Kept while the runtime is loaded, removed with it
+            self.library_dir = tempfile.TemporaryDirectory(prefix="drawpp-runtime-")
+            path = cache.runtime_library(self.library_dir.name, COMPILER, BUILD_PROFILES[profile], shared=True)
+        self.path = path
+        self.library = ctypes.CDLL(path)
+        for name, (result_type, argument_types) in SIGNATURES.items():
+            function = getattr(self.library, name)
+            function.restype = result_type
+            function.argtypes = argument_types
+            setattr(self, name, function)
+
+    def error(self):
+        """
+        Returns the last SDL error message.
+        """
+        return (self.SDL_GetError() or b"").decode("utf-8", "replace")
+
+
+@functools.lru_cache(maxsize=None)
+def load_runtime(profile="release"):
+    """
+    Returns the NativeRuntime of a build profile, loaded once per process.
+    """
+    return NativeRuntime(profile=profile)
+
+
+@functools.lru_cache(maxsize=None)
+def persistent_renderer(width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    """
+    Returns a NativeRenderer of the given size kept for the whole process
+    (call clear() before reusing it for another drawing).
+    """
+    return NativeRenderer(width, height)
+
+
+class NativeRenderer:
+    """
+    Renders draw commands (see Interpreter.emit) with the C runtime, into an SDL
+    software renderer drawing on an RGBA surface of the given size.
+    - Points, squares, circles and arcs are drawn by drawPoint(), drawSquare(),
+      drawCircle() and drawArc() on a cursor set from the command; lines go straight
+      to SDL_RenderDrawLine() since the display list already holds the end point
+      drawLine() would compute (see Interpreter.end_point).
+    - As in the compiled programs, the thickness is ignored.
+    - The renderer is persistent: render() draws over the previous drawing until clear().
+    Same interface as renderer.RasterRenderer, so either can replay a display list.
+    """
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, background=WHITE, runtime=None):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.runtime = runtime if runtime is not None else load_runtime()
+        self.cursor = CCursor()
+        self.cursor_pointer = ctypes.byref(self.cursor)
+
+        self.surface = self.runtime.SDL_CreateRGBSurfaceWithFormat(0, width, height, 32, SDL_PIXELFORMAT_RGBA32)
+        if not self.surface:
+            raise RuntimeError(f"Cannot create the drawing surface: {self.runtime.error()}")
+        self.renderer = self.runtime.SDL_CreateSoftwareRenderer(self.surface)
+        if not self.renderer:
+            self.runtime.SDL_FreeSurface(self.surface)
+            self.surface = None
+            raise RuntimeError(f"Cannot create the software renderer: {self.runtime.error()}")
+        self.clear()
+
+        # Command name -> method drawing its geometry with the current cursor
+        self.shapes = {
+            "point": self.draw_point,
+            "line": self.draw_line,
+            "square": self.draw_square,
+            "circle": self.draw_circle,
+            "arc": self.draw_arc,
+        }
+
+    def clear(self):
+        """
+        Fills the surface with the background color.
+        """
+        self.runtime.SDL_SetRenderDrawColor(self.renderer, *self.background)
+        self.runtime.SDL_RenderClear(self.renderer)
+
+    def render(self, draw_commands):
+        """
+        Draws the commands in order and returns the pixels (see pixels()).
+        `draw_commands` is a display_list.DisplayList or any iterable of command tuples.
+        """
+        cursor = self.cursor
+        for command, color, thickness, *geometry in draw_commands:
+            shape = self.shapes.get(command)
+            if shape is None:
+                raise ValueError(f"Unknown draw command: {command}")
+            cursor.color.r, cursor.color.g, cursor.color.b, cursor.color.a = color
+            cursor.thickness = thickness
+            shape(*geometry)
+        return self.pixels()
+
+    # --- Commands (the cursor color is already set) ---
+    def draw_point(self, x, y):
+        self.cursor.x, self.cursor.y = x, y
+        self.runtime.drawPoint(self.renderer, self.cursor_pointer)
+
+    def draw_line(self, x1, y1, x2, y2):
+        color = self.cursor.color
+        self.runtime.SDL_SetRenderDrawColor(self.renderer, color.r, color.g, color.b, color.a)
+        self.runtime.SDL_RenderDrawLine(self.renderer, x1, y1, x2, y2)
+
+    def draw_square(self, x, y, size):
+        self.cursor.x, self.cursor.y = x, y
+        self.runtime.drawSquare(self.renderer, self.cursor_pointer, size)
+
+    def draw_circle(self, cx, cy, radius):
+        self.cursor.x, self.cursor.y = cx, cy
+        self.runtime.drawCircle(self.renderer, self.cursor_pointer, radius)
+
+    def draw_arc(self, cx, cy, radius, start_angle, end_angle):
+        self.cursor.x, self.cursor.y = cx, cy
+        self.cursor.angle = start_angle
+        self.runtime.drawArc(self.renderer, self.cursor_pointer, radius, end_angle - start_angle)
+
+    # --- Output ---
+    def pixels(self):
+        """
+        Returns a copy of the surface, as an array of shape (height, width, 4) and dtype uint8.
+        """
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        if self.runtime.SDL_RenderReadPixels(self.renderer, None, SDL_PIXELFORMAT_RGBA32,
+                                             pixels.ctypes.data, self.width * 4) != 0:
+            raise RuntimeError(f"Cannot read the rendered pixels: {self.runtime.error()}")
+        return pixels
+
+    def save(self, path):
+        """
+        Saves the image as PNG or PPM, depending on the extension of `path`.
+        """
+        if path.lower().endswith(".ppm"):
+            write_ppm(self.pixels(), path)
+        else:
+            write_png(self.pixels(), path)
+
+    def close(self):
+        """
+        Releases the SDL renderer and surface.
+        """
+        if self.renderer:
+            self.runtime.SDL_DestroyRenderer(self.renderer)
+            self.renderer = None
+        if self.surface:
+            self.runtime.SDL_FreeSurface(self.surface)
+            self.surface = None
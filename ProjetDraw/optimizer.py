@@ -0,0 +1,206 @@
+# optimizer.py
+# AST optimization pass run between Parser.parse() and the backends
+# (Interpreter, ClosureInterpreter, VirtualMachine and compiler.py).
+import math
+
+from interpreter import COMPARISON_OPERATORS, apply_arithmetic, parse_number
+from utils.ast_nodes import Block, Node, NodeKind, Value
+
+# Range of a C int: integer results outside of it are left to the backends,
+# so that the generated C code keeps its overflow behavior
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def optimize(syntax_tree):
+    """
+    Returns an optimized copy of a program (see Optimizer).
+    """
+    return Optimizer().optimize(syntax_tree)
+
+
+class Optimizer:
+    """
+    Simplifies an AST without changing what the program draws or reports.
+    - Literals are converted to numbers once (Value.value becomes an int or a float).
+    - Arithmetic on constants is folded with the C semantics of apply_arithmetic;
+      divisions by zero are kept so that the backends still report them.
+    - An `if` with a constant condition is replaced by the block that runs (or removed),
+      a `while` whose condition is constantly false is removed, and so is a `for`
+      whose condition is false for the constant initial value of its variable.
+    - The input tree is left unchanged; `folded` and `removed` count the simplifications.
+    """
+    # Statement node kind -> name of the method optimizing it (other statements
+    # only get their expressions folded)
+    STATEMENT_OPTIMIZERS = {
+        NodeKind.IF_STATEMENT: "optimize_if_statement",
+        NodeKind.WHILE_LOOP: "optimize_while_loop",
+        NodeKind.FOR_LOOP: "optimize_for_loop",
+        NodeKind.BLOCK: "optimize_block",
+    }
+
+    def __init__(self):
+        self.folded = 0   # Expressions replaced by a constant
+        self.removed = 0  # Statements removed or replaced by one of their blocks
+
+    def optimize(self, syntax_tree):
+        """
+        Returns the optimized list of top-level statements.
+        """
+        return self.optimize_statements(syntax_tree)
+
+    def optimize_statements(self, statements):
+        optimized = []
+        for statement in statements:
+            optimized.extend(self.optimize_statement(statement))
+        return optimized
+
+    def optimize_statement(self, node):
+        """
+        Returns the statements replacing `node` (none if it can never run).
+        """
+        if not isinstance(node, Node):
+            return [node]  # Reported by the backends
+        name = self.STATEMENT_OPTIMIZERS.get(node.kind)
+        if name is not None:
+            return getattr(self, name)(node)
+        return [self.fold_fields(node)]
+
+    # --- Expressions ---
+    def fold_fields(self, node):
+        """
+        Returns a copy of `node` with its expression fields folded.
+        """
+        return type(node)(*[self.fold(value) for _, value in node.fields()])
+
+    def fold(self, node):
+        """
+        Folds an expression node; other values are returned unchanged.
+        """
+        if not isinstance(node, Node):
+            return node
+
+        kind = node.kind
+        if kind == NodeKind.VALUE:
+            try:
+                return Value(parse_number(node.value))
+            except ValueError:
+                return node  # Invalid literal, reported by the backends
+
+        elif kind == NodeKind.UNARY:
+            operand = self.fold(node.operand)
+            if self.constant(operand) is not None:
+                return self.folded_value(-operand.value, type(node)(node.operator, operand))
+            return type(node)(node.operator, operand)
+
+        elif kind == NodeKind.EXPRESSION:
+            left = self.fold(node.left)
+            right = self.fold(node.right)
+            unfolded = type(node)(left, node.operator, right)
+            if self.constant(left) is None or self.constant(right) is None:
+                return unfolded
+            try:
+                result = apply_arithmetic(node.operator, left.value, right.value)
+            except (ValueError, ZeroDivisionError):
+                return unfolded  # Reported by the backends at run time
+            return self.folded_value(result, unfolded)
+
+        elif kind == NodeKind.CONDITION:
+            return type(node)(self.fold(node.left), node.operator, self.fold(node.right))
+
+        return node
+
+    def folded_value(self, result, unfolded):
+        """
+        Returns a Value for `result`, or `unfolded` if C could not represent it the same way.
+        """
+        if isinstance(result, int) and not INT_MIN <= result <= INT_MAX:
+            return unfolded
+        if isinstance(result, float) and not math.isfinite(result):
+            return unfolded
+        self.folded += 1
+        return Value(result)
+
+    @staticmethod
+    def constant(node):
+        """
+        Returns the number held by a folded literal, or None.
+        """
+        if isinstance(node, Node) and node.kind == NodeKind.VALUE and isinstance(node.value, (int, float)):
+            return node.value
+        return None
+
+    def condition_value(self, condition):
+        """
+        Returns True or False if a folded condition is constant, else None.
+        """
+        if not isinstance(condition, Node) or condition.kind != NodeKind.CONDITION:
+            return None
+        left = self.constant(condition.left)
+        right = self.constant(condition.right)
+        comparison = COMPARISON_OPERATORS.get(condition.operator)
+        if left is None or right is None or comparison is None:
+            return None
+        return comparison(left, right)
+
+    # --- Statements ---
+    def optimize_block(self, node):
+        if not isinstance(node.statements, list):
+            return [node]
+        return [Block(self.optimize_statements(node.statements))]
+
+    def optimize_branch(self, block):
+        """
+        Optimizes the block of an `if`, keeping a missing `else` as None.
+        """
+        if isinstance(block, Node) and block.kind == NodeKind.BLOCK:
+            return self.optimize_block(block)[0]
+        return block
+
+    def optimize_if_statement(self, node):
+        condition = self.fold(node.condition)
+        true_block = self.optimize_branch(node.true_block)
+        false_block = self.optimize_branch(node.false_block)
+
+        value = self.condition_value(condition)
+        if value is None:
+            return [type(node)(condition, true_block, false_block)]
+
+        # The block that runs keeps its own scope
+        self.removed += 1
+        block = true_block if value else false_block
+        return [block] if block else []
+
+    def optimize_while_loop(self, node):
+        condition = self.fold(node.condition)
+        if self.condition_value(condition) is False:
+            self.removed += 1
+            return []
+        return [type(node)(condition, self.optimize_branch(node.body))]
+
+    def optimize_for_loop(self, node):
+        init = self.fold_fields(node.init) if isinstance(node.init, Node) else node.init
+        condition = self.fold(node.condition)
+        update = self.fold_fields(node.update) if isinstance(node.update, Node) else node.update
+
+        # A loop that never iterates only declares its variable: removable if the
+        # initial value is constant (its evaluation cannot report an error)
+        if (isinstance(init, Node) and init.kind == NodeKind.VARIABLE_DECLARATION
+                and self.constant(init.value) is not None):
+            first_condition = self.fold(self.substitute(condition, init.name, init.value))
+            if self.condition_value(first_condition) is False:
+                self.removed += 1
+                return []
+        return [type(node)(init, condition, update, self.optimize_branch(node.body))]
+
+    def substitute(self, node, name, value):
+        """
+        Returns a copy of an expression or condition with the variable `name` replaced by `value`.
+        """
+        if not isinstance(node, Node):
+            return node
+        if node.kind == NodeKind.VARIABLE:
+            return value if node.name == name else node
+        if node.kind in (NodeKind.EXPRESSION, NodeKind.UNARY, NodeKind.CONDITION):
+            return type(node)(*[self.substitute(field, name, value) for _, field in node.fields()])
+        return node
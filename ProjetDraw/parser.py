@@ -1,61 +1,127 @@
 # parser.py
+from collections import deque
 from lexer import Lexer
 from utils.tokens import Token
 from utils.tokens import TokenType
+from utils.tracing import Tracer
+from utils.ast_nodes import (
+    Animate, BinaryOp, Block, Condition, CursorDeclaration, DrawArc, DrawCircle, DrawLine, DrawPoint,
+    DrawSquare, ForLoop, IfStatement, Move, Rotate, SetColor, SetPosition, SetThickness, UnaryOp, Value,
+    Variable, VariableDeclaration, VariableUpdate, WhileLoop,
+)
+
+# Version of the AST produced by the parser; bump it whenever the grammar or the
+# node classes change so that cached ASTs (see ast_cache.py) are invalidated.
+PARSER_VERSION = 1
+
+# Operators that turn `identifier ...` into a variable update (i++, i += 2, ...)
+UPDATE_OPERATORS = frozenset({
+    TokenType.MINUS_MINUS, TokenType.PLUS_PLUS, TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL
+})
+
+# Binary arithmetic operators and their precedence (higher binds tighter)
+BINARY_PRECEDENCE = {
+    TokenType.PLUS: 1,
+    TokenType.MINUS: 1,
+    TokenType.MULTIPLY: 2,
+    TokenType.DIVIDE: 2,
+    TokenType.MODULO: 2,
+}
 
 class Parser:
-    def __init__(self, tokens):
+    # First token of a statement -> name of the method parsing that statement
+    STATEMENT_HANDLERS = {
+        TokenType.CURSOR: "parse_cursor_declaration",
+        TokenType.IDENTIFIER: "parse_identifier_statement",
+        TokenType.IF: "parse_if_statement",
+        TokenType.FOR: "parse_for_loop",
+        TokenType.WHILE: "parse_while_loop",
+        TokenType.INT: "parse_variable_declaration",
+        TokenType.FLOAT: "parse_variable_declaration",
+        TokenType.LBRACE: "parse_block",
+    }
+
+    # Cursor method keyword -> name of the method parsing its arguments
+    CURSOR_METHOD_HANDLERS = {
+        TokenType.SET_POSITION: "parse_set_position",
+        TokenType.SET_COLOR: "parse_set_color",
+        TokenType.SET_THICKNESS: "parse_set_thickness",
+        TokenType.MOVE: "parse_move",
+        TokenType.ROTATE: "parse_rotate",
+        TokenType.DRAW_LINE: "parse_draw_line",
+        TokenType.DRAW_SQUARE: "parse_draw_square",
+        TokenType.DRAW_CIRCLE: "parse_draw_circle",
+        TokenType.DRAW_POINT: "parse_draw_point",
+        TokenType.DRAW_ARC: "parse_draw_arc",
+        TokenType.ANIMATE: "parse_animate",
+    }
+
+    def __init__(self, tokens, tracer=None):
         """
         Initializes the parser with a list of tokens and sets the initial position.
+        - `tokens` may also be any iterable (e.g. `Lexer.iter_tokens()`); tokens are
+          then pulled on demand into a small lookahead buffer instead of a full list.
+        - `tracer` records parsing events (see utils.tracing); by default tracing
+          follows the DRAWPP_TRACE environment variable.
         """
-        self.tokens = tokens
+        if isinstance(tokens, list):
+            self.tokens = tokens
+            self._stream = None
+        else:
+            self.tokens = deque()  # Lookahead buffer, its front is the current token
+            self._stream = iter(tokens)
         self.position = 0
         self.errors = []
+        self.tracer = tracer if tracer is not None else Tracer()
+
+        # Dispatch tables of bound handlers, resolved once per parser
+        self.statement_handlers = {
+            token_type: getattr(self, name) for token_type, name in self.STATEMENT_HANDLERS.items()
+        }
+        self.cursor_method_handlers = {
+            token_type: getattr(self, name) for token_type, name in self.CURSOR_METHOD_HANDLERS.items()
+        }
     
     def parse(self):
         """
         Main parse function to build the syntax tree by processing tokens sequentially.
         """
-        syntax_tree = []  # List to store syntax nodes
+        syntax_tree = list(self.iter_parse())  # List to store syntax nodes
+        if self.errors and self.tracer.enabled:
+            self.tracer.record("parse_errors", errors=list(self.errors))
+        return syntax_tree
 
-        while self.position < len(self.tokens):
-            current_token = self.tokens[self.position]
-            print(f"Current token at position {self.position}/{len(self.tokens)}: {current_token}")
+    def iter_parse(self):
+        """
+        Yields syntax nodes one statement at a time.
+        - Combined with a token iterator, lexing and parsing run in bounded memory.
+        - Stops at the end of input or at a closing brace (handled by parse_block).
+        """
+        tracer = self.tracer
+        statement_handlers = self.statement_handlers
+        while True:
+            current_token = self.peek()
+            if current_token is None:
+                break
+            if tracer.enabled:
+                tracer.record("statement", position=self.position, token=current_token)
             try:
-                # Determine token type and delegate parsing to the appropriate method
-                if current_token.type == TokenType.CURSOR:
-                    syntax_tree.append(self.parse_cursor_declaration())
-                elif current_token.type == TokenType.IDENTIFIER:
-                    if self.position + 1 < len(self.tokens) and self.tokens[self.position + 1].type in {
-                        TokenType.MINUS_MINUS, TokenType.PLUS_PLUS, TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL
-                    }:
-                        syntax_tree.append(self.parse_variable_update())
-                    else:
-                        syntax_tree.append(self.parse_cursor_method())
-                elif current_token.type == TokenType.IF:
-                    syntax_tree.append(self.parse_if_statement())
-                elif current_token.type == TokenType.FOR:
-                    syntax_tree.append(self.parse_for_loop())
-                elif current_token.type == TokenType.WHILE:
-                    syntax_tree.append(self.parse_while_loop())
-                elif current_token.type in (TokenType.INT, TokenType.FLOAT):
-                    syntax_tree.append(self.parse_variable_declaration())
-                elif current_token.type == TokenType.LBRACE:
-                    syntax_tree.append(self.parse_block())
+                # Delegate parsing to the handler registered for the token type
+                handler = statement_handlers.get(current_token.type)
+                if handler is not None:
+                    node = handler()
                 elif current_token.type == TokenType.RBRACE:
                     # Handle closing braces; they belong to parse_block
-                    print(f"Detected RBRACE at position {self.position}")
+                    if tracer.enabled:
+                        tracer.record("block_end", position=self.position)
                     break
                 else:
-                    raise SyntaxError(f"Unexpected token {current_token.type} at position {self.position}")
+                    raise SyntaxError(f"Unexpected token {current_token.type} at {self.describe_location(current_token)}")
             except SyntaxError as e:
                 self.errors.append(str(e))
-                self.position += 1  # Skip the problematic token
-        if self.errors:
-            print("Parsing completed with errors:")
-            for error in self.errors:
-                print(f" - {error}")
-        return syntax_tree
+                self.advance()  # Skip the problematic token
+                continue
+            yield node
     
 
     def parse_cursor_declaration(self):
@@ -63,161 +129,143 @@ class Parser:
         Parses a cursor declaration like `cursor myCursor;`.
         - Expects the keyword `cursor`, followed by an identifier (cursor name), 
         and ends with a semicolon (`;`).
-        - Returns a dictionary representing the cursor declaration.
+        - Returns a node representing the cursor declaration.
         """
         try:
             self.expect(TokenType.CURSOR)  # Ensure the token is 'cursor'.
             cursor_name = self.expect(TokenType.IDENTIFIER).value  # Get the cursor name.
             self.expect(TokenType.SEMICOLON)  # Ensure the declaration ends with a semicolon.
-            return {"type": "CURSOR_DECLARATION", "name": cursor_name}
+            return CursorDeclaration(cursor_name)
         except SyntaxError:
             self.errors.append("Invalid cursor declaration syntax.")  # Log the error.
             raise
 
 
+    def parse_identifier_statement(self):
+        """
+        Parses a statement starting with an identifier.
+        - `name++`, `name--`, `name += ...` and `name -= ...` are variable updates.
+        - Anything else is a cursor method call (`name.method(...)`).
+        """
+        next_token = self.peek(1)
+        if next_token is not None and next_token.type in UPDATE_OPERATORS:
+            return self.parse_variable_update()
+        return self.parse_cursor_method()
+
     def parse_cursor_method(self):
         """
         Parses cursor methods like `cursorName.method(...)`.
         - Validates the cursor name, the method separator (`.`), and the method type.
         - Delegates parsing to the specific method handlers based on the method type.
-        - Returns a dictionary representing the method call.
+        - Returns a node representing the method call.
         """
         cursor_name = self.expect(TokenType.IDENTIFIER).value  # Get the cursor name.
         self.expect(TokenType.DOT)  # Ensure there's a `.` after the cursor name.
-        method_token = self.expect(
-            TokenType.SET_POSITION,
-            TokenType.SET_COLOR,
-            TokenType.SET_THICKNESS,
-            TokenType.MOVE,
-            TokenType.ROTATE,
-            TokenType.DRAW_LINE,
-            TokenType.DRAW_SQUARE,
-            TokenType.DRAW_CIRCLE,
-            TokenType.DRAW_POINT,
-            TokenType.DRAW_ARC,
-            TokenType.ANIMATE
-        ).type  # Identify the method being called.
-
-        # Delegate parsing based on the method type.
-        if method_token == TokenType.SET_POSITION:
-            return self.parse_set_position(cursor_name)
-        elif method_token == TokenType.SET_COLOR:
-            return self.parse_set_color(cursor_name)
-        elif method_token == TokenType.SET_THICKNESS:
-            return self.parse_set_thickness(cursor_name)
-        elif method_token == TokenType.MOVE:
-            return self.parse_move(cursor_name)
-        elif method_token == TokenType.ROTATE:
-            return self.parse_rotate(cursor_name)
-        elif method_token == TokenType.DRAW_LINE:
-            return self.parse_draw_line(cursor_name)
-        elif method_token == TokenType.DRAW_SQUARE:
-            return self.parse_draw_square(cursor_name)
-        elif method_token == TokenType.DRAW_CIRCLE:
-            return self.parse_draw_circle(cursor_name)
-        elif method_token == TokenType.DRAW_POINT:
-            return self.parse_draw_point(cursor_name)
-        elif method_token == TokenType.DRAW_ARC:
-            return self.parse_draw_arc(cursor_name)
-        elif method_token == TokenType.ANIMATE:
-            return self.parse_animate(cursor_name)
-        else:
-            raise SyntaxError(f"Unexpected cursor method {method_token} at position {self.position}")
+        method_token = self.peek()
+        handler = None
+        if method_token is not None:
+            handler = self.cursor_method_handlers.get(method_token.type)
+        if handler is None:
+            self.expect(*self.CURSOR_METHOD_HANDLERS)  # Raises a SyntaxError listing the valid methods
+        self.advance()  # Consume the method name
+
+        # Delegate parsing to the handler registered for the method.
+        return handler(cursor_name)
                 
     def parse_set_position(self, cursor_name):
         # Parses the `setPosition(x, y)` method call.
-        # Ensures proper syntax and returns a dictionary with x and y values.
+        # Ensures proper syntax and returns a node with x and y values.
         self.expect(TokenType.LPAREN)  
         x_value = self.parse_expression()  
         self.expect(TokenType.COMMA)  
         y_value = self.parse_expression()  
         self.expect(TokenType.RPAREN)  
         self.expect(TokenType.SEMICOLON)  
-        return {"type": "SET_POSITION", "cursor": cursor_name, "x": x_value, "y": y_value}
+        return SetPosition(cursor_name, x_value, y_value)
 
     def parse_draw_line(self, cursor_name):
         # Parses the `drawLine(length)` method call.
-        # Ensures proper syntax and returns a dictionary with the line's length.
+        # Ensures proper syntax and returns a node with the line's length.
         self.expect(TokenType.LPAREN)  
         length_value = self.parse_expression()  
         self.expect(TokenType.RPAREN)  
         self.expect(TokenType.SEMICOLON)  
-        return {"type": "DRAW_LINE", "cursor": cursor_name, "length": length_value}
+        return DrawLine(cursor_name, length_value)
 
     def parse_set_color(self, cursor_name):
         # Parses the `setColor(color)` method call.
-        # Ensures proper syntax and returns a dictionary with the color value.
+        # Ensures proper syntax and returns a node with the color value.
         self.expect(TokenType.LPAREN)  
         color_value = self.expect(TokenType.COLOR, TokenType.IDENTIFIER).value  
         self.expect(TokenType.RPAREN)  
         self.expect(TokenType.SEMICOLON)  
-        return {"type": "SET_COLOR", "cursor": cursor_name, "color": color_value}
+        return SetColor(cursor_name, color_value)
 
     def parse_move(self, cursor_name):
         # Parses the `move(distance)` method call.
-        # Ensures proper syntax and returns a dictionary with the move distance.
+        # Ensures proper syntax and returns a node with the move distance.
         self.expect(TokenType.LPAREN)  
         distance_value = self.parse_expression()  
         self.expect(TokenType.RPAREN)  
         self.expect(TokenType.SEMICOLON)  
-        return {"type": "MOVE", "cursor": cursor_name, "distance": distance_value}
+        return Move(cursor_name, distance_value)
     
     def parse_rotate(self, cursor_name):
-        # Parses the `rotate(angle)` method call and returns the corresponding action dictionary.
+        # Parses the `rotate(angle)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         angle_value = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "ROTATE", "cursor": cursor_name, "angle": angle_value}
+        return Rotate(cursor_name, angle_value)
 
     def parse_draw_square(self, cursor_name):
-        # Parses the `drawSquare(side_length)` method call and returns the corresponding action dictionary.
+        # Parses the `drawSquare(side_length)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         side_length = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "DRAW_SQUARE", "cursor": cursor_name, "side_length": side_length}
+        return DrawSquare(cursor_name, side_length)
 
     def parse_draw_point(self, cursor_name):
-        # Parses the `drawPoint()` method call and returns the corresponding action dictionary.
+        # Parses the `drawPoint()` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "DRAW_POINT", "cursor": cursor_name}
+        return DrawPoint(cursor_name)
 
     def parse_draw_arc(self, cursor_name):
-        # Parses the `drawArc(radius, angle)` method call and returns the corresponding action dictionary.
+        # Parses the `drawArc(radius, angle)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         radius_value = self.parse_expression()
         self.expect(TokenType.COMMA)
         angle_value = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "DRAW_ARC", "cursor": cursor_name, "radius": radius_value, "angle": angle_value}
+        return DrawArc(cursor_name, radius_value, angle_value)
 
     def parse_animate(self, cursor_name):
-        # Parses the `animate(steps)` method call and returns the corresponding action dictionary.
+        # Parses the `animate(steps)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         animation_steps = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "ANIMATE", "cursor": cursor_name, "steps": animation_steps}
+        return Animate(cursor_name, animation_steps)
 
     def parse_set_thickness(self, cursor_name):
-        # Parses the `setThickness(value)` method call and returns the corresponding action dictionary.
+        # Parses the `setThickness(value)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         thickness_value = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "SET_THICKNESS", "cursor": cursor_name, "thickness": thickness_value}
+        return SetThickness(cursor_name, thickness_value)
 
     def parse_draw_circle(self, cursor_name):
-        # Parses the `drawCircle(radius)` method call and returns the corresponding action dictionary.
+        # Parses the `drawCircle(radius)` method call and returns the corresponding node.
         self.expect(TokenType.LPAREN)
         radius = self.parse_expression()
         self.expect(TokenType.RPAREN)
         self.expect(TokenType.SEMICOLON)
-        return {"type": "DRAW_CIRCLE", "cursor": cursor_name, "radius": radius}
+        return DrawCircle(cursor_name, radius)
 
     def parse_if_statement(self):
         # Parses an `if` statement.
@@ -233,7 +281,7 @@ class Parser:
             self.expect(TokenType.ELSE)
             false_block = self.parse_block()
 
-        return {"type": "IF_STATEMENT", "condition": condition, "true_block": true_block, "false_block": false_block}
+        return IfStatement(condition, true_block, false_block)
 
     def parse_while_loop(self):
         # Parses a `while` loop.
@@ -243,7 +291,7 @@ class Parser:
         condition = self.parse_condition()
         self.expect(TokenType.RPAREN)
         body = self.parse_block()
-        return {"type": "WHILE_LOOP", "condition": condition, "body": body}
+        return WhileLoop(condition, body)
 
     def parse_for_loop(self):
         # Parses a `for` loop.
@@ -256,64 +304,83 @@ class Parser:
         update = self.parse_variable_update()
         self.expect(TokenType.RPAREN)
         body = self.parse_block()
-        return {"type": "FOR_LOOP", "init": init, "condition": condition, "update": update, "body": body}
-
-    def parse_expression(self):
-        # Parses a mathematical or logical expression.
-        left = self.expect(TokenType.IDENTIFIER, TokenType.NUMBER)
-
-        while self.match(TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
-            operator = self.expect(TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO).type
-            right = self.expect(TokenType.IDENTIFIER, TokenType.NUMBER)
-            left = {
-                "type": "EXPRESSION",
-                "left": left.value if isinstance(left, Token) else left,
-                "operator": operator,
-                "right": right.value
-            }
+        return ForLoop(init, condition, update, body)
 
-        if isinstance(left, Token):
-            return {"type": "VALUE", "value": left.value}  # Single value case.
-
-        return left  # Complex expression case.
+    def parse_expression(self, min_precedence=1):
+        """
+        Parses an arithmetic expression by precedence climbing.
+        - `*`, `/` and `%` bind tighter than `+` and `-`; operators of the same
+          precedence are left-associative; parentheses group sub-expressions.
+        - Returns a typed node tree (see utils.ast_nodes):
+          `Value` (number literal), `Variable` (identifier), `UnaryOp` (negation)
+          and `BinaryOp` (binary operation with `left`, `operator`, `right`).
+        """
+        left = self.parse_unary()
+
+        while True:
+            operator_token = self.peek()
+            if operator_token is None:
+                break
+            precedence = BINARY_PRECEDENCE.get(operator_token.type)
+            if precedence is None or precedence < min_precedence:
+                break
+            self.advance()
+            right = self.parse_expression(precedence + 1)  # Left-associative.
+            left = BinaryOp(left, operator_token.type, right)
+
+        return left
+
+    def parse_unary(self):
+        # Parses a unary minus or a primary operand (number, identifier, parenthesized expression).
+        if self.match(TokenType.MINUS):
+            self.advance()
+            if self.match(TokenType.NUMBER):  # Negative literal, e.g. `-5`.
+                return Value("-" + self.advance().value)
+            return UnaryOp(TokenType.MINUS, self.parse_unary())
+
+        if self.match(TokenType.LPAREN):
+            self.advance()
+            expression = self.parse_expression()
+            self.expect(TokenType.RPAREN)
+            return expression
+
+        operand = self.expect(TokenType.IDENTIFIER, TokenType.NUMBER, TokenType.LPAREN, TokenType.MINUS)
+        if operand.type == TokenType.IDENTIFIER:
+            return Variable(operand.value)
+        return Value(operand.value)
 
     def parse_condition(self):
         # Parses a conditional expression with operators like ==, <, >, etc.
         try:
-            print(f"Parsing condition at position {self.position}, token: {self.tokens[self.position]}")
+            if self.tracer.enabled:
+                self.tracer.record("condition", position=self.position, token=self.peek())
             left_expr = self.parse_expression()
             operator = self.expect(
                 TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL,
                 TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.LESS_THAN, TokenType.GREATER_THAN
             ).type
             right_expr = self.parse_expression()
-            return {"type": "CONDITION", "left": left_expr, "operator": operator, "right": right_expr}
+            return Condition(left_expr, operator, right_expr)
         except SyntaxError:
             self.errors.append("Invalid condition syntax.")
             raise
 
     def parse_variable_declaration(self):
-        # Parses a variable declaration (`int x = 5;` or `float y = 3.14;`).
+        # Parses a variable declaration (`int x = 5;`, `float y = 3.14;` or `int z = x * 2;`).
         var_type = self.expect(TokenType.INT, TokenType.FLOAT).type
         var_name = self.expect(TokenType.IDENTIFIER).value
         self.expect(TokenType.ASSIGN)  # Expects '='.
-        var_value_token = self.expect(TokenType.NUMBER)
-        var_value = {"type": "VALUE", "value": var_value_token.value}
+        var_value = self.parse_expression()
 
         self.expect(TokenType.SEMICOLON)  # Expects the declaration to end with a semicolon.
-        return {
-            "type": "VARIABLE_DECLARATION",
-            "var_type": var_type,
-            "name": var_name,
-            "value": var_value
-        }
+        return VariableDeclaration(var_type, var_name, var_value)
 
     def parse_variable_update(self):
         """
         Parses a variable update statement (e.g., i++, i--, i += 2, i -= 2).
         - Extracts the variable name and the operator (++/--/+=/-=).
         - For += or -=, also extracts the value to update.
-        - Returns a dictionary representing the `VARIABLE_UPDATE` action.
+        - Returns a node representing the `VARIABLE_UPDATE` action.
         """
         var_name = self.expect(TokenType.IDENTIFIER).value
         update_op = self.expect(
@@ -324,25 +391,16 @@ class Parser:
         ).type
 
         if update_op in (TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL):  # Handle += or -= with a value.
-            value = self.expect(TokenType.NUMBER).value
-            return {
-                "type": "VARIABLE_UPDATE",
-                "name": var_name,
-                "operator": update_op,
-                "value": {"type": "VALUE", "value": value}
-            }
-
-        return {  # Handle ++ or -- without a value.
-            "type": "VARIABLE_UPDATE",
-            "name": var_name,
-            "operator": update_op
-        }
+            value = self.parse_expression()
+            return VariableUpdate(var_name, update_op, value)
+
+        return VariableUpdate(var_name, update_op)  # Handle ++ or -- without a value.
 
     def parse_block(self):
         """
         Parses a block of statements enclosed in `{}`.
         - Processes each statement within the block recursively.
-        - Returns a dictionary representing the `BLOCK` with its statements.
+        - Returns a node representing the `BLOCK` with its statements.
         """
         try:
             self.expect(TokenType.LBRACE)  # Expect opening brace.
@@ -352,44 +410,84 @@ class Parser:
                 if self.match(TokenType.RBRACE):  # Check for closing brace.
                     self.expect(TokenType.RBRACE)  # Consume the closing brace.
                     break
-                if self.position >= len(self.tokens):  # Ensure input doesn't end unexpectedly.
+                if self.peek() is None:  # Ensure input doesn't end unexpectedly.
                     raise SyntaxError("Unexpected end of input. Missing closing '}' for block.")
 
-                statements.append(self.parse())  # Parse nested statements.
+                statements.extend(self.iter_parse())  # Parse nested statements.
 
-            return {"type": "BLOCK", "statements": statements}
+            return Block(statements)
         except SyntaxError:
             self.errors.append("Invalid block structure.")
             raise
 
+    def peek(self, offset=0):
+        """
+        Returns the token `offset` positions ahead of the current one, or `None`
+        past the end of input.
+        - With a token iterator, pulls tokens into the lookahead buffer as needed.
+        """
+        if self._stream is None:
+            index = self.position + offset
+            if index < len(self.tokens):
+                return self.tokens[index]
+            return None
+
+        while len(self.tokens) <= offset:
+            token = next(self._stream, None)
+            if token is None:
+                return None
+            self.tokens.append(token)
+        return self.tokens[offset]
+
+    def advance(self):
+        """
+        Consumes the current token and returns it (`None` past the end of input).
+        - With a token iterator, consumed tokens are dropped from the buffer.
+        """
+        current_token = self.peek()
+        if current_token is not None and self._stream is not None:
+            self.tokens.popleft()
+        self.position += 1
+        return current_token
+
     def expect(self, *token_types):
         """
         Checks if the current token matches one of the expected types.
         - Advances the position if the token matches.
         - Raises a `SyntaxError` if the token doesn't match.
         """
-        if self.position >= len(self.tokens):  # Ensure position is within range.
+        current_token = self.peek()
+        if current_token is None:  # Ensure position is within range.
             expected_readable = ", ".join(Lexer.translate_token_type(t) for t in token_types)
             raise SyntaxError(f"Unexpected end of input. Expected one of: {expected_readable}.")
 
-        current_token = self.tokens[self.position]
         if current_token.type in token_types:
-            self.position += 1  # Advance to the next token.
-            return current_token
+            return self.advance()  # Advance to the next token.
         else:
             expected_readable = ", ".join(Lexer.translate_token_type(t) for t in token_types)
             found_readable = Lexer.translate_token_type(current_token.type)
             raise SyntaxError(
-                f"Syntax error at position {self.position}: Expected one of ({expected_readable}), but found '{found_readable}'."
+                f"Syntax error at {self.describe_location(current_token)}: Expected one of ({expected_readable}), but found '{found_readable}'."
             )
 
+    def describe_location(self, token):
+        """
+        Describes where a token appears, for error messages.
+        - Uses the token's `line:column` span when the lexer recorded one,
+          otherwise falls back to the parser's token index.
+        """
+        location = token.location
+        if location is None:
+            return f"position {self.position}"
+        return f"line {location}"
+
     def match(self, *token_types):
         """
         Checks if the current token matches one of the specified types.
         - Does not advance the position.
         - Returns `True` if a match is found, `False` otherwise.
         """
-        if self.position < len(self.tokens):
-            current_token = self.tokens[self.position]
+        current_token = self.peek()
+        if current_token is not None:
             return current_token.type in token_types
-        return False
\ No newline at end of file
+        return False
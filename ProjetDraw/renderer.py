@@ -0,0 +1,209 @@
+# renderer.py
+# Headless raster backend: draws the commands produced by the interpreter into a
+# NumPy RGBA array and saves it as PNG or PPM, without SDL, GCC or a display.
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from interpreter import Interpreter
+from lexer import Lexer
+from optimizer import optimize
+from parser import Parser
+
+# Same canvas as the SDL window opened by the generated C code
+DEFAULT_WIDTH = 800
+DEFAULT_HEIGHT = 600
+WHITE = (255, 255, 255, 255)
+
+
+class RasterRenderer:
+    """
+    Renders draw commands (see Interpreter.emit) into `pixels`, an array of
+    shape (height, width, 4) and dtype uint8.
+    - The geometry follows C/src/draw_cursor.c; pixels outside of the canvas are clipped.
+    - A thickness above 1 draws every pixel as a thickness x thickness square.
+    - Colors replace the pixels they cover, like the default SDL blend mode.
+    """
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, background=WHITE):
+        self.width = width
+        self.height = height
+        self.pixels = np.empty((height, width, 4), dtype=np.uint8)
+        self.pixels[:, :] = background
+
+        # Command name -> method returning the (x, y) pixel arrays of its geometry
+        self.shapes = {
+            "point": self.point_pixels,
+            "line": self.line_pixels,
+            "square": self.square_pixels,
+            "circle": self.circle_pixels,
+            "arc": self.arc_pixels,
+        }
+
+    def render(self, draw_commands):
+        """
+        Draws the commands in order and returns the pixel array.
+        `draw_commands` is a display_list.DisplayList or any iterable of command tuples.
+        """
+        for command, color, thickness, *geometry in draw_commands:
+            shape = self.shapes.get(command)
+            if shape is None:
+                raise ValueError(f"Unknown draw command: {command}")
+            xs, ys = shape(*geometry)
+            self.plot(xs, ys, color, thickness)
+        return self.pixels
+
+    def plot(self, xs, ys, color, thickness=1):
+        """
+        Colors the pixels (xs[i], ys[i]) in one scatter, widened to `thickness`.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if thickness > 1:
+            offsets = np.arange(thickness) - thickness // 2
+            xs, ys = np.broadcast_arrays(xs[:, None, None] + offsets[None, None, :],
+                                         ys[:, None, None] + offsets[None, :, None])
+            xs, ys = xs.ravel(), ys.ravel()
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.pixels[ys[inside], xs[inside]] = color
+
+    # --- Geometry (pixel coordinates of each command) ---
+    @staticmethod
+    def point_pixels(x, y):
+        return np.array([x]), np.array([y])
+
+    @staticmethod
+    def line_pixels(x1, y1, x2, y2):
+        """Pixels of a line, both ends included (as SDL_RenderDrawLine)."""
+        steps = max(abs(x2 - x1), abs(y2 - y1))
+        if steps == 0:
+            return np.array([x1]), np.array([y1])
+        t = np.arange(steps + 1) / steps
+        return np.floor(x1 + (x2 - x1) * t + 0.5), np.floor(y1 + (y2 - y1) * t + 0.5)
+
+    @staticmethod
+    def square_pixels(x, y, size):
+        """Outline of the size x size square whose top-left corner is (x, y) (as SDL_RenderDrawRect)."""
+        side = np.arange(size)
+        last = size - 1
+        xs = np.concatenate((x + side, x + side, np.full(size, x), np.full(size, x + last)))
+        ys = np.concatenate((np.full(size, y), np.full(size, y + last), y + side, y + side))
+        return xs, ys
+
+    @staticmethod
+    def circle_pixels(cx, cy, radius):
+        """
+        Outline of a circle, as the midpoint algorithm of drawCircle().
+        On the octant x <= y, the midpoint algorithm picks y = round(sqrt(r^2 - x^2)),
+        computed here for all x at once; the other octants follow by symmetry.
+        """
+        x = np.arange(int(radius / np.sqrt(2)) + 2)
+        y = np.floor(np.sqrt(radius * radius - np.minimum(x * x, radius * radius)) + 0.5).astype(np.int64)
+        octant = x <= y
+        x, y = x[octant], y[octant]
+        xs = np.concatenate((x, y, -x, -y, x, y, -x, -y))
+        ys = np.concatenate((y, x, y, x, -y, -x, -y, -x))
+        return cx + xs, cy + ys
+
+    @staticmethod
+    def arc_pixels(cx, cy, radius, start_angle, end_angle):
+        """Arc from start_angle to end_angle, sampled as drawArc() (see arc_segments)."""
+        angle = end_angle - start_angle
+        if angle < 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        segments = arc_segments(radius, angle)
+        radians = (start_angle + angle * np.arange(segments + 1) / segments) * np.pi / 180.0
+        return cx + np.trunc(np.cos(radians) * radius), cy + np.trunc(np.sin(radians) * radius)
+
+    # --- Output ---
+    def save(self, path):
+        """
+        Saves the image as PNG or PPM, depending on the extension of `path`.
+        """
+        if path.lower().endswith(".ppm"):
+            write_ppm(self.pixels, path)
+        else:
+            write_png(self.pixels, path)
+
+
+def arc_segments(radius, angle):
+    """
+    Number of segments sampled along an arc, as arcSegments() in draw_cursor.c:
+    about one per pixel of arc length, and at least one per degree.
+    """
+    length = angle * math.pi / 180.0 * radius
+    return max(math.ceil(max(length, angle)), 1)
+
+
+def png_bytes(pixels):
+    """
+    Encodes an RGBA array as a PNG file (8 bits per channel, no filtering).
+    """
+    height, width, _ = pixels.shape
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)  # Each row starts with its filter type (0)
+    rows[:, 1:] = pixels.reshape(height, width * 4)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)  # 8 bits, RGBA
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+def ppm_bytes(pixels):
+    """
+    Encodes an RGBA array as a binary PPM file (P6); the alpha channel is dropped.
+    """
+    height, width, _ = pixels.shape
+    return f"P6\n{width} {height}\n255\n".encode("ascii") + np.ascontiguousarray(pixels[:, :, :3]).tobytes()
+
+
+def ppm_pixels(data):
+    """
+    Decodes a binary PPM file (P6, 8 bits per channel) into an opaque RGBA array.
+    """
+    fields = []
+    offset = 0
+    while len(fields) < 4:  # Magic, width, height and maximum value, separated by whitespace
+        while data[offset:offset + 1].isspace():
+            offset += 1
+        end = offset
+        while end < len(data) and not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[offset:end])
+        offset = end
+    magic, width, height, maximum = fields
+    if magic != b"P6" or maximum != b"255":
+        raise ValueError("Not an 8-bit binary PPM image.")
+    width, height = int(width), int(height)
+    rgb = np.frombuffer(data, dtype=np.uint8, count=width * height * 3, offset=offset + 1)
+    pixels = np.full((height, width, 4), 255, dtype=np.uint8)
+    pixels[:, :, :3] = rgb.reshape(height, width, 3)
+    return pixels
+
+
+def write_png(pixels, path):
+    with open(path, "wb") as f:
+        f.write(png_bytes(pixels))
+
+
+def write_ppm(pixels, path):
+    with open(path, "wb") as f:
+        f.write(ppm_bytes(pixels))
+
+
+def render_source(source, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, interpreter_class=Interpreter):
+    """
+    Parses, optimizes and executes a Draw++ program, then renders its drawing.
+    Returns (pixels, errors); the drawing is rendered even when errors were reported.
+    """
+    parser = Parser(Lexer(source).tokenize())
+    syntax_tree = parser.parse()
+    if parser.errors:
+        return None, list(parser.errors)
+    interpreter = interpreter_class(optimize(syntax_tree))
+    interpreter.execute()
+    renderer = RasterRenderer(width, height)
+    return renderer.render(interpreter.draw_commands), interpreter.errors
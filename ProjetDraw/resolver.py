@@ -0,0 +1,59 @@
+# resolver.py
+# Lexical name resolution: assigns every variable (or cursor) a fixed slot index
+# so that backends can store values in a flat list instead of a dict keyed by name.
+
+
+class Resolver:
+    """
+    Symbol table of one namespace (variables or cursors), used while compiling.
+    - Names are resolved with the same rules as Interpreter: a declaration is
+      visible until the end of its block, and the declarations of a block are
+      dropped when it ends.
+    - Slots are never reused, so a program needs `slot_count` slots in total.
+    """
+    def __init__(self):
+        self.scopes = [{}]  # Innermost scope last: name -> slot
+        self.names = []     # Slot -> name
+
+    @property
+    def slot_count(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """
+        Returns the slot of the visible declaration of `name`, or None.
+        """
+        for scope in reversed(self.scopes):
+            slot = scope.get(name)
+            if slot is not None:
+                return slot
+        return None
+
+    def declare(self, name, shadow=False):
+        """
+        Returns the slot written by a declaration of `name` in the current scope.
+        - A name that is already visible keeps its slot: at run time the
+          declaration is an error unless that slot is empty, as in Interpreter.
+        - With `shadow`, the name always gets a new slot (for loop variables).
+        """
+        slot = None if shadow else self.lookup(name)
+        if slot is None:
+            slot = len(self.names)
+            self.names.append(name)
+        self.scopes[-1][name] = slot
+        return slot
+
+    def push_scope(self):
+        self.scopes.append({})
+
+    def pop_scope(self):
+        """
+        Ends the current scope and returns the slots declared in it.
+        """
+        return list(self.scopes.pop().values())
+
+    def global_slots(self):
+        """
+        Returns the top-level names and their slots, in slot order.
+        """
+        return dict(sorted(self.scopes[0].items(), key=lambda item: item[1]))
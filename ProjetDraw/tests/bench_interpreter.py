@@ -0,0 +1,148 @@
+# bench_interpreter.py
+# Micro-benchmarks of the interpreter: per-node dispatch on a 1M-node synthetic program,
+# and tree-walking vs closure-compiled vs bytecode execution on a loop-heavy script.
+# Run from the ProjetDraw folder: python tests/bench_interpreter.py
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Add parent directory to the Python path
+
+from closure_interpreter import ClosureInterpreter
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+from vm import VirtualMachine
+from utils.ast_nodes import (
+    CursorDeclaration, DrawArc, DrawCircle, DrawLine, DrawPoint, DrawSquare, Move, Node, NodeKind, Rotate,
+    SetColor, SetPosition, SetThickness, Value, VariableDeclaration, VariableUpdate,
+)
+from utils.tokens import TokenType
+
+NODE_COUNT = 1_000_000
+
+LOOP_HEAVY_SCRIPT = """
+cursor c;
+int total = 0;
+for (int i = 0; i < 300; i++) {
+    for (int j = 0; j < 100; j++) {
+        total += (i * j) % 7 - j / 3;
+        if (total > 1000) { total -= 1000; }
+    }
+    c.rotate(7);
+    c.drawLine(i % 50 + 1);
+}
+"""
+
+
+class LegacyInterpreter(Interpreter):
+    """
+    Reference copy of the previous dispatch: one comparison per branch, in the
+    order of the old if/elif chain (cursor methods come after the declarations).
+    Steps are counted as in Interpreter.
+    """
+    def execute_node(self, node):
+        self.count_step()
+        if not isinstance(node, Node):
+            raise ValueError(f"Invalid node: {node}")
+
+        kind = node.kind
+
+        if kind == NodeKind.CURSOR_DECLARATION:
+            self.declare_cursor(node)
+        elif kind == NodeKind.VARIABLE_DECLARATION:
+            self.declare_variable(node)
+        elif kind == NodeKind.SET_POSITION:
+            self.check_set_position(node)
+        elif kind == NodeKind.SET_COLOR:
+            self.check_set_color(node)
+        elif kind == NodeKind.SET_THICKNESS:
+            self.check_set_thickness(node)
+        elif kind == NodeKind.MOVE:
+            self.check_move(node)
+        elif kind == NodeKind.ROTATE:
+            self.check_rotate(node)
+        elif kind == NodeKind.DRAW_LINE:
+            self.check_draw_line(node)
+        elif kind == NodeKind.DRAW_CIRCLE:
+            self.check_draw_circle(node)
+        elif kind == NodeKind.DRAW_SQUARE:
+            self.check_draw_square(node)
+        elif kind == NodeKind.CONDITION:
+            self.check_condition(node)
+        elif kind == NodeKind.DRAW_POINT:
+            self.check_draw_point(node)
+        elif kind == NodeKind.DRAW_ARC:
+            self.check_draw_arc(node)
+        elif kind == NodeKind.VARIABLE_UPDATE:
+            self.update_variable(node)
+        elif kind == NodeKind.FOR_LOOP:
+            self.check_for_loop(node)
+        elif kind == NodeKind.WHILE_LOOP:
+            self.check_while_loop(node)
+        elif kind == NodeKind.IF_STATEMENT:
+            self.check_if_statement(node)
+        elif kind == NodeKind.BLOCK:
+            self.check_block(node)
+        else:
+            raise ValueError(f"Unknown node kind: {kind.name}")
+
+
+def synthetic_program(count):
+    """
+    Returns a flat program of `count` statements cycling through every cursor method.
+    """
+    body = [
+        SetPosition("c", Value("10"), Value("20")),
+        SetColor("c", "red"),
+        SetThickness("c", Value("2")),
+        Move("c", Value("5")),
+        Rotate("c", Value("15")),
+        DrawLine("c", Value("30")),
+        DrawSquare("c", Value("10")),
+        DrawCircle("c", Value("8")),
+        DrawPoint("c"),
+        DrawArc("c", Value("8"), Value("90")),
+        VariableUpdate("i", TokenType.PLUS_PLUS),
+    ]
+    program = [CursorDeclaration("c"), VariableDeclaration(TokenType.INT, "i", Value("0"))]
+    program.extend(body[index % len(body)] for index in range(count - len(program)))
+    return program
+
+
+def measure(interpreter_class, program, repeat):
+    """
+    Returns the best steps/sec over `repeat` executions of `program`
+    (compilation included for ClosureInterpreter and VirtualMachine).
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        interpreter = interpreter_class(program, max_steps=None, timeout=None)
+        interpreter.execute()
+        elapsed = time.perf_counter() - start
+        if interpreter.errors:
+            raise RuntimeError(interpreter.errors[0])
+        best = max(best, interpreter.steps / elapsed)
+    return best
+
+
+def main():
+    program = synthetic_program(NODE_COUNT)
+    legacy = measure(LegacyInterpreter, program, repeat=3)
+    current = measure(Interpreter, program, repeat=3)
+    print(f"{NODE_COUNT:,} nodes   legacy: {legacy:12,.0f} nodes/s   current: {current:12,.0f} nodes/s   "
+          f"speedup: x{current / legacy:.2f}")
+
+    program = Parser(Lexer(LOOP_HEAVY_SCRIPT).tokenize()).parse()
+    tree = measure(Interpreter, program, repeat=3)
+    closures = measure(ClosureInterpreter, program, repeat=3)
+    print(f"loop-heavy script   tree: {tree:12,.0f} steps/s   closures: {closures:12,.0f} steps/s   "
+          f"speedup: x{closures / tree:.2f}")
+    bytecode = measure(VirtualMachine, program, repeat=3)
+    print(f"loop-heavy script   tree: {tree:12,.0f} steps/s   bytecode: {bytecode:12,.0f} steps/s   "
+          f"speedup: x{bytecode / tree:.2f}")
+
+
+if __name__ == "__main__":
+    main()
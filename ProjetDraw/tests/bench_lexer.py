@@ -0,0 +1,108 @@
+# bench_lexer.py
+# Micro-benchmark of the lexer on fractale.draw++-style inputs.
+# Run from the ProjetDraw folder: python tests/bench_lexer.py
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Add parent directory to the Python path
+
+from lexer import Lexer
+from utils.tokens import Token, TokenType
+
+
+def legacy_tokenize(source_code):
+    """
+    Reference copy of the previous lexer loop, which rebuilt its keyword table,
+    regex and symbol table on every call (and the symbol table per SYMBOL token).
+    """
+    patterns = {
+        "cursor": TokenType.CURSOR, "setPosition": TokenType.SET_POSITION, "setColor": TokenType.SET_COLOR,
+        "setThickness": TokenType.SET_THICKNESS, "move": TokenType.MOVE, "rotate": TokenType.ROTATE,
+        "drawLine": TokenType.DRAW_LINE, "drawSquare": TokenType.DRAW_SQUARE, "drawCircle": TokenType.DRAW_CIRCLE,
+        "drawPoint": TokenType.DRAW_POINT, "drawArc": TokenType.DRAW_ARC, "animate": TokenType.ANIMATE,
+        "if": TokenType.IF, "else": TokenType.ELSE, "for": TokenType.FOR, "while": TokenType.WHILE,
+        "block": TokenType.BLOCK, "function": TokenType.FUNCTION, "repeat": TokenType.REPEAT,
+        "++": TokenType.PLUS_PLUS, "--": TokenType.MINUS_MINUS, "int": TokenType.INT, "float": TokenType.FLOAT,
+    }
+    token_specs = [
+        ("PLUS_PLUS", r'\+\+'), ("MINUS_MINUS", r'--'), ("PLUS_EQUAL", r'\+='), ("MINUS_EQUAL", r'-='),
+        ("PLUS", r'\+'), ("MINUS", r'-'), ("MULTIPLY", r'\*'), ("DIVIDE", r'/'), ("MODULO", r'%'),
+        ("NUMBER", r'-?\d+(\.\d*)?'), ("IDENTIFIER", r'[a-zA-Z_]\w*'), ("EQUAL", r'\=\='),
+        ("NOT_EQUAL", r'\!\='), ("LESS_EQUAL", r'\<\='), ("GREATER_EQUAL", r'\>\='),
+        ("SYMBOL", r'[;(),{}=.<>!]'), ("SKIP", r'[ \t]+'), ("NEWLINE", r'\n'),
+    ]
+    token_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specs)
+    get_token = re.compile(token_regex).match
+
+    tokens = []
+    pos = 0
+    length = len(source_code)
+    while pos < length:
+        match = get_token(source_code, pos)
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "NUMBER":
+            token_type = TokenType.NUMBER
+        elif kind in ("PLUS_EQUAL", "MINUS_EQUAL", "EQUAL", "NOT_EQUAL", "LESS_EQUAL", "GREATER_EQUAL",
+                      "PLUS_PLUS", "MINUS_MINUS", "PLUS", "MINUS", "MULTIPLY", "DIVIDE", "MODULO"):
+            token_type = TokenType[kind]
+        elif kind == "IDENTIFIER" and value in patterns:
+            token_type = patterns[value]
+        elif kind == "IDENTIFIER":
+            token_type = TokenType.IDENTIFIER
+        elif kind == "SYMBOL":
+            symbol_types = {
+                ";": TokenType.SEMICOLON, "(": TokenType.LPAREN, ")": TokenType.RPAREN,
+                "{": TokenType.LBRACE, "}": TokenType.RBRACE, ",": TokenType.COMMA,
+                "=": TokenType.ASSIGN, ".": TokenType.DOT, "<": TokenType.LESS_THAN,
+                ">": TokenType.GREATER_THAN,
+            }
+            token_type = symbol_types.get(value)
+        else:
+            pos = match.end()
+            continue
+        tokens.append(Token(token_type, value))
+        pos = match.end()
+    return tokens
+
+
+def current_tokenize(source_code):
+    return Lexer(source_code).tokenize()
+
+
+def measure(tokenize, sources, repeat):
+    """
+    Returns the best tokens/sec over `repeat` runs of `tokenize` on every source.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        count = 0
+        start = time.perf_counter()
+        for source in sources:
+            count += len(tokenize(source))
+        elapsed = time.perf_counter() - start
+        best = max(best, count / elapsed)
+    return best
+
+
+def main():
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, "fractale.draw++")) as file:
+        fractale = file.read()
+
+    workloads = {
+        "2000 small scripts": [fractale] * 2000,
+        "1 large script": [fractale * 2000],
+    }
+
+    for name, sources in workloads.items():
+        legacy = measure(legacy_tokenize, sources, repeat=3)
+        current = measure(current_tokenize, sources, repeat=3)
+        print(f"{name:20s} legacy: {legacy:12,.0f} tokens/s   current: {current:12,.0f} tokens/s   "
+              f"speedup: x{current / legacy:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_profiles.py
+# Compile time vs. run time of the C backend for each build profile (see compiler.BUILD_PROFILES),
+# on the sample scripts and a drawing-heavy synthetic script.
+# Needs gcc and SDL2. Run from the ProjetDraw folder: python tests/bench_profiles.py
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Add parent directory to the Python path
+
+import compiler
+from build_cache import BuildCache
+from lexer import Lexer
+from optimizer import optimize
+from parser import Parser
+
+SAMPLES = ("demo.draw++", "fractale.draw++")
+
+DRAW_HEAVY_SCRIPT = """
+cursor c;
+for (int i = 0; i < 3000; i++) {
+    c.setPosition(i % 800, (i * 7) % 600);
+    c.drawCircle(i % 250 + 1);
+    c.drawArc(i % 180 + 1, 270);
+    c.rotate(3);
+    c.drawLine(i % 300);
+}
+"""
+
+
+def generate(source):
+    """
+    Returns the headless C code of a script (no window and no display delay, see compiler.generate_c_code).
+    """
+    syntax_tree = Parser(Lexer(source).tokenize()).parse()
+    return compiler.generate_c_code(optimize(syntax_tree), headless=True)
+
+
+def measure(c_code, profile, directory, repeat):
+    """
+    Returns (runtime library build, program build, best run) times in seconds,
+    starting from an empty build cache; each run renders a PPM image.
+    """
+    cache = BuildCache(tempfile.mkdtemp(dir=directory))
+    start = time.perf_counter()
+    cache.runtime_library(directory, compiler.COMPILER, compiler.BUILD_PROFILES[profile])
+    runtime = time.perf_counter() - start
+
+    c_file = os.path.join(directory, f"{profile}.c")
+    exe_file = os.path.join(directory, f"{profile}.exe")
+    compiler.save_to_file(c_file, c_code)
+    start = time.perf_counter()
+    compiler.build_executable(c_file, exe_file, profile, cache)
+    build = time.perf_counter() - start
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([exe_file, os.path.join(directory, f"{profile}.ppm")], check=True)
+        best = min(best, time.perf_counter() - start)
+    return runtime, build, best
+
+
+def main():
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    programs = []
+    for name in SAMPLES:
+        with open(os.path.join(base_dir, name)) as file:
+            programs.append((name, generate(file.read())))
+    programs.append(("draw-heavy script", generate(DRAW_HEAVY_SCRIPT)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, c_code in programs:
+            for profile in compiler.BUILD_PROFILES:
+                runtime, build, run = measure(c_code, profile, directory, repeat=3)
+                print(f"{name:18} {profile:8} runtime build: {runtime * 1000:6.0f} ms   "
+                      f"program build: {build * 1000:6.0f} ms   run: {run * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
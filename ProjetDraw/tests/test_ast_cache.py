@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from ast_cache import ASTCache
+from lexer import Lexer
+from parser import Parser
+from utils.ast_nodes import from_tuple, to_tuple
+from utils.disk_cache import DiskCache
+
+
+class TestASTCache(unittest.TestCase):
+
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def read_sample(self, name):
+        """Reads one of the .draw++ samples shipped with the project."""
+        with open(os.path.join(self.BASE_DIR, name)) as file:
+            return file.read()
+
+    def test_tuple_round_trip(self):
+        """Encoding then decoding the samples gives back the same trees."""
+        for name in ("demo.draw++", "fractale.draw++", "teste.draw++"):
+            ast = Parser(Lexer(self.read_sample(name)).tokenize()).parse()
+            self.assertEqual(from_tuple(to_tuple(ast)), ast)
+
+    def test_second_parse_is_a_hit(self):
+        """The second parse of a source is served from disk, even by a new cache object."""
+        code = self.read_sample("fractale.draw++")
+        expected = Parser(Lexer(code).tokenize()).parse()
+
+        cache = ASTCache(self.directory.name)
+        self.assertEqual(cache.parse(code), (expected, []))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        cache = ASTCache(self.directory.name)
+        self.assertEqual(cache.parse(code), (expected, []))
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_changed_source_and_errors(self):
+        """An edited source misses the cache; parser errors are cached with the tree."""
+        cache = ASTCache(self.directory.name)
+        ast, errors = cache.parse("cursor c; c.rotate(;")
+        self.assertTrue(errors)
+        self.assertEqual(cache.parse("cursor c; c.rotate(;"), (ast, errors))
+        cache.parse("cursor c; c.rotate(90);")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_corrupted_entry(self):
+        """A corrupted entry is ignored and parsed again."""
+        cache = ASTCache(self.directory.name)
+        code = "cursor c;"
+        cache.parse(code)
+        with open(cache.store.path_for(cache.key(code)), "wb") as file:
+            file.write(b"not marshal data")
+        self.assertEqual(len(cache.parse(code)[0]), 1)
+        self.assertEqual(cache.misses, 2)
+
+    def test_lru_eviction(self):
+        """The least recently used entries are evicted first."""
+        store = DiskCache(self.directory.name, max_bytes=250)
+        store.put("a", b"a" * 100)
+        store.put("b", b"b" * 100)
+        os.utime(store.path_for("a"), (0, 0))
+        os.utime(store.path_for("b"), (1, 1))
+        self.assertIsNotNone(store.get("a"))  # "a" becomes the most recent entry
+        store.put("c", b"c" * 100)
+        self.assertIsNone(store.get("b"))
+        self.assertEqual(store.get("a"), b"a" * 100)
+        self.assertEqual(store.get("c"), b"c" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
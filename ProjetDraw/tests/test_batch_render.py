@@ -0,0 +1,110 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from ast_cache import ASTCache
+from batch_render import build_file, collect_sources, output_path, render_files
+from build_cache import BuildCache
+
+try:
+    import numpy
+except ImportError:  # The raster backend is optional
+    numpy = None
+
+PROGRAM = """
+cursor c;
+c.setPosition(10, 10);
+c.drawLine(20);
+c.drawCircle(5);
+"""
+
+
+class TestBatchRender(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = self.directory.name
+        self.out = os.path.join(self.root, "out")
+        self.write("a.draw++", PROGRAM)
+        self.write("b.draw++", "cursor c;\nc.drawCircle(0);\n")
+        self.write("broken.draw++", "cursor ;")
+        self.write("notes.txt", "not a program")
+
+    def write(self, name, text):
+        with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_collect_sources(self):
+        """Directories give their .draw++ files, patterns are expanded, duplicates are dropped."""
+        sources = collect_sources([self.root, os.path.join(self.root, "a*.draw++")])
+        self.assertEqual([os.path.basename(source) for source in sources], ["a.draw++", "b.draw++", "broken.draw++"])
+        self.assertEqual(output_path(sources[0], self.out, "svg"), os.path.join(self.out, "a.svg"))
+
+    def test_same_names_are_rejected(self):
+        """Files with the same base name in different directories would overwrite each other's output."""
+        os.mkdir(os.path.join(self.root, "other"))
+        self.write(os.path.join("other", "a.draw++"), PROGRAM)
+        sources = collect_sources([self.root, os.path.join(self.root, "other")])
+        with self.assertRaises(ValueError):
+            render_files(sources, self.out, image_format="svg")
+        self.assertFalse(os.path.exists(self.out))
+
+    def test_render_svg_in_processes(self):
+        """Each file gets its image, its timing and its errors, in the order of the sources."""
+        sources = collect_sources([self.root])
+        results = list(render_files(sources, self.out, jobs=2, image_format="svg", backend="bytecode"))
+        self.assertEqual([result["source"] for result in results], sources)
+
+        drawn, run_time_error, syntax_error = results
+        self.assertEqual(drawn["errors"], [])
+        self.assertEqual(drawn["primitives"], 2)
+        self.assertGreater(drawn["seconds"], 0)
+        with open(drawn["output"], encoding="utf-8") as f:
+            self.assertIn("<circle", f.read())
+
+        self.assertEqual(len(run_time_error["errors"]), 1)  # Drawn anyway, like in the IDE
+        self.assertTrue(os.path.exists(run_time_error["output"]))
+        self.assertTrue(syntax_error["errors"])
+        self.assertIsNone(syntax_error["output"])
+
+    def test_rerender_skips_parsing(self):
+        """Rendering or building an unchanged file again reuses its cached AST."""
+        cache = ASTCache(os.path.join(self.root, "ast"))
+        source = os.path.join(self.root, "a.draw++")
+        first, = render_files([source], self.out, image_format="svg", ast_cache=cache)
+        second, = render_files([source], self.out, image_format="svg", ast_cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(first["primitives"], second["primitives"])
+
+        broken = build_file(os.path.join(self.root, "broken.draw++"), self.out, ast_cache=cache)
+        self.assertTrue(broken["errors"])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_render_raster(self):
+        result, = render_files([os.path.join(self.root, "a.draw++")], self.out, image_format="ppm", width=40, height=30)
+        with open(result["output"], "rb") as f:
+            self.assertTrue(f.read().startswith(b"P6\n40 30\n"))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_render_compiled(self):
+        """The headless C program of a script draws what the raster renderer draws."""
+        try:
+            BuildCache().runtime_library(self.root, "gcc")
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest("the C runtime cannot be built (gcc or SDL2 missing?)")
+        source = os.path.join(self.root, "a.draw++")
+        compiled, = render_files([source], self.out, image_format="ppm", width=40, height=30, renderer="compiled")
+        self.assertEqual(compiled["errors"], [])
+        with open(compiled["output"], "rb") as f:
+            image = f.read()
+
+        raster, = render_files([source], self.out, image_format="ppm", width=40, height=30)
+        with open(raster["output"], "rb") as f:
+            self.assertEqual(image, f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
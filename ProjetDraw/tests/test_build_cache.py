@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import compiler
+from build_cache import BuildCache, runtime_version
+
+PROGRAM = "int main() { return 0; }\n"
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = BuildCache(os.path.join(self.directory.name, "cache"))
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write(self, name, data):
+        with open(self.path(name), "wb") as file:
+            file.write(data)
+        return self.path(name)
+
+    def test_key(self):
+        """The key changes with the source, the flags and the runtime sources."""
+        key = BuildCache.key(PROGRAM, ["gcc", "-lm"], "runtime")
+        self.assertEqual(key, BuildCache.key(PROGRAM, ["gcc", "-lm"], "runtime"))
+        self.assertNotEqual(key, BuildCache.key(PROGRAM + "\n", ["gcc", "-lm"], "runtime"))
+        self.assertNotEqual(key, BuildCache.key(PROGRAM, ["gcc", "-O2", "-lm"], "runtime"))
+        self.assertNotEqual(key, BuildCache.key(PROGRAM, ["gcc", "-lm"], "runtime 2"))
+
+        header = self.write("draw_cursor.h", b"void drawLine();")
+        version = runtime_version([header])
+        self.write("draw_cursor.h", b"void drawLine(int);")
+        self.assertNotEqual(runtime_version([header]), version)
+
+    def test_save_and_restore(self):
+        """A saved executable is restored as an executable file, even over an existing one."""
+        exe_file = self.write("built.exe", b"\x7fELF binary")
+        self.assertFalse(self.cache.restore("key", self.path("restored.exe")))
+        self.cache.save("key", exe_file)
+
+        self.write("restored.exe", b"previous build")
+        self.assertTrue(self.cache.restore("key", self.path("restored.exe")))
+        with open(self.path("restored.exe"), "rb") as file:
+            self.assertEqual(file.read(), b"\x7fELF binary")
+        self.assertTrue(os.access(self.path("restored.exe"), os.X_OK))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def fake_run(self, builds):
+        """Returns a stand-in for subprocess.run that records the tools it runs and writes their output."""
+        def run(command, **options):
+            builds.append(command)
+            output = command[2] if command[0].endswith("ar") else command[command.index("-o") + 1]
+            with open(output, "wb") as file:
+                file.write(b"built by " + command[0].encode())
+        return run
+
+    def test_compile_runs_gcc_once(self):
+        """Compiling the same C file twice runs the compiler only the first time."""
+        c_file = self.write("output.c", PROGRAM.encode())
+        exe_file = self.path("output.exe")
+        builds = []
+        with mock.patch("build_cache.compiler_version", return_value="gcc 1.0"), \
+                mock.patch("subprocess.run", side_effect=self.fake_run(builds)):
+            self.assertTrue(compiler.compile_c_to_exe(c_file, exe_file, self.cache))
+            os.remove(exe_file)
+            self.assertTrue(compiler.compile_c_to_exe(c_file, exe_file, self.cache))
+        self.assertEqual([command[0] for command in builds], ["gcc", "ar", "gcc"])  # Runtime library, then the program
+        self.assertTrue(os.path.exists(exe_file))
+
+    def test_runtime_library_is_prebuilt(self):
+        """The runtime is built once per runtime version and kind; programs no longer include its source."""
+        builds = []
+        with mock.patch("build_cache.compiler_version", return_value="gcc 1.0"), \
+                mock.patch("subprocess.run", side_effect=self.fake_run(builds)):
+            library = self.cache.runtime_library(self.directory.name, "gcc")
+            self.assertEqual(self.cache.runtime_library(self.directory.name, "gcc"), library)
+            self.assertNotEqual(self.cache.runtime_library(self.directory.name, "gcc", shared=True), library)
+            with mock.patch("build_cache.runtime_version", return_value="edited"):
+                self.cache.runtime_library(self.directory.name, "gcc")
+        self.assertEqual([command[0] for command in builds], ["gcc", "ar", "gcc", "gcc", "ar"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 3))
+        with open(library, "rb") as file:
+            self.assertEqual(file.read(), b"built by ar")
+        self.assertNotIn("draw_cursor.c", compiler.generate_c_code([]))
+
+    def test_build_profiles(self):
+        """A profile's flags reach the runtime and the program, and each profile is cached apart."""
+        c_file = self.write("output.c", PROGRAM.encode())
+        builds = []
+        with mock.patch("build_cache.compiler_version", return_value="gcc 1.0"), \
+                mock.patch("subprocess.run", side_effect=self.fake_run(builds)):
+            self.assertFalse(compiler.build_executable(c_file, self.path("fast.exe"), "fast", self.cache))
+            self.assertFalse(compiler.build_executable(c_file, self.path("lto.exe"), "lto", self.cache))
+            self.assertTrue(compiler.build_executable(c_file, self.path("lto.exe"), "lto", self.cache))
+            with self.assertRaises(ValueError):
+                compiler.build_executable(c_file, self.path("x.exe"), "fastest", self.cache)
+
+        runtime_objects, archive, program = builds[3:]
+        self.assertIn("-flto", runtime_objects)
+        self.assertEqual(archive[0], "gcc-ar")
+        self.assertEqual(program[:4], ["gcc", "-O3", "-march=native", "-flto"])
+        self.assertIn("-O0", builds[0])
+
+    def test_runtime_library_is_a_private_copy(self):
+        """Evicting the cached runtime does not remove the copy a build links against."""
+        builds = []
+        with mock.patch("build_cache.compiler_version", return_value="gcc 1.0"), \
+                mock.patch("subprocess.run", side_effect=self.fake_run(builds)):
+            library = self.cache.runtime_library(self.directory.name, "gcc")
+        self.cache.store.clear()
+        with open(library, "rb") as file:
+            self.assertEqual(file.read(), b"built by ar")
+
+    @unittest.skipIf(shutil.which("gcc") is None, "gcc is not installed")
+    def test_failed_build_is_not_cached(self):
+        c_file = self.write("output.c", b"int main( {")
+        self.assertFalse(compiler.compile_c_to_exe(c_file, self.path("output.exe"), self.cache))
+        key = self.cache.key("int main( {", [compiler.COMPILER, *compiler.BUILD_PROFILES["fast"], *compiler.LINK_FLAGS])
+        self.assertIsNone(self.cache.store.get(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
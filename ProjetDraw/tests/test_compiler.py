@@ -0,0 +1,41 @@
+import unittest
+
+import compiler
+from lexer import Lexer
+from parser import Parser
+
+PROGRAM = """
+cursor c;
+c.drawCircle(10);
+"""
+
+
+class TestGenerateCCode(unittest.TestCase):
+
+    def setUp(self):
+        self.ast = Parser(Lexer(PROGRAM).tokenize()).parse()
+
+    def test_window_mode(self):
+        """By default the program opens a window and keeps it 3 s on screen."""
+        code = compiler.generate_c_code(self.ast)
+        self.assertIn("SDL_CreateWindow(", code)
+        self.assertIn("SDL_Delay(3000);", code)
+        self.assertIn("drawCircle(renderer, &c, 10);", code)
+        self.assertIn("if (window == NULL) {", code)
+        self.assertIn("if (renderer == NULL) {", code)
+
+    def test_headless_mode(self):
+        """Headless programs draw offscreen, save the image named by their argument and exit at once."""
+        code = compiler.generate_c_code(self.ast, headless=True, width=320, height=200)
+        self.assertIn("SDL_CreateRGBSurfaceWithFormat(0, 320, 200, 32, SDL_PIXELFORMAT_RGBA32)", code)
+        self.assertIn("SDL_CreateSoftwareRenderer(surface)", code)
+        self.assertIn("if (surface == NULL) {", code)
+        self.assertIn("if (renderer == NULL) {", code)
+        self.assertIn("saveSurface(surface, output)", code)
+        self.assertIn("drawCircle(renderer, &c, 10);", code)
+        for window_call in ("SDL_CreateWindow", "SDL_Delay", "SDL_Init"):
+            self.assertNotIn(window_call, code)
+
+
+if __name__ == "__main__":
+    unittest.main()
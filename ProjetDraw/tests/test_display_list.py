@@ -0,0 +1,78 @@
+import unittest
+from lexer import Lexer
+from parser import Parser
+from interpreter import Interpreter
+from display_list import DisplayList
+
+try:
+    import numpy
+except ImportError:  # The raster backend is optional
+    numpy = None
+
+RED = (255, 0, 0, 255)
+BLACK = (0, 0, 0, 255)
+
+
+def run(code):
+    interpreter = Interpreter(Parser(Lexer(code).tokenize()).parse())
+    interpreter.execute()
+    return interpreter.draw_commands
+
+
+class TestDisplayList(unittest.TestCase):
+
+    CODE = """
+        cursor c; c.setPosition(10, 20); c.drawPoint(); c.setColor(red); c.setThickness(2);
+        c.drawLine(30); c.rotate(45); c.drawArc(15, 90); c.drawCircle(5); c.drawSquare(8);
+    """
+
+    def test_interpreter_emits_a_display_list(self):
+        """Commands are stored in arrays with a color palette and read back as tuples."""
+        display_list = run(self.CODE)
+        self.assertIsInstance(display_list, DisplayList)
+        self.assertEqual(len(display_list), 5)
+        self.assertEqual(display_list.palette, [BLACK, RED])
+        self.assertEqual(list(display_list.colors), [0, 1, 1, 1, 1])
+        self.assertEqual(display_list[0], ("point", BLACK, 1, 10, 20))
+        self.assertEqual(display_list[2], ("arc", RED, 2, 10, 20, 15, 45.0, 135.0))
+        with self.assertRaises(ValueError):
+            display_list.append("triangle", RED, 1, 0, 0)
+
+    def test_serialization_round_trip(self):
+        """A display list survives to_bytes() / from_bytes()."""
+        display_list = run(self.CODE)
+        data = display_list.to_bytes()
+        self.assertEqual(DisplayList.from_bytes(data), display_list)
+        with self.assertRaises(ValueError):
+            DisplayList.from_bytes(data[:-1])
+
+    def test_diff(self):
+        """diff() lists the primitives that changed or exist on one side only."""
+        before = run(self.CODE)
+        after = run(self.CODE.replace("c.drawCircle(5);", "c.drawCircle(6);") + "c.drawPoint();")
+        self.assertEqual(before.diff(after), [3, 5])
+        self.assertEqual(before.diff(before), [])
+
+    def test_scaled(self):
+        """Scaling multiplies coordinates, lengths and thicknesses but keeps angles."""
+        scaled = run(self.CODE).scaled(2)
+        self.assertEqual(scaled[0], ("point", BLACK, 2, 20, 40))
+        self.assertEqual(scaled[2], ("arc", RED, 4, 20, 40, 30, 45.0, 135.0))
+
+    def test_svg(self):
+        """Every primitive is exported as an SVG element."""
+        svg = run(self.CODE).to_svg(100, 50)
+        self.assertTrue(svg.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50"'))
+        for element in ('<rect x="10" y="20" width="1" height="1" fill="#000000"/>',
+                        '<line x1="10" y1="20" x2="40" y2="20" fill="none" stroke="#ff0000" stroke-width="2"/>',
+                        '<circle cx="10" cy="20" r="5"', '<path d="M ', '<rect x="10" y="20" width="8"'):
+            self.assertIn(element, svg)
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_replay(self):
+        """Replaying into a raster renderer draws the same image as the command tuples."""
+        from renderer import RasterRenderer
+        display_list = run(self.CODE)
+        pixels = display_list.replay(RasterRenderer(60, 60))
+        self.assertTrue((pixels == RasterRenderer(60, 60).render(list(display_list))).all())
+        self.assertEqual(tuple(display_list.scaled(2).replay(RasterRenderer(120, 120))[40, 80]), RED)
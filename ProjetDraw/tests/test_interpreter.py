@@ -1,6 +1,9 @@
+import unittest
 from lexer import Lexer
 from parser import Parser
 from interpreter import Interpreter
+from closure_interpreter import ClosureInterpreter
+from utils.ast_nodes import CursorDeclaration, DrawLine, Value
 
 def parse_and_interpret(code):
     """
@@ -39,6 +42,136 @@ def parse_and_interpret(code):
     else:
         print("No errors detected!")  # Confirm successful execution if no errors
 
+
+class TestDispatch(unittest.TestCase):
+
+    def test_statements_and_invalid_nodes(self):
+        """Statements run through the dispatch table; other nodes are reported as errors."""
+        interpreter = Interpreter([
+            CursorDeclaration("c"),
+            DrawLine("c", Value("10")),
+            Value("1"),
+            {"type": "CURSOR_DECLARATION", "name": "d"},
+        ])
+        interpreter.execute()
+        self.assertEqual(list(interpreter.cursors), ["c"])
+        self.assertEqual(len(interpreter.errors), 2)
+        self.assertEqual(interpreter.errors[0], "Unknown node kind: VALUE")
+        self.assertTrue(interpreter.errors[1].startswith("Invalid node"))
+
+
+class TestExecution(unittest.TestCase):
+
+    def run_code(self, code, **limits):
+        """Parses and executes a snippet, returns the interpreter."""
+        interpreter = Interpreter(Parser(Lexer(code).tokenize()).parse(), **limits)
+        interpreter.execute()
+        return interpreter
+
+    def test_loops_iterate(self):
+        """for and while loops run until their condition fails; loop scopes end with the loop."""
+        interpreter = self.run_code("""
+            int total = 0;
+            for (int i = 0; i < 10; i++) { total += i; }
+            int n = 0;
+            while (n < 5) { int step = 2; n += step; }
+        """)
+        self.assertEqual(interpreter.errors, [])
+        self.assertEqual(interpreter.variables, {"total": 45, "n": 6})
+
+    def test_if_runs_one_branch(self):
+        """Only the branch selected by the condition is executed."""
+        interpreter = self.run_code("int x = 3; if (x > 5) { x += 100; } else { x -= 1; }")
+        self.assertEqual(interpreter.variables["x"], 2)
+
+    def test_cursor_state_and_draw_commands(self):
+        """Cursor methods update the cursor; drawing methods emit commands without moving it."""
+        interpreter = self.run_code("""
+            cursor c;
+            c.setPosition(10, 20);
+            c.setColor(red);
+            c.rotate(450);
+            c.drawLine(30);
+            c.move(5);
+            c.drawPoint();
+        """)
+        self.assertEqual(interpreter.errors, [])
+        cursor = interpreter.cursors["c"]
+        self.assertEqual(cursor["angle"], 90.0)
+        self.assertEqual(cursor["position"], (10, 25))
+        self.assertEqual(list(interpreter.draw_commands), [
+            ("line", (255, 0, 0, 255), 1, 10, 20, 10, 50),
+            ("point", (255, 0, 0, 255), 1, 10, 25),
+        ])
+
+    def test_step_limit_stops_execution(self):
+        """A runaway loop is stopped by the step budget and later statements are skipped."""
+        interpreter = self.run_code("int i = 0; while (i < 1) { i += 0; } cursor c;", max_steps=1000)
+        self.assertEqual(interpreter.errors, ["Execution stopped: step limit of 1000 exceeded."])
+        self.assertEqual(interpreter.cursors, {})
+
+    def test_timeout_stops_execution(self):
+        """Without a step budget, the wall-clock timeout stops the run."""
+        interpreter = self.run_code("int i = 0; while (i < 1) { i += 0; }", max_steps=None, timeout=0.05)
+        self.assertEqual(interpreter.errors, ["Execution stopped: timeout of 0.05 seconds exceeded."])
+
+
+class TestClosureInterpreter(unittest.TestCase):
+
+    CODE = """
+        cursor c;
+        int total = 0;
+        for (int i = 0; i < 12; i++) {
+            int k = i * 3;
+            total += k / 4 - i % 5;
+            if (total > 6) { c.rotate(30); c.move(total); } else { c.drawLine(-7 / 2 + 10); }
+        }
+        for (int total = 1; total < 4; total++) { c.drawCircle(total); }
+        c.drawArc(10, total); c.setThickness(0); c.drawSquare(-1); c.setColor(navy); c.drawPoint();
+        missing++; d.move(3); c.setPosition(1.5, 2); int z = 7 / 0; if (nope < 3) { c.drawPoint(); }
+    """
+
+    def test_same_results_as_tree_interpreter(self):
+        """Both execution modes produce the same state, drawing, errors and step count."""
+        syntax_tree = Parser(Lexer(self.CODE).tokenize()).parse()
+        results = []
+        for interpreter_class in (Interpreter, ClosureInterpreter):
+            interpreter = interpreter_class(syntax_tree)
+            interpreter.execute()
+            results.append((interpreter.variables, interpreter.cursors, interpreter.draw_commands,
+                            interpreter.errors, interpreter.steps))
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(len(results[1][2]), 10)
+        self.assertEqual(len(results[1][3]), 9)
+
+    def test_scoping_matches_tree_interpreter(self):
+        """Slot-resolved names follow the scoping rules of Interpreter, including failed declarations."""
+        syntax_tree = Parser(Lexer("""
+            int z = 7 / 0; int z = 1; z++;
+            int x = 1; if (x < 2) { int x = 5; x += 1; cursor c; c.drawPoint(); } x += 3;
+            int y = 7 / 0; if (1 < 2) { int y = 5; y++; } y++;
+            for (int i = 0; i < 3; i++) { int k = i; int k = 2; x += k; cursor d; d.move(i + 1); d.drawPoint(); }
+            for (int x = 10; x < 12; x++) { int q = x; } x++;
+            cursor c; cursor c; c.drawLine(x); k++; q.drawPoint();
+        """).tokenize()).parse()
+        results = []
+        for interpreter_class in (Interpreter, ClosureInterpreter):
+            interpreter = interpreter_class(syntax_tree)
+            interpreter.execute()
+            results.append((interpreter.variables, interpreter.cursors, interpreter.draw_commands,
+                            interpreter.errors, interpreter.steps))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1][0], {"z": 2, "x": 9})
+
+    def test_budget(self):
+        """The closure mode enforces the same step budget."""
+        syntax_tree = Parser(Lexer("int i = 0; while (i < 1) { i += 0; } cursor c;").tokenize()).parse()
+        interpreter = ClosureInterpreter(syntax_tree, max_steps=1000)
+        interpreter.execute()
+        self.assertEqual(interpreter.errors, ["Execution stopped: step limit of 1000 exceeded."])
+        self.assertEqual(interpreter.cursors, {})
+
+
 # Example Draw++ code snippet to test
 code = """
 cursor myCursor;
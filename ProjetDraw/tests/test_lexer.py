@@ -1,6 +1,8 @@
 # test_lexer.py
+import os
+import tempfile
 import unittest
-from lexer import Lexer
+from lexer import Lexer, IncrementalLexer
 from utils.tokens import TokenType
 
 class TestLexer(unittest.TestCase):
@@ -187,5 +189,52 @@ class TestLexer(unittest.TestCase):
         self.assertEqual(tokens[10].type, TokenType.RPAREN)     # )
         self.assertEqual(tokens[11].type, TokenType.SEMICOLON)  # ;
 
+    def test_iter_tokens_matches_tokenize(self):
+        """Test the streaming generator yields the same tokens as tokenize."""
+        code = "cursor myCursor; for (int i = 0; i < 10; i++) { myCursor.drawLine(50); }"
+        streamed = list(Lexer(code).iter_tokens())
+        tokens = self.tokenize_code(code)
+        self.assertEqual([(t.type, t.value) for t in streamed], [(t.type, t.value) for t in tokens])
+
+    def test_token_spans(self):
+        """Test tokens record their line, column and offset."""
+        tokens = self.tokenize_code("cursor c;\n  c.drawLine(10);")
+        self.assertEqual((tokens[0].line, tokens[0].column, tokens[0].offset), (1, 1, 0))
+        self.assertEqual((tokens[3].line, tokens[3].column, tokens[3].offset), (2, 3, 12))
+        self.assertEqual(tokens[7].location, "2:14")
+        self.assertEqual(tokens[7].end_offset, 25)
+        self.assertFalse(hasattr(tokens[0], "__dict__"))
+
+    def test_incremental_edits(self):
+        """Test incremental edits give the same tokens as lexing from scratch."""
+        lexer = IncrementalLexer("cursor c;\nc.drawLine(10);\nc.rotate(90);")
+        lexer.apply_edit(12, 8, "drawCircle")                 # drawLine -> drawCircle
+        lexer.set_text(lexer.source_code + "\nint i = 0;")     # Append a line
+        lexer.apply_edit(0, 10, "")                            # Remove the first line
+        expected = Lexer(lexer.source_code).tokenize()
+        self.assertEqual(
+            [(t.type, t.value, t.line, t.column, t.offset) for t in lexer.tokenize()],
+            [(t.type, t.value, t.line, t.column, t.offset) for t in expected],
+        )
+        lexer.apply_edit(0, 0, "@")
+        with self.assertRaises(SyntaxError):
+            lexer.tokenize()
+
+    def test_from_path(self):
+        """Test lexing a file through a memory map gives the same tokens."""
+        code = "cursor c;\nfor (int i = 0; i < 10; i++) { c.drawArc(50, 90); }\n"
+        with tempfile.NamedTemporaryFile("w", suffix=".draw++", delete=False) as file:
+            file.write(code)
+        try:
+            with Lexer.from_path(file.name) as lexer:
+                tokens = lexer.tokenize()
+        finally:
+            os.remove(file.name)
+        expected = self.tokenize_code(code)
+        self.assertEqual(
+            [(t.type, t.value, t.line, t.column) for t in tokens],
+            [(t.type, t.value, t.line, t.column) for t in expected],
+        )
+
 if __name__ == "__main__":
     unittest.main()
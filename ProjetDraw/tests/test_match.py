@@ -47,5 +47,14 @@ class TestMatchMethod(unittest.TestCase):
             "Expected match to return False for IDENTIFIER or LBRACE at position 3"
         )
 
+    def test_match_token_iterator(self):
+        """Teste match et expect sur un flux de tokens (itérateur) au lieu d'une liste."""
+        parser = Parser(iter(self.tokens))
+        self.assertTrue(parser.match(TokenType.LBRACE))
+        parser.expect(TokenType.LBRACE)
+        self.assertEqual(parser.peek(1).type, TokenType.DOT)
+        self.assertTrue(parser.match(TokenType.IDENTIFIER))
+        self.assertLessEqual(len(parser.tokens), 2, "Consumed tokens must not stay buffered")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+import subprocess
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:  # The raster backends are optional
+    numpy = None
+
+if numpy is not None:
+    from build_cache import BuildCache
+    from native_renderer import NativeRenderer, NativeRuntime
+    from renderer import RasterRenderer
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+WHITE = (255, 255, 255, 255)
+
+# Shapes drawn by the runtime functions themselves (lines are drawn by SDL directly)
+COMMANDS = [
+    ("point", RED, 1, 3, 4),
+    ("square", BLUE, 1, 10, 10, 8),
+    ("circle", RED, 1, 40, 30, 12),
+    ("arc", BLUE, 1, 40, 30, 20, 45.0, 200.0),
+]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestNativeRenderer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        try:
+            cls.runtime = NativeRuntime(cache=BuildCache(cls.directory.name))
+        except (OSError, subprocess.CalledProcessError):
+            cls.directory.cleanup()
+            raise unittest.SkipTest("the draw_cursor runtime cannot be built or loaded (SDL2 missing?)")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.renderer = NativeRenderer(80, 60, runtime=self.runtime)
+        self.addCleanup(self.renderer.close)
+
+    def test_matches_raster_renderer(self):
+        """The C runtime and the NumPy rasterizer draw the same pixels."""
+        pixels = self.renderer.render(COMMANDS)
+        expected = RasterRenderer(80, 60).render(COMMANDS)
+        self.assertTrue(numpy.array_equal(pixels, expected))
+
+    def test_persistent_renderer(self):
+        """Drawings accumulate until clear() repaints the background."""
+        self.renderer.render([("point", RED, 1, 1, 1)])
+        pixels = self.renderer.render([("line", BLUE, 1, 5, 5, 20, 5)])
+        self.assertEqual(tuple(pixels[1, 1]), RED)
+        self.assertEqual(tuple(pixels[5, 20]), BLUE)
+
+        self.renderer.clear()
+        self.assertTrue((self.renderer.pixels() == WHITE).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from lexer import Lexer
+from parser import Parser
+from interpreter import Interpreter
+from optimizer import Optimizer
+import compiler
+from utils.ast_nodes import Block, CursorDeclaration, DrawLine, Value, VariableDeclaration
+from utils.tokens import TokenType
+
+
+def parse(code):
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def test_folds_constants_with_c_semantics(self):
+        """Literals become numbers and constant arithmetic is folded; divisions by zero are kept."""
+        optimizer = Optimizer()
+        ast = optimizer.optimize(parse("int x = 2 * (3 + 4) - -7 / 2; float f = 7.5 / 2; int z = 1 / 0;"))
+        self.assertEqual(ast[0], VariableDeclaration(TokenType.INT, "x", Value(17)))
+        self.assertEqual(ast[1].value, Value(3.75))
+        self.assertEqual(ast[2].value.kind, parse("int z = 1 / 0;")[0].value.kind)
+        self.assertEqual(optimizer.folded, 5)
+
+    def test_removes_dead_branches(self):
+        """Statically known conditions select a block or remove the statement."""
+        optimizer = Optimizer()
+        ast = optimizer.optimize(parse("""
+            cursor c;
+            if (2 * 3 > 5) { c.drawLine(10); } else { c.drawPoint(); }
+            if (1 > 2) { c.drawPoint(); }
+            while (3 < 1) { c.drawPoint(); }
+            for (int i = 5; i < 2; i++) { c.drawPoint(); }
+        """))
+        self.assertEqual(ast, [CursorDeclaration("c"), Block([DrawLine("c", Value(10))])])
+        self.assertEqual(optimizer.removed, 4)
+
+    def test_same_results_and_c_code(self):
+        """The optimized program draws and reports the same; the C backend accepts it."""
+        syntax_tree = parse("""
+            cursor c; int x = 10 - 4;
+            if (x > 2 + 1) { int y = x * 2; c.drawLine(y); }
+            for (int i = 0; i < 3; i++) { c.rotate(-(-45)); c.drawCircle(i + 10 % 3); }
+            x += 2147483647 + 1; c.drawArc(5 % 3, 90 - -90); int z = x / (3 - 3);
+        """)
+        results = []
+        for tree in (syntax_tree, Optimizer().optimize(syntax_tree)):
+            interpreter = Interpreter(tree)
+            interpreter.execute()
+            results.append((interpreter.variables, interpreter.draw_commands, interpreter.errors))
+        self.assertEqual(results[0], results[1])
+        c_code = compiler.generate_c_code(Optimizer().optimize(syntax_tree))
+        self.assertIn("drawArc(renderer, &c, 2, 180);", c_code)
+        self.assertIn("(2147483647 + 1)", c_code)
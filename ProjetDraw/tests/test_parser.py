@@ -1,5 +1,11 @@
+import unittest
 from lexer import Lexer
 from parser import Parser
+from utils.tokens import TokenType
+from utils.ast_nodes import (
+    BinaryOp, Block, Condition, CursorDeclaration, DrawCircle, ForLoop, SetPosition, UnaryOp, Value,
+    Variable, VariableDeclaration, VariableUpdate,
+)
 
 def test_parser():
     
@@ -7,31 +13,17 @@ def test_parser():
         {
             "description": "Déclaration de curseur",
             "code": "cursor myCursor;",
-            "expected_ast": [{"type": "CURSOR_DECLARATION", "name": "myCursor"}],
+            "expected_ast": [CursorDeclaration("myCursor")],
         },
         {
             "description": "Positionnement du curseur",
             "code": "myCursor.setPosition(10, 20);",
-            "expected_ast": [
-                {
-                    "type": "SET_POSITION",
-                    "cursor": "myCursor",
-                    "x": {"type": "VALUE", "value": "10"},
-                    "y": {"type": "VALUE", "value": "20"},
-                }
-            ],
+            "expected_ast": [SetPosition("myCursor", Value("10"), Value("20"))],
         },
         {
             "description": "Déclaration de variable",
             "code": "int i = 10;",
-            "expected_ast": [
-                {
-                    "type": "VARIABLE_DECLARATION",
-                    "var_type": "int",
-                    "name": "i",
-                    "value": {"type": "VALUE", "value": "10"},
-                }
-            ],
+            "expected_ast": [VariableDeclaration(TokenType.INT, "i", Value("10"))],
         },
         {
             "description": "Boucle for simple",
@@ -41,38 +33,12 @@ def test_parser():
             }
             """,
             "expected_ast": [
-                {
-                    "type": "FOR_LOOP",
-                    "init": {
-                        "type": "VARIABLE_DECLARATION",
-                        "var_type": "int",
-                        "name": "i",
-                        "value": {"type": "VALUE", "value": "0"},
-                    },
-                    "condition": {
-                        "type": "CONDITION",
-                        "left": {"type": "VALUE", "value": "i"},
-                        "operator": "LESS_EQUAL",
-                        "right": {"type": "VALUE", "value": "10"},
-                    },
-                    "update": {
-                        "type": "VARIABLE_UPDATE",
-                        "name": "i",
-                        "operator": "PLUS_PLUS",
-                    },
-                    "body": {
-                        "type": "BLOCK",
-                        "statements": [
-                            [
-                                {
-                                    "type": "DRAW_CIRCLE",
-                                    "cursor": "myCursor",
-                                    "radius": {"type": "VALUE", "value": "10"},
-                                }
-                            ]
-                        ],
-                    },
-                }
+                ForLoop(
+                    VariableDeclaration(TokenType.INT, "i", Value("0")),
+                    Condition(Variable("i"), TokenType.LESS_EQUAL, Value("10")),
+                    VariableUpdate("i", TokenType.PLUS_PLUS),
+                    Block([DrawCircle("myCursor", Value("10"))]),
+                )
             ],
         },
     ]
@@ -111,5 +77,41 @@ def test_parser():
         print("-" * 50)
 
 
+class TestExpressions(unittest.TestCase):
+
+    def parse_expression(self, code):
+        """Helper function to parse a single expression."""
+        parser = Parser(Lexer(code).tokenize())
+        expression = parser.parse_expression()
+        self.assertIsNone(parser.peek(), "The whole expression should be consumed")
+        return expression
+
+    def test_precedence(self):
+        """`*` binds tighter than `+`."""
+        self.assertEqual(
+            self.parse_expression("1 + 2 * x"),
+            BinaryOp(Value("1"), TokenType.PLUS, BinaryOp(Value("2"), TokenType.MULTIPLY, Variable("x"))),
+        )
+
+    def test_left_associativity_and_parentheses(self):
+        """Same-precedence operators group to the left; parentheses override."""
+        expression = self.parse_expression("10 - 4 - 3")
+        self.assertEqual(expression.left.operator, TokenType.MINUS)
+        self.assertEqual(expression.right, Value("3"))
+        expression = self.parse_expression("(1 + 2) % 3")
+        self.assertEqual(expression.operator, TokenType.MODULO)
+        self.assertEqual(expression.left.operator, TokenType.PLUS)
+
+    def test_unary_minus(self):
+        """Negative literals and negated sub-expressions."""
+        self.assertEqual(self.parse_expression("-5"), Value("-5"))
+        self.assertEqual(self.parse_expression("-(x)"), UnaryOp(TokenType.MINUS, Variable("x")))
+
+    def test_unbalanced_parentheses(self):
+        """A missing closing parenthesis is a syntax error."""
+        with self.assertRaises(SyntaxError):
+            self.parse_expression("(1 + 2")
+
+
 if __name__ == "__main__":
     test_parser()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import struct
+import unittest
+import zlib
+
+try:
+    import numpy
+except ImportError:  # The raster backend is optional
+    numpy = None
+
+if numpy is not None:
+    from renderer import RasterRenderer, arc_segments, png_bytes, ppm_bytes, ppm_pixels, render_source
+
+RED = (255, 0, 0, 255)
+WHITE = (255, 255, 255, 255)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestRasterRenderer(unittest.TestCase):
+
+    def test_shapes(self):
+        """Lines include both ends, squares are outlines, pixels outside of the canvas are clipped."""
+        renderer = RasterRenderer(20, 10)
+        pixels = renderer.render([
+            ("line", RED, 1, 0, 0, 4, 2),
+            ("square", RED, 1, 10, 2, 4),
+            ("point", RED, 1, 30, 30),
+        ])
+        drawn = {(int(x), int(y)) for y, x in zip(*numpy.nonzero(pixels[:, :, 1] == 0))}
+        self.assertTrue({(0, 0), (2, 1), (4, 2)} <= drawn)
+        self.assertIn((13, 5), drawn)
+        self.assertNotIn((11, 3), drawn)
+        self.assertEqual(len(drawn), 5 + 12)
+
+    def test_thickness(self):
+        """A thick point covers a thickness x thickness square."""
+        pixels = RasterRenderer(10, 10).render([("point", RED, 3, 5, 5)])
+        self.assertEqual(int((pixels[:, :, 1] == 0).sum()), 9)
+        self.assertEqual(tuple(pixels[4, 4]), RED)
+        self.assertEqual(tuple(pixels[3, 3]), WHITE)
+
+    def test_circle_is_midpoint(self):
+        """Circles are the midpoint circles drawn by drawCircle() in C."""
+        def midpoint_octant(radius):
+            x, y, decision = 0, radius, 1 - radius
+            points = []
+            while x <= y:
+                points.append((x, y))
+                x += 1
+                if decision < 0:
+                    decision += 2 * x + 1
+                else:
+                    y -= 1
+                    decision += 2 * (x - y) + 1
+            return points
+
+        for radius in (1, 2, 5, 37, 250):
+            xs, ys = RasterRenderer.circle_pixels(0, 0, radius)
+            pixels = set(zip(xs.tolist(), ys.tolist()))
+            expected = {(sx * a, sy * b) for x, y in midpoint_octant(radius)
+                        for a, b in ((x, y), (y, x)) for sx in (1, -1) for sy in (1, -1)}
+            self.assertEqual(pixels, expected)
+
+    def test_arc_sampling_adapts_to_radius(self):
+        """Arcs get about one sample per pixel of length, and at least one per degree."""
+        self.assertEqual(arc_segments(2, 90), 90)
+        self.assertEqual(arc_segments(200, 90), 315)
+        xs, ys = RasterRenderer.arc_pixels(0, 0, 200, 0, 90)
+        self.assertEqual((xs[0], ys[0], xs[-1], ys[-1]), (200, 0, 0, 200))
+        self.assertEqual(len(RasterRenderer.arc_pixels(0, 0, 10, 30, 20)[0]), 0)
+
+    def test_render_source(self):
+        """A script is executed and rendered."""
+        pixels, errors = render_source("cursor c; c.setPosition(50, 40); c.setColor(red); c.drawCircle(20);",
+                                       width=100, height=80)
+        self.assertEqual(errors, [])
+        self.assertEqual(tuple(pixels[40, 70]), RED)
+        self.assertEqual(tuple(pixels[40, 50]), WHITE)
+
+    def test_image_files(self):
+        """PNG and PPM encodings hold the pixels."""
+        pixels = RasterRenderer(3, 2).render([("point", RED, 1, 1, 1)])
+        png = png_bytes(pixels)
+        self.assertEqual(png[:8], b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(struct.unpack(">II", png[16:24]), (3, 2))
+        rows = zlib.decompress(png[41:-12])
+        self.assertEqual(rows[1 + 3 * 4 + 1 + 4:1 + 3 * 4 + 1 + 8], bytes(RED))
+        self.assertEqual(ppm_bytes(pixels), b"P6\n3 2\n255\n" + b"\xff" * 12 + b"\xff\x00\x00" + b"\xff" * 3)
+        self.assertTrue(numpy.array_equal(ppm_pixels(ppm_bytes(pixels)), pixels))
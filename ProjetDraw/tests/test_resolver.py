@@ -0,0 +1,29 @@
+import unittest
+from resolver import Resolver
+
+
+class TestResolver(unittest.TestCase):
+
+    def test_blocks_scope_their_declarations(self):
+        """A name declared in a block is only visible until the block ends."""
+        resolver = Resolver()
+        self.assertEqual(resolver.declare("x"), 0)
+        resolver.push_scope()
+        self.assertEqual(resolver.declare("y"), 1)
+        self.assertEqual(resolver.lookup("x"), 0)
+        self.assertEqual(resolver.pop_scope(), [1])
+        self.assertIsNone(resolver.lookup("y"))
+        self.assertEqual(resolver.global_slots(), {"x": 0})
+        self.assertEqual(resolver.slot_count, 2)
+
+    def test_redeclaration_and_shadowing(self):
+        """A visible name keeps its slot unless it is shadowed."""
+        resolver = Resolver()
+        resolver.declare("i")
+        resolver.push_scope()
+        self.assertEqual(resolver.declare("i"), 0)
+        self.assertEqual(resolver.declare("i", shadow=True), 1)
+        self.assertEqual(resolver.lookup("i"), 1)
+        resolver.pop_scope()
+        self.assertEqual(resolver.lookup("i"), 0)
+        self.assertEqual(resolver.names, ["i", "i"])
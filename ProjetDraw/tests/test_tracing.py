@@ -0,0 +1,45 @@
+import contextlib
+import io
+import unittest
+from lexer import Lexer
+from parser import Parser
+from utils.tracing import Tracer
+
+
+class TestTracing(unittest.TestCase):
+
+    CODE = "cursor c; while (i < 10) { c.drawLine(5); }"
+
+    def parse(self, tracer=None):
+        """Parses CODE and returns the parser and what was written to stdout."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            parser = Parser(Lexer(self.CODE).tokenize(), tracer=tracer)
+            parser.parse()
+        return parser, output.getvalue()
+
+    def test_parse_is_silent_by_default(self):
+        """Parsing writes nothing to stdout and records nothing when tracing is off."""
+        parser, output = self.parse(Tracer(enabled=False))
+        self.assertEqual(output, "")
+        self.assertEqual(len(parser.tracer.events), 0)
+
+    def test_events_recorded_when_enabled(self):
+        """An enabled tracer records statement, condition and block events."""
+        parser, output = self.parse(Tracer(enabled=True))
+        self.assertEqual(output, "")
+        names = [name for _, name, _ in parser.tracer.events]
+        self.assertIn("statement", names)
+        self.assertIn("condition", names)
+        self.assertIn("block_end", names)
+
+    def test_ring_buffer_capacity(self):
+        """Only the most recent events are kept."""
+        tracer = Tracer(enabled=True, capacity=3)
+        for index in range(10):
+            tracer.record("event", index=index)
+        self.assertEqual([fields["index"] for _, _, fields in tracer.events], [7, 8, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
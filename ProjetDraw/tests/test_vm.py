@@ -0,0 +1,120 @@
+import unittest
+from lexer import Lexer
+from parser import Parser
+from interpreter import Interpreter
+from vm import BytecodeCompiler, Opcode, VirtualMachine
+
+
+def parse(code):
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+class TestBytecodeCompiler(unittest.TestCase):
+
+    def test_constants_are_preloaded_registers(self):
+        """Literals go to the constant pool once; variables get the registers after them."""
+        code_object = BytecodeCompiler().compile(parse("int x = 4; int y = 4; x += 1;"))
+        self.assertEqual(code_object.constants, [4, 1])
+        self.assertEqual(code_object.global_variables, {"x": 2, "y": 3})
+        self.assertIn("ADD", code_object.disassemble()[-1])
+
+    def test_loop_jumps_back_to_its_condition(self):
+        """A while loop counts a step, tests its condition and jumps back."""
+        code_object = BytecodeCompiler().compile(parse("int i = 0; while (i < 3) { i++; }"))
+        opcodes = [Opcode(op) for op in code_object.code[::4]]
+        self.assertEqual(opcodes, [
+            Opcode.STEP, Opcode.MOVE,
+            Opcode.STEP, Opcode.STEP, Opcode.JUMP_UNLESS_LT, Opcode.STEP, Opcode.ADD, Opcode.JUMP,
+        ])
+        self.assertEqual(code_object.code[-3], 12)  # Back to the STEP of the condition
+
+    def test_names_are_resolved_lexically(self):
+        """Names used outside of their block compile to errors reported at run time."""
+        code_object = BytecodeCompiler().compile(
+            parse("if (1 < 2) { int x = 1; cursor c; } x++; c.drawPoint(); int y = 0; int y = 1;"))
+        self.assertEqual(code_object.messages, ["Cursor 'c' is not declared.", "Variable 'y' is already declared."])
+        self.assertNotIn("x", code_object.global_variables)
+        self.assertIn("x", code_object.register_names.values())  # Read as undeclared
+
+
+class TestVirtualMachine(unittest.TestCase):
+
+    CODE = """
+        cursor c;
+        int total = 0;
+        for (int i = 0; i < 12; i++) {
+            int k = i * 3;
+            total += k / 4 - i % 5;
+            if (total > 6) { c.rotate(30); c.move(total); } else { c.drawLine(-7 / 2 + 10); }
+        }
+        for (int total = 1; total < 4; total++) { c.drawCircle(total); }
+        c.drawArc(10, total); c.setThickness(0); c.drawSquare(-1); c.setColor(navy); c.drawPoint();
+        c.setPosition(1.5, 2); int n = 0; while (n != 9) { n++; } if (n >= 9) { c.drawPoint(); }
+    """
+
+    def test_same_results_as_tree_interpreter(self):
+        """The VM produces the same state, drawing, errors and step count as Interpreter."""
+        syntax_tree = parse(self.CODE)
+        results = []
+        for interpreter_class in (Interpreter, VirtualMachine):
+            interpreter = interpreter_class(syntax_tree)
+            interpreter.execute()
+            results.append((interpreter.variables, interpreter.cursors, interpreter.draw_commands,
+                            interpreter.errors, interpreter.steps))
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(len(results[1][2]), 10)
+        self.assertEqual(len(results[1][3]), 3)
+
+    def test_name_errors_do_not_prevent_the_run(self):
+        """Undeclared or redeclared names fail their statement only, as in Interpreter."""
+        tree_result, vm_result = self.run_backends(
+            "cursor c; c.drawCircle(10); d.move(3); c.drawSquare(20); "
+            "int y = 0; int y = 1; cursor c; z++; y += z; int w = 1/0; int w = 2; c.drawLine(w + y);")
+        self.assertEqual(tree_result, vm_result)
+        self.assertEqual(len(vm_result[2]), 3)
+        self.assertEqual(vm_result[0], {"y": 0, "w": 2})
+        self.assertEqual(vm_result[3][:2], ["Cursor 'd' is not declared.", "Variable 'y' is already declared."])
+
+    def run_backends(self, code, **options):
+        """Runs `code` with Interpreter and VirtualMachine; returns their final state and drawing."""
+        syntax_tree = parse(code)
+        results = []
+        for interpreter_class in (Interpreter, VirtualMachine):
+            interpreter = interpreter_class(syntax_tree, **options)
+            interpreter.execute()
+            results.append((interpreter.variables, interpreter.cursors, interpreter.draw_commands,
+                            interpreter.errors))
+        return results
+
+    def test_draw_point_without_registers(self):
+        """A program without constants nor variables runs (drawPoint() reads no register)."""
+        vm = VirtualMachine(parse("cursor c; c.drawPoint();"))
+        vm.execute()
+        self.assertEqual(vm.errors, [])
+        self.assertEqual(list(vm.draw_commands), [("point", (0, 0, 0, 255), 1, 0, 0)])
+
+    def test_runtime_error_skips_the_statement(self):
+        """A division by zero only makes its statement fail, as in Interpreter."""
+        tree_result, vm_result = self.run_backends(
+            "int x = 1; for (int i = 0; i < 3; i++) { x += 1 / (i - 1); } x += 10;")
+        self.assertEqual(tree_result, vm_result)
+        self.assertEqual(vm_result[0], {"x": 11})
+
+    def test_failed_declaration_leaves_the_variable_undeclared(self):
+        """A variable whose value fails is not declared: later uses of it fail instead of reading 0."""
+        tree_result, vm_result = self.run_backends("int a = 1/0; cursor c; c.drawLine(a + 5); c.setPosition(a, 2);")
+        self.assertEqual(tree_result, vm_result)
+        self.assertEqual(vm_result[0], {})
+        self.assertEqual(len(vm_result[2]), 0)
+        self.assertEqual(vm_result[3][:3], [
+            "Division by zero in expression.",
+            "Unable to extract value for variable 'a'.",
+            "Variable 'a' is not declared.",
+        ])
+
+    def test_budget(self):
+        """The VM enforces the same step budget and keeps the state reached."""
+        tree_result, vm_result = self.run_backends("int i = 0; while (i < 1) { i += 0; } cursor c;", max_steps=1000)
+        self.assertEqual(tree_result, vm_result)
+        self.assertEqual(vm_result[3], ["Execution stopped: step limit of 1000 exceeded."])
+        self.assertEqual(vm_result[0], {"i": 0})
@@ -0,0 +1,318 @@
+# ast_nodes.py
+# Node classes of the Draw++ abstract syntax tree (AST) produced by the parser.
+from enum import IntEnum
+from utils.tokens import TokenType
+
+# Enumeration of all node kinds; integer values allow table-based dispatch
+class NodeKind(IntEnum):
+    # Declarations and variable updates
+    CURSOR_DECLARATION = 0    # cursor c;
+    VARIABLE_DECLARATION = 1  # int x = 5;
+    VARIABLE_UPDATE = 2       # x++, x--, x += 2, x -= 2
+
+    # Cursor methods
+    SET_POSITION = 3          # c.setPosition(x, y);
+    SET_COLOR = 4             # c.setColor(red);
+    SET_THICKNESS = 5         # c.setThickness(2);
+    MOVE = 6                  # c.move(10);
+    ROTATE = 7                # c.rotate(90);
+    DRAW_LINE = 8             # c.drawLine(50);
+    DRAW_SQUARE = 9           # c.drawSquare(50);
+    DRAW_CIRCLE = 10          # c.drawCircle(50);
+    DRAW_POINT = 11           # c.drawPoint();
+    DRAW_ARC = 12             # c.drawArc(50, 90);
+    ANIMATE = 13              # c.animate(10);
+
+    # Control structures
+    IF_STATEMENT = 14         # if (...) { ... } else { ... }
+    WHILE_LOOP = 15           # while (...) { ... }
+    FOR_LOOP = 16             # for (int i = 0; i < n; i++) { ... }
+    BLOCK = 17                # { ... }
+
+    # Conditions and expressions
+    CONDITION = 18            # left < right
+    EXPRESSION = 19           # left + right
+    UNARY = 20                # -operand
+    VALUE = 21                # Number literal
+    VARIABLE = 22             # Variable reference
+
+
+class Node:
+    """
+    Base class of all AST nodes.
+    - Subclasses declare their fields in `__slots__` (no per-node __dict__)
+      and their integer `kind`, used by the backends to dispatch.
+    """
+    __slots__ = ()
+    kind = None
+
+    def fields(self):
+        """
+        Returns the node's fields as (name, value) pairs, in declaration order.
+        """
+        return [(name, getattr(self, name)) for name in type(self).__slots__]
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.fields() == other.fields()
+
+    def __repr__(self):
+        details = ", ".join(f"{name}={value!r}" for name, value in self.fields())
+        return f"{type(self).__name__}({details})"
+
+
+# --- Declarations and variable updates ---
+class CursorDeclaration(Node):
+    __slots__ = ("name",)
+    kind = NodeKind.CURSOR_DECLARATION
+
+    def __init__(self, name):
+        self.name = name  # Cursor name
+
+
+class VariableDeclaration(Node):
+    __slots__ = ("var_type", "name", "value")
+    kind = NodeKind.VARIABLE_DECLARATION
+
+    def __init__(self, var_type, name, value):
+        self.var_type = var_type  # TokenType.INT or TokenType.FLOAT
+        self.name = name          # Variable name
+        self.value = value        # Initial value (expression node)
+
+
+class VariableUpdate(Node):
+    __slots__ = ("name", "operator", "value")
+    kind = NodeKind.VARIABLE_UPDATE
+
+    def __init__(self, name, operator, value=None):
+        self.name = name          # Variable name
+        self.operator = operator  # TokenType.PLUS_PLUS, MINUS_MINUS, PLUS_EQUAL or MINUS_EQUAL
+        self.value = value        # Expression node for += and -=, None for ++ and --
+
+
+# --- Cursor methods ---
+class SetPosition(Node):
+    __slots__ = ("cursor", "x", "y")
+    kind = NodeKind.SET_POSITION
+
+    def __init__(self, cursor, x, y):
+        self.cursor = cursor
+        self.x = x
+        self.y = y
+
+
+class SetColor(Node):
+    __slots__ = ("cursor", "color")
+    kind = NodeKind.SET_COLOR
+
+    def __init__(self, cursor, color):
+        self.cursor = cursor
+        self.color = color  # Color name (e.g. "red")
+
+
+class SetThickness(Node):
+    __slots__ = ("cursor", "thickness")
+    kind = NodeKind.SET_THICKNESS
+
+    def __init__(self, cursor, thickness):
+        self.cursor = cursor
+        self.thickness = thickness
+
+
+class Move(Node):
+    __slots__ = ("cursor", "distance")
+    kind = NodeKind.MOVE
+
+    def __init__(self, cursor, distance):
+        self.cursor = cursor
+        self.distance = distance
+
+
+class Rotate(Node):
+    __slots__ = ("cursor", "angle")
+    kind = NodeKind.ROTATE
+
+    def __init__(self, cursor, angle):
+        self.cursor = cursor
+        self.angle = angle
+
+
+class DrawLine(Node):
+    __slots__ = ("cursor", "length")
+    kind = NodeKind.DRAW_LINE
+
+    def __init__(self, cursor, length):
+        self.cursor = cursor
+        self.length = length
+
+
+class DrawSquare(Node):
+    __slots__ = ("cursor", "side_length")
+    kind = NodeKind.DRAW_SQUARE
+
+    def __init__(self, cursor, side_length):
+        self.cursor = cursor
+        self.side_length = side_length
+
+
+class DrawCircle(Node):
+    __slots__ = ("cursor", "radius")
+    kind = NodeKind.DRAW_CIRCLE
+
+    def __init__(self, cursor, radius):
+        self.cursor = cursor
+        self.radius = radius
+
+
+class DrawPoint(Node):
+    __slots__ = ("cursor",)
+    kind = NodeKind.DRAW_POINT
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+
+class DrawArc(Node):
+    __slots__ = ("cursor", "radius", "angle")
+    kind = NodeKind.DRAW_ARC
+
+    def __init__(self, cursor, radius, angle):
+        self.cursor = cursor
+        self.radius = radius
+        self.angle = angle
+
+
+class Animate(Node):
+    __slots__ = ("cursor", "steps")
+    kind = NodeKind.ANIMATE
+
+    def __init__(self, cursor, steps):
+        self.cursor = cursor
+        self.steps = steps
+
+
+# --- Control structures ---
+class IfStatement(Node):
+    __slots__ = ("condition", "true_block", "false_block")
+    kind = NodeKind.IF_STATEMENT
+
+    def __init__(self, condition, true_block, false_block=None):
+        self.condition = condition
+        self.true_block = true_block
+        self.false_block = false_block  # None when there is no `else`
+
+
+class WhileLoop(Node):
+    __slots__ = ("condition", "body")
+    kind = NodeKind.WHILE_LOOP
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+
+class ForLoop(Node):
+    __slots__ = ("init", "condition", "update", "body")
+    kind = NodeKind.FOR_LOOP
+
+    def __init__(self, init, condition, update, body):
+        self.init = init            # VariableDeclaration
+        self.condition = condition  # Condition
+        self.update = update        # VariableUpdate
+        self.body = body            # Block
+
+
+class Block(Node):
+    __slots__ = ("statements",)
+    kind = NodeKind.BLOCK
+
+    def __init__(self, statements):
+        self.statements = statements  # List of statement nodes
+
+
+# --- Conditions and expressions ---
+class Condition(Node):
+    __slots__ = ("left", "operator", "right")
+    kind = NodeKind.CONDITION
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator  # Comparison TokenType (LESS_THAN, EQUAL, ...)
+        self.right = right
+
+
+class BinaryOp(Node):
+    __slots__ = ("left", "operator", "right")
+    kind = NodeKind.EXPRESSION
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator  # Arithmetic TokenType (PLUS, MULTIPLY, ...)
+        self.right = right
+
+
+class UnaryOp(Node):
+    __slots__ = ("operator", "operand")
+    kind = NodeKind.UNARY
+
+    def __init__(self, operator, operand):
+        self.operator = operator  # TokenType.MINUS
+        self.operand = operand
+
+
+class Value(Node):
+    __slots__ = ("value",)
+    kind = NodeKind.VALUE
+
+    def __init__(self, value):
+        self.value = value  # Literal text (e.g. "10", "2.5"), a number once optimized (see optimizer.py)
+
+
+class Variable(Node):
+    __slots__ = ("name",)
+    kind = NodeKind.VARIABLE
+
+    def __init__(self, name):
+        self.name = name
+
+
+# --- Compact serialization ---
+# Nodes are encoded as plain tuples (kind, field1, field2, ...) made of ints, strings,
+# lists and None only, so an AST can be stored with `marshal` (see ast_cache.py).
+NODE_CLASSES = {cls.kind: cls for cls in Node.__subclasses__()}  # NodeKind -> node class
+TOKEN_TYPE_FIELDS = frozenset(("operator", "var_type"))          # Fields holding a TokenType
+
+
+def to_tuple(value):
+    """
+    Encodes a node (or a list of nodes) into nested tuples and lists.
+    - TokenType fields are stored as their string value.
+    """
+    if isinstance(value, Node):
+        encoded = [int(value.kind)]
+        for name, field in value.fields():
+            if name in TOKEN_TYPE_FIELDS and field is not None:
+                encoded.append(field.value)
+            else:
+                encoded.append(to_tuple(field))
+        return tuple(encoded)
+    if isinstance(value, list):
+        return [to_tuple(item) for item in value]
+    return value
+
+
+def from_tuple(value):
+    """
+    Rebuilds the nodes encoded by `to_tuple`.
+    """
+    if isinstance(value, tuple):
+        cls = NODE_CLASSES[value[0]]
+        fields = []
+        for name, field in zip(cls.__slots__, value[1:]):
+            if name in TOKEN_TYPE_FIELDS and field is not None:
+                fields.append(TokenType(field))
+            else:
+                fields.append(from_tuple(field))
+        return cls(*fields)
+    if isinstance(value, list):
+        return [from_tuple(item) for item in value]
+    return value
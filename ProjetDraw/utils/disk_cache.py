@@ -0,0 +1,137 @@
+# disk_cache.py
+# Small size-bounded key/value store on disk, shared by the Draw++ caches.
+import os
+import shutil
+import tempfile
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MiB per cache directory
+
+
+def default_cache_dir(name):
+    """
+    Returns the directory used for the cache `name`.
+    - $DRAWPP_CACHE_DIR/<name> if set, else $XDG_CACHE_HOME (or ~/.cache)/drawpp/<name>.
+    """
+    root = os.environ.get("DRAWPP_CACHE_DIR")
+    if not root:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(base, "drawpp")
+    return os.path.join(root, name)
+
+
+class DiskCache:
+    """
+    Stores byte strings in one file per key.
+    - Writes are atomic (temporary file + os.replace), so concurrent processes
+      never read a partial entry.
+    - Reading an entry refreshes its modification time; when the directory grows
+      beyond `max_bytes`, the least recently used entries are deleted first.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initializes the cache.
+        Args:
+            directory: Folder holding the entries (created on first write).
+            max_bytes: Maximum total size of the entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, key):
+        """
+        Returns the file path of the entry `key` (a hexadecimal digest).
+        """
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        Returns the bytes stored under `key`, or None if there is no such entry.
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # Mark the entry as recently used
+        except OSError:
+            pass
+        return data
+
+    def copy(self, key, path):
+        """
+        Copies the entry `key` to `path` and marks it as recently used, without loading it;
+        returns False if there is no such entry. The copy outlives the eviction of the entry.
+        """
+        try:
+            shutil.copyfile(self.path_for(key), path)
+        except FileNotFoundError:
+            return False
+        try:
+            os.utime(self.path_for(key))
+        except OSError:
+            pass
+        return True
+
+    def put(self, key, data):
+        """
+        Stores `data` under `key`, then evicts old entries if the cache is too large.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, self.path_for(key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """
+        Returns the entries as (mtime, size, path) tuples, least recently used first.
+        """
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.startswith(".tmp-"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache fits in `max_bytes`.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -61,20 +61,49 @@ class TokenType(Enum):
     COMMA = "COMMA"                  # Comma ','
     DOT = "DOT"                      # Dot '.'
 
-# Representation of a token with type and value
+# Representation of a token with type, value and source span
 class Token:
-    def __init__(self, type, value):
+    # Slots avoid a per-instance __dict__, large token lists stay compact
+    __slots__ = ("type", "value", "line", "column", "offset")
+
+    def __init__(self, type, value, line=None, column=None, offset=None):
         """
         Initializes a token with its type (from TokenType) and value.
         Args:
             type: TokenType enum representing the token's type.
             value: Actual value of the token (e.g., 'cursor', '100', '>').
+            line: 1-based line of the token in the source (None if unknown).
+            column: 1-based column of the token's first character (None if unknown).
+            offset: 0-based character offset of the token in the source (None if unknown).
         """
         self.type = type  # Token type
         self.value = value  # Token value
+        self.line = line  # Source line
+        self.column = column  # Source column
+        self.offset = offset  # Source offset
+
+    @property
+    def end_offset(self):
+        """
+        Returns the offset just past the token's last character (None if unknown).
+        """
+        if self.offset is None:
+            return None
+        return self.offset + len(self.value)
+
+    @property
+    def location(self):
+        """
+        Returns a readable `line:column` location, or None if the token has no span.
+        """
+        if self.line is None:
+            return None
+        return f"{self.line}:{self.column}"
     
     def __repr__(self):
         """
         Returns a string representation of the token for debugging purposes.
         """
-        return f"Token(type={self.type}, value={self.value})"
+        if self.line is None:
+            return f"Token(type={self.type}, value={self.value})"
+        return f"Token(type={self.type}, value={self.value}, at={self.line}:{self.column})"
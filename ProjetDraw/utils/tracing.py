@@ -0,0 +1,57 @@
+# tracing.py
+# Structured tracing for the Draw++ parser and interpreter.
+# Events are kept in a bounded ring buffer instead of being printed to stdout.
+import os
+import time
+from collections import deque
+
+TRACE_ENV_VAR = "DRAWPP_TRACE"  # Set to 1/true/yes/on to enable tracing by default
+DEFAULT_CAPACITY = 1024         # Number of events kept before the oldest are dropped
+
+
+def tracing_enabled_by_env():
+    """
+    Returns True if tracing is enabled through the DRAWPP_TRACE environment variable.
+    """
+    return os.environ.get(TRACE_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class Tracer:
+    """
+    Records trace events into a ring buffer.
+    - Disabled by default (unless DRAWPP_TRACE is set); callers check `enabled`
+      before building an event so tracing costs almost nothing when off.
+    - Each event is a tuple (timestamp, name, fields).
+    """
+    def __init__(self, enabled=None, capacity=DEFAULT_CAPACITY):
+        """
+        Initializes the tracer.
+        Args:
+            enabled: True/False to force tracing on or off, None to follow DRAWPP_TRACE.
+            capacity: Maximum number of events kept in the ring buffer.
+        """
+        self.enabled = tracing_enabled_by_env() if enabled is None else enabled
+        self.events = deque(maxlen=capacity)
+
+    def record(self, name, **fields):
+        """
+        Records an event with its fields (ignored when tracing is disabled).
+        """
+        if self.enabled:
+            self.events.append((time.perf_counter(), name, fields))
+
+    def clear(self):
+        """
+        Removes all recorded events.
+        """
+        self.events.clear()
+
+    def format_events(self):
+        """
+        Returns the recorded events as readable lines, oldest first.
+        """
+        lines = []
+        for timestamp, name, fields in self.events:
+            details = ", ".join(f"{key}={value}" for key, value in fields.items())
+            lines.append(f"[{timestamp:.6f}] {name}: {details}")
+        return lines
@@ -0,0 +1,787 @@
+# vm.py
+# Register-based bytecode virtual machine for Draw++.
+# The AST is compiled to a flat array of integers and executed by a single dispatch loop.
+from array import array
+from bisect import bisect_right
+from enum import IntEnum
+
+from interpreter import ExecutionLimitError, Interpreter, apply_arithmetic, parse_number
+from resolver import Resolver
+from utils.ast_nodes import Node, NodeKind
+from utils.colors import DEFAULT_COLOR
+from utils.tokens import TokenType
+
+INSTRUCTION_SIZE = 4  # Every instruction is (opcode, a, b, c); unused operands are 0
+
+
+class Opcode(IntEnum):
+    # Execution budget
+    STEP = 0           # count_step(a)
+
+    # Registers and arithmetic (a is the destination register)
+    MOVE = 1           # r[a] = r[b]
+    ADD = 2            # r[a] = r[b] + r[c]
+    SUB = 3            # r[a] = r[b] - r[c]
+    MUL = 4            # r[a] = r[b] * r[c]
+    DIV = 5            # r[a] = r[b] / r[c] (C semantics)
+    MOD = 6            # r[a] = r[b] % r[c] (C semantics)
+    NEG = 7            # r[a] = -r[b]
+
+    # Jumps (targets are indexes in the code array)
+    JUMP = 8           # goto a
+    JUMP_UNLESS_EQ = 9   # if not r[a] == r[b]: goto c
+    JUMP_UNLESS_NE = 10  # if not r[a] != r[b]: goto c
+    JUMP_UNLESS_LT = 11  # if not r[a] < r[b]: goto c
+    JUMP_UNLESS_GT = 12  # if not r[a] > r[b]: goto c
+    JUMP_UNLESS_LE = 13  # if not r[a] <= r[b]: goto c
+    JUMP_UNLESS_GE = 14  # if not r[a] >= r[b]: goto c
+
+    # Cursors (a is the cursor slot)
+    NEW_CURSOR = 15     # cursors[a] = createCursor()
+    SET_POSITION = 16   # setPosition(r[b], r[c])
+    SET_COLOR = 17      # setColor(r[b]) - r[b] holds the color name
+    SET_THICKNESS = 18  # setThickness(r[b])
+    MOVE_CURSOR = 19    # move(r[b])
+    ROTATE = 20         # rotate(r[b])
+    DRAW_LINE = 21      # drawLine(r[b])
+    DRAW_SQUARE = 22    # drawSquare(r[b])
+    DRAW_CIRCLE = 23    # drawCircle(r[b])
+    DRAW_POINT = 24     # drawPoint()
+    DRAW_ARC = 25       # drawArc(r[b], r[c])
+
+    # Errors found while compiling, reported when they are reached (as Interpreter does)
+    ERROR = 26          # report messages[a]; if b, skip the rest of the top-level statement
+    REDECLARE = 27      # if r[a] is declared: report messages[b], goto c
+
+
+# Condition operator -> conditional jump taken when the condition is false
+CONDITIONAL_JUMPS = {
+    TokenType.EQUAL: Opcode.JUMP_UNLESS_EQ,
+    TokenType.NOT_EQUAL: Opcode.JUMP_UNLESS_NE,
+    TokenType.LESS_THAN: Opcode.JUMP_UNLESS_LT,
+    TokenType.GREATER_THAN: Opcode.JUMP_UNLESS_GT,
+    TokenType.LESS_EQUAL: Opcode.JUMP_UNLESS_LE,
+    TokenType.GREATER_EQUAL: Opcode.JUMP_UNLESS_GE,
+}
+
+# Arithmetic operator -> opcode
+ARITHMETIC_OPCODES = {
+    TokenType.PLUS: Opcode.ADD,
+    TokenType.MINUS: Opcode.SUB,
+    TokenType.MULTIPLY: Opcode.MUL,
+    TokenType.DIVIDE: Opcode.DIV,
+    TokenType.MODULO: Opcode.MOD,
+}
+
+# Cursor method node kind -> (opcode, operand fields)
+CURSOR_OPCODES = {
+    NodeKind.SET_POSITION: (Opcode.SET_POSITION, ("x", "y")),
+    NodeKind.SET_THICKNESS: (Opcode.SET_THICKNESS, ("thickness",)),
+    NodeKind.MOVE: (Opcode.MOVE_CURSOR, ("distance",)),
+    NodeKind.ROTATE: (Opcode.ROTATE, ("angle",)),
+    NodeKind.DRAW_LINE: (Opcode.DRAW_LINE, ("length",)),
+    NodeKind.DRAW_SQUARE: (Opcode.DRAW_SQUARE, ("side_length",)),
+    NodeKind.DRAW_CIRCLE: (Opcode.DRAW_CIRCLE, ("radius",)),
+    NodeKind.DRAW_POINT: (Opcode.DRAW_POINT, ()),
+    NodeKind.DRAW_ARC: (Opcode.DRAW_ARC, ("radius", "angle")),
+}
+
+
+class CodeObject:
+    """
+    A compiled Draw++ program.
+    - `code`: array('i') of instructions, INSTRUCTION_SIZE integers each.
+    - `constants`: constant pool; constant k is preloaded in register k.
+    - `register_count`: size of the register file (constants, variables, temporaries).
+    - `cursor_names`: name of each cursor slot, for error messages.
+    - `global_variables` / `global_cursors`: top-level name -> register / cursor slot.
+    - `register_names`: register -> name of the variable it holds, for error messages.
+    - `statement_starts`: code index of each top-level statement; the errors that
+      Interpreter does not catch within a statement skip to the next one.
+    - `declarations`: code index of the MOVE of each variable declaration -> (name,
+      code index to resume at when its value is missing).
+    - `updates`: code index of the last instruction of each variable update -> name.
+    - `update_ranges`: (first, last) code indexes of each variable update, in order.
+    - `nodes`: code index -> AST node quoted by the error messages of the instruction
+      (the condition of a conditional jump, the operand of setThickness).
+    - `messages`: error messages of the ERROR and REDECLARE instructions.
+    """
+    def __init__(self):
+        self.code = array("i")
+        self.constants = []
+        self.register_count = 0
+        self.cursor_names = []
+        self.global_variables = {}
+        self.global_cursors = {}
+        self.register_names = {}
+        self.statement_starts = []
+        self.declarations = {}
+        self.updates = {}
+        self.update_ranges = []
+        self.nodes = {}
+        self.messages = []
+
+    def enclosing_update(self, pc):
+        """
+        Returns the code index of the last instruction of the variable update
+        containing `pc`, or None.
+        """
+        index = bisect_right(self.update_ranges, (pc, len(self.code))) - 1
+        if index >= 0 and self.update_ranges[index][1] >= pc:
+            return self.update_ranges[index][1]
+        return None
+
+    def next_statement(self, pc):
+        """
+        Returns the code index of the first top-level statement after `pc`.
+        """
+        index = bisect_right(self.statement_starts, pc)
+        return self.statement_starts[index] if index < len(self.statement_starts) else len(self.code)
+
+    def disassemble(self):
+        """
+        Returns the instructions as readable lines.
+        """
+        lines = []
+        for pc in range(0, len(self.code), INSTRUCTION_SIZE):
+            opcode, a, b, c = self.code[pc:pc + INSTRUCTION_SIZE]
+            lines.append(f"{pc:5d}  {Opcode(opcode).name:<15s} {a:4d} {b:4d} {c:4d}")
+        return lines
+
+
+class BytecodeCompiler:
+    """
+    Compiles an AST into a CodeObject.
+    - Names are resolved lexically (see resolver.py): each variable slot gets its
+      own register and each cursor slot its own entry in the cursor list.
+    - Invalid statements (e.g. using an undeclared cursor) compile to ERROR
+      instructions, so the rest of the program still runs; an undeclared variable
+      reads a register that is never written, reported as undeclared when it is read.
+    """
+    def __init__(self):
+        self.code_object = CodeObject()
+        self.code = self.code_object.code
+        self.constant_registers = {}  # (type, value) -> register of the constant
+        self.variable_resolver = Resolver()
+        self.cursor_resolver = Resolver()
+        self.variable_registers = []  # Variable slot -> register
+        self.temporary_count = 0
+
+    def compile(self, syntax_tree):
+        """
+        Compiles the whole program and returns its CodeObject.
+        """
+        for node in syntax_tree:
+            self.code_object.statement_starts.append(len(self.code))
+            self.emit(Opcode.STEP, 1)
+            self.compile_statement(node)
+
+        # Registers: constants first, then variables and temporaries
+        code_object = self.code_object
+        code_object.register_count = len(code_object.constants) + self.temporary_count
+        code_object.cursor_names = self.cursor_resolver.names
+        code_object.global_variables = {
+            name: self.variable_registers[slot] for name, slot in self.variable_resolver.global_slots().items()
+        }
+        code_object.global_cursors = self.cursor_resolver.global_slots()
+        self.relocate()
+        return code_object
+
+    # --- Code emission ---
+    def emit(self, opcode, a=0, b=0, c=0):
+        """
+        Appends an instruction and returns its code index.
+        """
+        pc = len(self.code)
+        self.code.extend((opcode, a, b, c))
+        return pc
+
+    def error(self, message, abort=False):
+        """
+        Emits an ERROR reporting `message` at run time; with `abort`, the error ends
+        the current top-level statement, like the exceptions of Interpreter.
+        """
+        self.code_object.messages.append(message)
+        self.emit(Opcode.ERROR, len(self.code_object.messages) - 1, int(abort))
+
+    def patch_jump(self, pc, target=None):
+        """
+        Sets the target of the jump at `pc` (defaults to the current end of the code).
+        """
+        target = len(self.code) if target is None else target
+        if self.code[pc] == Opcode.JUMP:
+            self.code[pc + 1] = target
+        elif self.code[pc] == Opcode.ERROR:
+            pass  # An invalid condition: the statement is abandoned
+        else:
+            self.code[pc + 3] = target
+
+    # --- Registers ---
+    # Constants get registers 0..k-1, which are only known at the end of the
+    # compilation; variables and temporaries are numbered from 0 in a second
+    # space, encoded as negative numbers, and relocated after the constants.
+    def new_register(self):
+        """
+        Allocates a register for a variable or a temporary value.
+        """
+        self.temporary_count += 1
+        return -self.temporary_count
+
+    def constant(self, value):
+        """
+        Returns the register preloaded with `value`.
+        """
+        key = (type(value), value)
+        register = self.constant_registers.get(key)
+        if register is None:
+            register = len(self.code_object.constants)
+            self.code_object.constants.append(value)
+            self.constant_registers[key] = register
+        return register
+
+    def relocate(self):
+        """
+        Replaces the provisional (negative) register numbers by their final index.
+        """
+        offset = len(self.code_object.constants) - 1
+        code = self.code
+        for pc in range(0, len(code), INSTRUCTION_SIZE):
+            opcode = code[pc]
+            for position in REGISTER_OPERANDS[opcode]:
+                if code[pc + position] < 0:
+                    code[pc + position] = offset - code[pc + position]
+        global_variables = self.code_object.global_variables
+        for name, register in global_variables.items():
+            global_variables[name] = offset - register
+        self.code_object.register_names = {
+            offset - register: name for register, name in self.code_object.register_names.items()
+        }
+
+    # --- Names ---
+    def variable_register(self, name):
+        """
+        Returns the register of a variable; an undeclared name gets a register that is
+        never written, so reading it reports the variable as undeclared (see VirtualMachine.read).
+        """
+        slot = self.variable_resolver.lookup(name)
+        if slot is None:
+            register = self.new_register()
+            self.code_object.register_names[register] = name
+            return register
+        return self.variable_registers[slot]
+
+    def cursor_slot(self, name):
+        """
+        Returns the slot of a cursor, or None after emitting the error of an undeclared one.
+        """
+        slot = self.cursor_resolver.lookup(name)
+        if slot is None:
+            self.error(f"Cursor '{name}' is not declared.")
+        return slot
+
+    def push_scope(self):
+        self.variable_resolver.push_scope()
+        self.cursor_resolver.push_scope()
+
+    def pop_scope(self):
+        self.variable_resolver.pop_scope()
+        self.cursor_resolver.pop_scope()
+
+    # --- Expressions ---
+    def compile_expression(self, node):
+        """
+        Compiles an expression and returns the register holding its value.
+        """
+        if not isinstance(node, Node):
+            self.error(f"Invalid value node: {node}")
+            return self.new_register()  # Never written: the value is missing
+
+        kind = node.kind
+        if kind == NodeKind.VALUE:
+            try:
+                return self.constant(parse_number(node.value))
+            except ValueError:
+                self.error(f"Invalid value for VALUE type: {node.value}")
+                return self.new_register()
+
+        elif kind == NodeKind.VARIABLE:
+            return self.variable_register(node.name)
+
+        elif kind == NodeKind.UNARY:
+            operand = self.compile_expression(node.operand)
+            result = self.new_register()
+            self.emit(Opcode.NEG, result, operand)
+            return result
+
+        elif kind == NodeKind.EXPRESSION:
+            left = self.compile_expression(node.left)
+            right = self.compile_expression(node.right)
+            opcode = ARITHMETIC_OPCODES.get(node.operator)
+            if opcode is None:
+                self.error(f"Invalid arithmetic operator: {node.operator}")
+                return self.new_register()
+            result = self.new_register()
+            self.emit(opcode, result, left, right)
+            return result
+
+        self.error(f"Unknown value type: {node}")
+        return self.new_register()
+
+    def compile_jump_unless(self, condition, context):
+        """
+        Compiles a condition into a jump taken when it is false.
+        Returns the code index of the jump, to be patched with its target.
+        An invalid condition compiles to an ERROR ending the top-level statement,
+        as Interpreter raises for it.
+        """
+        if not isinstance(condition, Node) or condition.kind != NodeKind.CONDITION:
+            self.error(f"Missing or invalid condition in {context}.", abort=True)
+            return len(self.code) - INSTRUCTION_SIZE
+        left = self.compile_expression(condition.left)
+        right = self.compile_expression(condition.right)
+        opcode = CONDITIONAL_JUMPS.get(condition.operator)
+        if opcode is None:
+            self.error(f"Invalid operator in condition: {condition.operator}", abort=True)
+            return len(self.code) - INSTRUCTION_SIZE
+        pc = self.emit(opcode, left, right)
+        self.code_object.nodes[pc] = condition
+        return pc
+
+    # --- Statements ---
+    def compile_statement(self, node):
+        """
+        Compiles one statement.
+        """
+        if not isinstance(node, Node):
+            self.error(f"Invalid node: {node}", abort=True)
+            return
+
+        kind = node.kind
+        if kind in CURSOR_OPCODES:
+            self.compile_cursor_method(node)
+        elif kind == NodeKind.SET_COLOR:
+            slot = self.cursor_slot(node.cursor)
+            if slot is not None:
+                self.emit(Opcode.SET_COLOR, slot, self.constant(node.color))
+        elif kind == NodeKind.VARIABLE_DECLARATION:
+            self.compile_variable_declaration(node)
+        elif kind == NodeKind.VARIABLE_UPDATE:
+            self.compile_variable_update(node)
+        elif kind == NodeKind.CURSOR_DECLARATION:
+            self.compile_cursor_declaration(node)
+        elif kind == NodeKind.BLOCK:
+            self.compile_block(node)
+        elif kind == NodeKind.IF_STATEMENT:
+            self.compile_if_statement(node)
+        elif kind == NodeKind.WHILE_LOOP:
+            self.compile_while_loop(node)
+        elif kind == NodeKind.FOR_LOOP:
+            self.compile_for_loop(node)
+        elif kind == NodeKind.CONDITION:
+            # A condition used as a statement has no effect, but its operands must be valid
+            self.patch_jump(self.compile_jump_unless(node, "CONDITION"))
+        else:
+            self.error(f"Unknown node kind: {kind.name}", abort=True)
+
+    def compile_cursor_method(self, node):
+        opcode, fields = CURSOR_OPCODES[node.kind]
+        slot = self.cursor_slot(node.cursor)
+        if slot is None:
+            return  # As Interpreter, the operands are not evaluated
+        operands = [self.compile_expression(getattr(node, field)) for field in fields]
+        pc = self.emit(opcode, slot, *operands)
+        if node.kind == NodeKind.SET_THICKNESS:
+            self.code_object.nodes[pc] = node.thickness
+
+    def compile_cursor_declaration(self, node):
+        if not node.name:
+            self.error("Missing cursor name in CURSOR_DECLARATION.")
+            return
+        if self.cursor_resolver.lookup(node.name) is not None:
+            self.error(f"Cursor '{node.name}' is already declared.")
+            return
+        self.emit(Opcode.NEW_CURSOR, self.cursor_resolver.declare(node.name))
+
+    def compile_variable_declaration(self, node, shadow=False):
+        """
+        Compiles a declaration and returns the code index of its MOVE (None on errors).
+        A name already visible keeps its register: the declaration is an error unless
+        the variable is undeclared at run time (see REDECLARE), as in Interpreter.
+        """
+        if not node.name:
+            self.error("Variable declaration missing variable name.")
+            return None
+        code_object = self.code_object
+        slot = None if shadow else self.variable_resolver.lookup(node.name)
+        redeclare = None
+        if slot is not None:
+            code_object.messages.append(f"Variable '{node.name}' is already declared.")
+            redeclare = self.emit(Opcode.REDECLARE, self.variable_registers[slot], len(code_object.messages) - 1)
+        if not isinstance(node.value, Node):
+            self.error(f"Invalid value in declaration of variable '{node.name}'.")
+            if redeclare is not None:
+                self.code[redeclare + 3] = len(self.code)
+            return None
+
+        value = self.compile_expression(node.value)
+        if slot is None:
+            slot = self.variable_resolver.declare(node.name, shadow)  # After the value, as in C
+            register = self.new_register()
+            self.variable_registers.append(register)
+            code_object.register_names[register] = node.name
+        register = self.variable_registers[slot]
+        pc = self.emit(Opcode.MOVE, register, value)
+        code_object.declarations[pc] = (node.name, pc + INSTRUCTION_SIZE)
+        if redeclare is not None:
+            self.code[redeclare + 3] = len(self.code)
+        return pc
+
+    def compile_variable_update(self, node):
+        if not node.name:
+            self.error("Update step missing variable name.")
+            return
+        register = self.variable_register(node.name)
+        start = len(self.code)
+        if node.operator == TokenType.PLUS_PLUS:
+            pc = self.emit(Opcode.ADD, register, register, self.constant(1))
+        elif node.operator == TokenType.MINUS_MINUS:
+            pc = self.emit(Opcode.SUB, register, register, self.constant(1))
+        elif node.operator in (TokenType.PLUS_EQUAL, TokenType.MINUS_EQUAL):
+            value = self.compile_expression(node.value)
+            opcode = Opcode.ADD if node.operator == TokenType.PLUS_EQUAL else Opcode.SUB
+            pc = self.emit(opcode, register, register, value)
+        else:
+            self.error(f"Unknown update operator '{node.operator}' for variable '{node.name}'.")
+            return
+        self.code_object.updates[pc] = node.name
+        self.code_object.update_ranges.append((start, pc))
+
+    def compile_block(self, node):
+        if not isinstance(node, Node) or node.kind != NodeKind.BLOCK:
+            self.error(f"Invalid block: {node}")
+            return
+        count = sum(1 for statement in node.statements if isinstance(statement, Node))
+        if count:
+            self.emit(Opcode.STEP, count)
+        self.push_scope()
+        for statement in node.statements:
+            if isinstance(statement, Node):
+                self.compile_statement(statement)
+            else:
+                self.error(f"Invalid statement in BLOCK: {statement}")
+        self.pop_scope()
+
+    def compile_if_statement(self, node):
+        if not isinstance(node.condition, Node) or node.condition.kind != NodeKind.CONDITION:
+            self.error(f"Missing or invalid condition in IF_STATEMENT: {node}")
+            return
+        jump_to_else = self.compile_jump_unless(node.condition, "IF_STATEMENT")
+        if node.true_block:
+            self.compile_block(node.true_block)
+        if node.false_block:
+            jump_to_end = self.emit(Opcode.JUMP)
+            self.patch_jump(jump_to_else)
+            self.compile_block(node.false_block)
+            self.patch_jump(jump_to_end)
+        else:
+            self.patch_jump(jump_to_else)
+
+    def compile_while_loop(self, node):
+        loop_start = self.emit(Opcode.STEP, 1)
+        jump_to_end = self.compile_jump_unless(node.condition, "WHILE_LOOP")
+        self.compile_block(node.body)
+        self.emit(Opcode.JUMP, loop_start)
+        self.patch_jump(jump_to_end)
+
+    def compile_for_loop(self, node):
+        if not isinstance(node.init, Node) or node.init.kind != NodeKind.VARIABLE_DECLARATION:
+            self.error("Invalid or missing initialization in FOR_LOOP.")
+            return
+        if not isinstance(node.update, Node) or node.update.kind != NodeKind.VARIABLE_UPDATE:
+            self.error("Invalid or missing update in FOR_LOOP.")
+            return
+        self.push_scope()  # The loop variable only exists inside the loop and shadows outer ones
+        init = self.compile_variable_declaration(node.init, shadow=True)
+        loop_start = self.emit(Opcode.STEP, 1)
+        jump_to_end = self.compile_jump_unless(node.condition, "FOR_LOOP")
+        self.compile_block(node.body)
+        self.compile_variable_update(node.update)
+        self.emit(Opcode.JUMP, loop_start)
+        self.patch_jump(jump_to_end)
+        self.pop_scope()
+        if init is not None:
+            # The loop does not run if its variable cannot be initialized
+            self.code_object.declarations[init] = (node.init.name, len(self.code))
+
+
+# Opcode -> positions (1 to 3) of its operands that are registers
+REGISTER_OPERANDS = {opcode: () for opcode in Opcode}
+REGISTER_OPERANDS.update({
+    Opcode.MOVE: (1, 2), Opcode.NEG: (1, 2),
+    Opcode.ADD: (1, 2, 3), Opcode.SUB: (1, 2, 3), Opcode.MUL: (1, 2, 3),
+    Opcode.DIV: (1, 2, 3), Opcode.MOD: (1, 2, 3),
+    Opcode.SET_POSITION: (2, 3), Opcode.SET_COLOR: (2,), Opcode.SET_THICKNESS: (2,),
+    Opcode.MOVE_CURSOR: (2,), Opcode.ROTATE: (2,), Opcode.DRAW_LINE: (2,),
+    Opcode.DRAW_SQUARE: (2,), Opcode.DRAW_CIRCLE: (2,), Opcode.DRAW_ARC: (2, 3),
+    Opcode.REDECLARE: (1,),
+})
+for _jump in CONDITIONAL_JUMPS.values():
+    REGISTER_OPERANDS[_jump] = (1, 2)
+
+
+class VirtualMachine(Interpreter):
+    """
+    Executes Draw++ programs as bytecode (see BytecodeCompiler).
+    - Same cursor semantics, draw commands and execution budget as Interpreter.
+    - Invalid statements, such as the use of an undeclared name, are reported when
+      they are reached and the rest of the program runs, as in Interpreter.
+    - Runtime errors are handled as in Interpreter (see recover): a failed value
+      makes its statement fail, and a declaration whose value fails leaves the
+      variable undeclared (None in its register).
+    - After the run, even one stopped by the execution budget, `variables` and
+      `cursors` hold the declared top-level names.
+    """
+    def __init__(self, syntax_tree, **options):
+        """
+        Initializes the virtual machine (same options as Interpreter).
+        """
+        super().__init__(syntax_tree, **options)
+        self.code_object = None
+
+    def compile(self):
+        """
+        Compiles the AST (once) and returns the CodeObject.
+        """
+        if self.code_object is None:
+            self.code_object = BytecodeCompiler().compile(self.syntax_tree)
+        return self.code_object
+
+    def execute(self):
+        """
+        Compiles and runs the program.
+        """
+        code_object = self.compile()
+        self.start_budget()
+        try:
+            self.run(code_object)
+        except ExecutionLimitError as e:
+            self.errors.append(str(e))
+
+        if self.tracer.enabled:
+            self.tracer.record("execute_done", steps=self.steps, errors=list(self.errors))
+
+    def run(self, code_object):
+        """
+        The dispatch loop. Opcodes are tested roughly by decreasing frequency,
+        against plain integers held in local variables (IntEnum comparisons are slow).
+        """
+        code = code_object.code.tolist()  # List indexing is faster than array indexing
+        end = len(code)
+        # Variables hold None until they are declared
+        registers = list(code_object.constants) + [None] * (code_object.register_count - len(code_object.constants))
+        cursors = [None] * len(code_object.cursor_names)
+        count_step = self.count_step
+        recover = self.recover
+
+        STEP, MOVE, ADD, SUB, MUL, DIV, MOD, NEG, JUMP = (
+            int(Opcode.STEP), int(Opcode.MOVE), int(Opcode.ADD), int(Opcode.SUB), int(Opcode.MUL),
+            int(Opcode.DIV), int(Opcode.MOD), int(Opcode.NEG), int(Opcode.JUMP),
+        )
+        JUMP_UNLESS_EQ, JUMP_UNLESS_NE, JUMP_UNLESS_LT, JUMP_UNLESS_GT, JUMP_UNLESS_LE, JUMP_UNLESS_GE = (
+            int(Opcode.JUMP_UNLESS_EQ), int(Opcode.JUMP_UNLESS_NE), int(Opcode.JUMP_UNLESS_LT),
+            int(Opcode.JUMP_UNLESS_GT), int(Opcode.JUMP_UNLESS_LE), int(Opcode.JUMP_UNLESS_GE),
+        )
+        NEW_CURSOR, ERROR, REDECLARE = int(Opcode.NEW_CURSOR), int(Opcode.ERROR), int(Opcode.REDECLARE)
+
+        pc = 0
+        try:
+            while pc < end:
+                try:
+                    while pc < end:
+                        opcode = code[pc]
+                        if opcode == ADD:
+                            registers[code[pc + 1]] = registers[code[pc + 2]] + registers[code[pc + 3]]
+                        elif opcode == JUMP_UNLESS_LT:
+                            if not registers[code[pc + 1]] < registers[code[pc + 2]]:
+                                pc = code[pc + 3]
+                                continue
+                        elif opcode == STEP:
+                            count_step(code[pc + 1])
+                        elif opcode == JUMP:
+                            pc = code[pc + 1]
+                            continue
+                        elif opcode == MOVE:
+                            value = registers[code[pc + 2]]
+                            if value is None:  # The value of a declaration failed
+                                pc = recover(code_object, registers, pc)
+                                continue
+                            registers[code[pc + 1]] = value
+                        elif opcode == SUB:
+                            registers[code[pc + 1]] = registers[code[pc + 2]] - registers[code[pc + 3]]
+                        elif opcode == MUL:
+                            registers[code[pc + 1]] = registers[code[pc + 2]] * registers[code[pc + 3]]
+                        elif opcode == DIV or opcode == MOD:
+                            left = registers[code[pc + 2]]
+                            right = registers[code[pc + 3]]
+                            if type(left) is int and type(right) is int and left >= 0 and right > 0:
+                                result = left // right if opcode == DIV else left % right
+                            else:
+                                operator = TokenType.DIVIDE if opcode == DIV else TokenType.MODULO
+                                result = apply_arithmetic(operator, left, right)
+                            registers[code[pc + 1]] = result
+                        elif JUMP_UNLESS_EQ <= opcode <= JUMP_UNLESS_GE:
+                            left = registers[code[pc + 1]]
+                            right = registers[code[pc + 2]]
+                            if left is None or right is None:  # == and != would not raise
+                                pc = recover(code_object, registers, pc)
+                                continue
+                            if opcode == JUMP_UNLESS_GT:
+                                holds = left > right
+                            elif opcode == JUMP_UNLESS_LE:
+                                holds = left <= right
+                            elif opcode == JUMP_UNLESS_GE:
+                                holds = left >= right
+                            elif opcode == JUMP_UNLESS_EQ:
+                                holds = left == right
+                            else:
+                                holds = left != right
+                            if not holds:
+                                pc = code[pc + 3]
+                                continue
+                        elif opcode == NEG:
+                            registers[code[pc + 1]] = -registers[code[pc + 2]]
+                        elif opcode == NEW_CURSOR:
+                            cursors[code[pc + 1]] = {
+                                "position": (0, 0), "color": DEFAULT_COLOR, "thickness": 1, "angle": 0.0
+                            }
+                        elif opcode == ERROR or opcode == REDECLARE:
+                            pc = recover(code_object, registers, pc)
+                            continue
+                        else:
+                            self.run_cursor_method(code, pc, registers, cursors)
+                        pc += 4  # INSTRUCTION_SIZE
+                except ExecutionLimitError:
+                    raise
+                except Exception as e:
+                    pc = recover(code_object, registers, pc, e)
+        finally:
+            # Also published when the execution budget stops the run, like Interpreter's state
+            self.variables = {
+                name: registers[register] for name, register in code_object.global_variables.items()
+                if registers[register] is not None
+            }
+            self.cursors = {
+                name: cursors[slot] for name, slot in code_object.global_cursors.items() if cursors[slot] is not None
+            }
+
+    def recover(self, code_object, registers, pc, error=None):
+        """
+        Handles an error raised by the instruction at `pc`, or a missing value (None)
+        found by it if `error` is None, the way Interpreter does; returns the code
+        index to resume at.
+        - Arithmetic: the error is recorded (an operation on a missing value only reports
+          the undeclared variables it reads) and the result is missing, like the None
+          returned by extract_value.
+        - Declaration of a missing value: reported, and the variable stays undeclared.
+        - Update: reported, and the variable keeps its value; an error while evaluating
+          the value of an undeclared variable's update only reports the variable.
+        - Cursor method: a ValueError is recorded and ends the method, as in check_*.
+        - ERROR and REDECLARE report the errors found by the compiler.
+        - Anything else (an invalid condition, an error of an apply_* method) is
+          recorded and skips the rest of the current top-level statement, as in
+          Interpreter.run_statements.
+        """
+        code = code_object.code
+        opcode, a, b, c = code[pc:pc + INSTRUCTION_SIZE]
+        errors = self.errors
+
+        update = code_object.enclosing_update(pc)
+        if update is not None and registers[code[update + 1]] is None:
+            # Interpreter checks the variable before evaluating the update value
+            errors.append(f"Variable '{code_object.updates[update]}' is not declared.")
+            return update + INSTRUCTION_SIZE
+        if opcode == Opcode.ERROR:
+            errors.append(code_object.messages[a])
+            return code_object.next_statement(pc) if b else pc + INSTRUCTION_SIZE
+        if opcode == Opcode.REDECLARE:
+            if registers[a] is None:
+                return pc + INSTRUCTION_SIZE
+            errors.append(code_object.messages[b])
+            return c
+        if Opcode.SET_POSITION <= opcode <= Opcode.DRAW_ARC:  # Cursor methods
+            errors.append(str(error))
+            return pc + INSTRUCTION_SIZE if isinstance(error, ValueError) else code_object.next_statement(pc)
+
+        is_jump = Opcode.JUMP_UNLESS_EQ <= opcode <= Opcode.JUMP_UNLESS_GE
+        sources = [code[pc + position] for position in REGISTER_OPERANDS[opcode] if is_jump or position != 1]
+        missing = [register for register in sources if registers[register] is None]
+
+        if not missing:
+            errors.append(str(error))
+            if not isinstance(error, (ValueError, ZeroDivisionError)):  # Not caught by extract_value
+                return code_object.next_statement(pc)
+        for register in missing:
+            self.read(registers, register)
+
+        if is_jump:
+            errors.append(f"Invalid operand in condition: {code_object.nodes.get(pc)}")
+            return code_object.next_statement(pc)
+        if pc in code_object.declarations:
+            name, resume = code_object.declarations[pc]
+            errors.append(f"Unable to extract value for variable '{name}'.")
+            registers[a] = None
+            return resume
+        if pc in code_object.updates:
+            errors.append(f"Invalid update value for variable '{code_object.updates[pc]}'.")
+            return pc + INSTRUCTION_SIZE
+        registers[a] = None
+        return pc + INSTRUCTION_SIZE
+
+    def read(self, registers, register):
+        """
+        Returns the value of a register; reading an undeclared variable is reported.
+        """
+        value = registers[register]
+        if value is None:
+            name = self.code_object.register_names.get(register)
+            if name is not None:
+                self.errors.append(f"Variable '{name}' is not declared.")
+        return value
+
+    def run_cursor_method(self, code, pc, registers, cursors):
+        """
+        Runs the cursor method at `pc` through the apply_* methods shared with Interpreter.
+        Only the registers of its arguments are read (drawPoint() has none); a missing
+        argument is passed as None, like the result of a failed extract_value.
+        """
+        opcode, slot, b, c = code[pc:pc + INSTRUCTION_SIZE]
+        cursor = cursors[slot]
+        cursor_name = self.code_object.cursor_names[slot]
+        if opcode == Opcode.DRAW_POINT:
+            self.apply_draw_point(cursor)
+            return
+        if opcode == Opcode.SET_COLOR:
+            self.apply_set_color(cursor, cursor_name, registers[b])
+            return
+
+        b = self.read(registers, b)
+        if opcode == Opcode.DRAW_LINE:
+            self.apply_draw_line(cursor, cursor_name, b)
+        elif opcode == Opcode.ROTATE:
+            self.apply_rotate(cursor, cursor_name, b)
+        elif opcode == Opcode.SET_POSITION:
+            self.apply_set_position(cursor, cursor_name, b, self.read(registers, c))
+        elif opcode == Opcode.MOVE_CURSOR:
+            self.apply_move(cursor, cursor_name, b)
+        elif opcode == Opcode.DRAW_CIRCLE:
+            self.apply_draw_circle(cursor, cursor_name, b)
+        elif opcode == Opcode.DRAW_SQUARE:
+            self.apply_draw_square(cursor, cursor_name, b)
+        elif opcode == Opcode.DRAW_ARC:
+            self.apply_draw_arc(cursor, cursor_name, b, self.read(registers, c))
+        elif opcode == Opcode.SET_THICKNESS:
+            if not isinstance(b, (int, float)):  # As extract_numeric_value
+                raise ValueError(f"Expected a numeric value, got: {self.code_object.nodes.get(pc)}")
+            self.apply_set_thickness(cursor, cursor_name, b)
+        else:
+            raise ValueError(f"Invalid opcode: {opcode}")